@@ -0,0 +1,95 @@
+"""
+Journal d'activité : écriture différée par lots, rétention et flux SSE.
+
+Les lots sont écrits par le thread de l'ActivityLogger et relus par celui
+de l'ActivityBroadcaster, dans un contexte de l'application (voir
+build_services dans app.py).
+"""
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from activity_archive import archive_batch
+from extensions import db, activity_log, activity_stream
+from models import Activity, counter_changes, bump_counters
+from pagination import encode_cursor
+from serializers import dumps
+
+
+def activity_counter_changes(rows, delta):
+    """Variations des compteurs d'activités pour un lot de lignes, regroupées par portée"""
+    changes = {}
+    for row in rows:
+        for change in counter_changes("activities", delta, row.get("user_id")):
+            key = (change["scope"], change["name"])
+            changes[key] = changes.get(key, 0) + delta
+    return [
+        {"scope": scope, "name": name, "delta": total}
+        for (scope, name), total in changes.items()
+    ]
+
+
+def write_activities(rows):
+    with db.engine.begin() as conn:
+        conn.execute(Activity.__table__.insert(), rows)
+        bump_counters(activity_counter_changes(rows, 1), connection=conn)
+    # Les abonnés SSE de ce processus reçoivent le lot sans attendre la prochaine scrutation
+    activity_stream.wake()
+
+
+def log_activity(user_id, user_name, action, details):
+    """Journalise une activité sans commit dans la requête (insérée par lot en arrière-plan)"""
+    activity_log.log(user_id=user_id, user_name=user_name, action=action, details=details)
+
+
+def archive_old_activities(days=None, batch_size=None):
+    """
+    Archive les activités plus vieilles que `days` jours (ACTIVITY_RETENTION_DAYS),
+    un lot par transaction. Renvoie leur nombre.
+    """
+    config = current_app.config
+    days = config['ACTIVITY_RETENTION_DAYS'] if days is None else days
+    batch_size = batch_size or config['ACTIVITY_ARCHIVE_BATCH']
+    activity_log.flush()
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    total = 0
+    while True:
+        # Transactions courtes : les écritures des workers passent entre deux lots
+        with db.engine.begin() as conn:
+            rows = archive_batch(conn, Activity.__table__, cutoff, batch_size, config['ACTIVITY_ARCHIVE_DIR'])
+            bump_counters(activity_counter_changes(rows, -1), connection=conn)
+        total += len(rows)
+        if len(rows) < batch_size:
+            return total
+
+
+# -----------------------------
+# SÉRIALISATION & FLUX SSE
+# -----------------------------
+def serialize_activity(a):
+    return {
+        "id": a.id,
+        "user_id": a.user_id,
+        "user_name": a.user_name,
+        "action": a.action,
+        "details": a.details,
+        "timestamp": a.timestamp,
+        "time": a.timestamp.strftime("%H:%M") if a.timestamp else ""
+    }
+
+
+def activity_event(a):
+    return {"id": a.id, "timestamp": a.timestamp, "data": serialize_activity(a)}
+
+
+def fetch_activities_since(moment):
+    """Activités récentes pour le diffuseur ; au-delà de STREAM_REPLAY_LIMIT par passage, on garde les plus récentes"""
+    rows = Activity.query.filter(Activity.timestamp > moment)\
+        .order_by(Activity.timestamp.desc(), Activity.id.desc())\
+        .limit(current_app.config['STREAM_REPLAY_LIMIT']).all()
+    return [activity_event(a) for a in reversed(rows)]
+
+
+def format_sse(event):
+    cursor = encode_cursor(event["timestamp"], event["id"])
+    return f"id: {cursor}\nevent: activity\ndata: {dumps(event['data']).decode()}\n\n"
@@ -0,0 +1,71 @@
+"""
+Archivage à froid du journal d'activité.
+
+Les activités plus anciennes que la durée de rétention quittent la table
+`activity` par lots : chaque lot est ajouté aux fichiers NDJSON compressés
+du jour concerné (`<dossier>/AAAA/MM/AAAA-MM-JJ.ndjson.gz`), puis supprimé
+de la base dans la même transaction. Un lot ajoute un membre gzip au fichier
+du jour ; `zcat` et `gzip.open` lisent les membres à la suite.
+
+Les fichiers sont écrits et synchronisés sur disque avant le commit : si le
+commit échoue, le lot reste en base et sera réécrit au passage suivant (des
+doublons sont alors possibles dans l'archive, dédoublonnables par `id`).
+"""
+import os
+import gzip
+import json
+from collections import defaultdict
+
+from sqlalchemy import select
+
+
+# Ids par DELETE : sous la limite de variables des anciens SQLite (999)
+DELETE_CHUNK = 500
+
+
+def archive_path(archive_dir, day):
+    return os.path.join(archive_dir, f"{day:%Y}", f"{day:%m}", f"{day:%Y-%m-%d}.ndjson.gz")
+
+
+def to_record(row):
+    record = dict(row)
+    record["timestamp"] = record["timestamp"].isoformat() if record["timestamp"] else None
+    return record
+
+
+def append_records(path, records):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+            for record in records:
+                gz.write(json.dumps(record, ensure_ascii=False).encode() + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def archive_batch(conn, table, cutoff, batch_size, archive_dir):
+    """
+    Archive puis supprime au plus batch_size activités antérieures à cutoff,
+    des plus anciennes aux plus récentes. Renvoie les lignes archivées (dicts).
+    À appeler dans une transaction (engine.begin()).
+    """
+    rows = conn.execute(
+        select(table)
+        .where(table.c.timestamp < cutoff)
+        .order_by(table.c.timestamp, table.c.id)
+        .limit(batch_size)
+    ).mappings().all()
+    if not rows:
+        return []
+
+    by_day = defaultdict(list)
+    for row in rows:
+        by_day[row["timestamp"].date()].append(to_record(row))
+    for day, records in sorted(by_day.items()):
+        append_records(archive_path(archive_dir, day), records)
+
+    # Par ids (et non par plage) : une activité insérée entre-temps n'est jamais supprimée sans archive
+    ids = [row["id"] for row in rows]
+    for start in range(0, len(ids), DELETE_CHUNK):
+        conn.execute(table.delete().where(table.c.id.in_(ids[start:start + DELETE_CHUNK])))
+    return [dict(row) for row in rows]
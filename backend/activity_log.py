@@ -0,0 +1,157 @@
+"""
+Journal d'activité en écriture différée.
+
+Les routes déposent leurs événements dans une file bornée en mémoire ; un
+thread les insère en base par lots (taille ou délai atteint), en une seule
+transaction. La requête ne paie plus de second commit, et SQLite voit une
+écriture groupée au lieu d'une par connexion ou téléchargement.
+
+Si la file est pleine, l'événement est abandonné et compté : le journal ne
+doit jamais ralentir ni faire échouer une requête.
+"""
+import os
+import queue
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityLogger:
+    def __init__(self, write_batch, max_queue=10000, batch_size=200, flush_interval=1.0):
+        """
+        write_batch(rows) insère une liste de dicts en une transaction.
+        Un lot part dès batch_size événements, ou au plus tard après flush_interval secondes.
+        """
+        self.write_batch = write_batch
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._retry = []
+        self.stats = {
+            "queued": 0,
+            "written": 0,
+            "dropped": 0,
+            "failed_batches": 0,
+            "delayed": 0,
+            "max_delay_ms": 0,
+        }
+        atexit.register(self.close)
+
+    def _ensure_worker(self):
+        # Le thread ne survit pas au fork de gunicorn : un par processus, créé au premier événement
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._retry = []
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="activity-log", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def log(self, **fields):
+        """Met un événement en file. Ne bloque jamais ; renvoie False s'il a été abandonné."""
+        self._ensure_worker()
+        fields.setdefault("timestamp", datetime.utcnow())
+        try:
+            self._queue.put_nowait((time.monotonic(), fields))
+        except queue.Full:
+            self._count(dropped=1)
+            return False
+        self._count(queued=1)
+        return True
+
+    def _count(self, **increments):
+        # Compteurs modifiés par les requêtes et par le thread d'écriture : sous verrou
+        with self._lock:
+            for name, n in increments.items():
+                self.stats[name] += n
+
+    def pending(self):
+        return (self._queue.qsize() if self._queue else 0) + len(self._retry)
+
+    def _drain(self):
+        batch = self._retry
+        self._retry = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            self.write_batch([fields for _, fields in batch])
+        except Exception:
+            logger.exception("Écriture du journal d'activité impossible, nouvel essai au prochain lot")
+            self._count(failed_batches=1)
+            # On garde le lot pour le prochain passage, dans la limite de la file
+            self._retry = batch[:self.max_queue]
+            return
+        now = time.monotonic()
+        delay_ms = int((now - batch[0][0]) * 1000)
+        # En retard : écrit plus de deux délais de vidage après sa mise en file
+        delayed = sum(1 for queued_at, _ in batch if now - queued_at > 2 * self.flush_interval)
+        with self._lock:
+            self.stats["delayed"] += delayed
+            self.stats["written"] += len(batch)
+            self.stats["max_delay_ms"] = max(self.stats["max_delay_ms"], delay_ms)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                first = None
+            if first is not None:
+                # Visible de flush() pendant que le lot se remplit
+                with self._flush_lock:
+                    self._retry.append(first)
+                # Laisser le lot se remplir jusqu'au délai maximal
+                deadline = first[0] + self.flush_interval
+                while self._queue.qsize() < self.batch_size - 1 and time.monotonic() < deadline:
+                    if self._stop.wait(0.05):
+                        break
+            with self._flush_lock:
+                self._write(self._drain())
+
+    def flush(self):
+        """Écrit immédiatement tout ce qui est en attente (tests, commandes CLI, arrêt)."""
+        if self._pid != os.getpid():
+            return
+        with self._flush_lock:
+            while self.pending():
+                before = self.pending()
+                self._write(self._drain())
+                if self.pending() >= before:
+                    break
+
+    def close(self):
+        if self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+        self._pid = None
+
+    def snapshot(self):
+        """Compteurs lus ensemble (cohérents entre eux) et taille de la file"""
+        with self._lock:
+            stats = dict(self.stats)
+        return {**stats, "pending": self.pending()}
@@ -0,0 +1,142 @@
+"""
+Diffusion en direct du journal d'activité (Server-Sent Events).
+
+Un seul thread par processus interroge la base pour les activités récentes
+et les distribue à tous les abonnés du processus : le coût en base ne dépend
+pas du nombre de tableaux de bord ouverts, et le thread s'arrête quand il
+n'y a plus d'abonné. Le journal étant écrit par lots (et par n'importe quel
+worker), une activité peut arriver en base après une plus récente : chaque
+passage relit une fenêtre de `lag` secondes et écarte les ids déjà diffusés.
+
+Quand ce processus écrit lui-même un lot, `wake()` déclenche un passage
+immédiat ; les lots des autres workers sont vus au passage suivant
+(au plus `poll_interval` secondes).
+"""
+import os
+import queue
+import logging
+import threading
+from datetime import datetime, timedelta
+
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, max_pending):
+        self.events = queue.Queue(maxsize=max_pending)
+        self.closed = False
+
+    def push(self, event):
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            # Client trop lent : on le déconnecte, il reprendra avec Last-Event-ID
+            self.closed = True
+
+    def next(self, timeout):
+        """Prochain événement, ou None après `timeout` secondes sans événement"""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class ActivityBroadcaster:
+    def __init__(self, fetch_since, poll_interval=1.0, lag=5.0, max_subscribers=100, max_pending=500):
+        """
+        fetch_since(moment) renvoie les activités de timestamp > moment, triées par
+        (timestamp, id), sous forme de dicts avec au moins "id" et "timestamp" (datetime).
+        """
+        self.fetch_since = fetch_since
+        self.poll_interval = poll_interval
+        self.lag = timedelta(seconds=lag)
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._subscribers = set()
+        self._thread = None
+        self._pid = None
+        self._sent = {}  # id -> timestamp, pour la fenêtre de relecture
+        self._high_water = None
+        self.stats = {"polls": 0, "sent": 0, "dropped_subscribers": 0, "rejected": 0}
+
+    # -----------------------------
+    # ABONNÉS
+    # -----------------------------
+    def subscribe(self):
+        """Nouvel abonné, ou None si la limite de connexions du processus est atteinte"""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Après un fork : ni abonnés ni thread hérités du parent
+                self._subscribers = set()
+                self._thread = None
+                self._pid = os.getpid()
+            if len(self._subscribers) >= self.max_subscribers:
+                self.stats["rejected"] += 1
+                return None
+            subscription = Subscription(self.max_pending)
+            self._subscribers.add(subscription)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="activity-stream", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+        self._wake.set()
+
+    def subscriber_count(self):
+        return len(self._subscribers) if self._pid == os.getpid() else 0
+
+    def wake(self):
+        self._wake.set()
+
+    # -----------------------------
+    # SCRUTATION
+    # -----------------------------
+    def _poll(self, broadcast=True):
+        rows = self.fetch_since(self._high_water - self.lag)
+        self.stats["polls"] += 1
+        fresh = [row for row in rows if row["id"] not in self._sent]
+        for row in fresh:
+            self._sent[row["id"]] = row["timestamp"]
+            self._high_water = max(self._high_water, row["timestamp"])
+        horizon = self._high_water - self.lag
+        self._sent = {k: ts for k, ts in self._sent.items() if ts > horizon}
+        if not broadcast or not fresh:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            for row in fresh:
+                subscription.push(row)
+            if subscription.closed:
+                self.stats["dropped_subscribers"] += 1
+                self.unsubscribe(subscription)
+        self.stats["sent"] += len(fresh) * len(subscribers)
+
+    def _run(self):
+        # Les activités déjà en base au démarrage ne sont pas rediffusées
+        self._high_water = datetime.utcnow()
+        self._sent = {}
+        try:
+            self._poll(broadcast=False)
+        except Exception:
+            logger.exception("Flux d'activités : lecture initiale impossible")
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                self._poll()
+            except Exception:
+                logger.exception("Flux d'activités : lecture impossible, nouvel essai")
+
+    def snapshot(self):
+        return {**self.stats, "subscribers": self.subscriber_count()}
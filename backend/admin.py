@@ -0,0 +1,464 @@
+"""
+Blueprint admin : journal et flux d'activités, utilisateurs, suppression
+de projets, opérations groupées et import CSV.
+"""
+import os
+import re
+import csv
+import codecs
+from datetime import datetime
+
+import click
+from flask import Blueprint, Response, current_app, request, jsonify
+from sqlalchemy import func, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+from werkzeug.security import generate_password_hash
+
+from activities import log_activity, archive_old_activities, serialize_activity, activity_event, format_sse
+from extensions import db, initialized, activity_log, activity_stream, response_cache
+from models import User, Project, Counter, Activity, Download, counter_changes, bump_counters
+from pagination import decode_cursor, keyset_page, project_listing
+from projects import release_archive, release_images
+from response_cache import cached_response
+from serializers import ADMIN_PROJECT_FIELDS
+
+
+bp = Blueprint('admin', __name__, cli_group=None)
+
+
+# -----------------------------
+# ADMIN ROUTES
+# -----------------------------
+def parse_datetime_arg(name):
+    """Lit un paramètre ISO 8601 (?since=2025-11-30T10:00). Lève ValueError si invalide."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Paramètre {name} invalide (format ISO 8601 attendu)")
+
+
+@bp.route('/api/admin/activities', methods=['GET'])
+def get_recent_activities():
+    """
+    Activités, des plus récentes aux plus anciennes. Filtres : ?action= (répétable),
+    ?user_id=, ?since= / ?until= (ISO 8601). Paginé par curseur (50 par défaut).
+    """
+    activity_log.flush()
+    query = Activity.query
+    actions = request.args.getlist('action')
+    if actions:
+        query = query.filter(Activity.action.in_(actions))
+    if request.args.get('user_id'):
+        query = query.filter(Activity.user_id == request.args['user_id'])
+    try:
+        since, until = parse_datetime_arg('since'), parse_datetime_arg('until')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if since:
+        query = query.filter(Activity.timestamp >= since)
+    if until:
+        query = query.filter(Activity.timestamp < until)
+
+    return keyset_page(query, Activity.timestamp, Activity.id, serialize_activity)
+
+
+# -----------------------------
+# FLUX D'ACTIVITÉS (SSE)
+# -----------------------------
+@bp.route('/api/admin/activities/stream', methods=['GET'])
+def stream_activities():
+    """
+    Nouvelles activités en Server-Sent Events (événement `activity`).
+    À la reconnexion, le navigateur renvoie Last-Event-ID : les activités
+    manquées sont rejouées avant le direct. Commentaire `: ping` toutes les
+    STREAM_HEARTBEAT secondes pour garder la connexion ouverte.
+    """
+    config = current_app.config
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        resume = decode_cursor(last_event_id) if last_event_id else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Le générateur du flux tourne hors du contexte de l'application : diffuseur résolu ici
+    stream = activity_stream._get_current_object()
+    # Abonnement avant la relecture : rien n'est perdu entre les deux
+    subscription = stream.subscribe()
+    if subscription is None:
+        response = jsonify({"error": "Trop de flux ouverts, réessayez plus tard"})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(config['STREAM_RETRY_MS'] // 1000)
+        return response
+
+    replay = []
+    if resume:
+        activity_log.flush()
+        last_date, last_id = resume
+        rows = Activity.query.filter(or_(
+            Activity.timestamp > last_date,
+            and_(Activity.timestamp == last_date, Activity.id > last_id)
+        )).order_by(Activity.timestamp, Activity.id).limit(config['STREAM_REPLAY_LIMIT']).all()
+        replay = [activity_event(a) for a in rows]
+
+    retry_ms, heartbeat = config['STREAM_RETRY_MS'], config['STREAM_HEARTBEAT']
+
+    def events():
+        try:
+            yield f"retry: {retry_ms}\n\n"
+            replayed = set()
+            for event in replay:
+                replayed.add(event["id"])
+                yield format_sse(event)
+            while not subscription.closed:
+                event = subscription.next(heartbeat)
+                if event is None:
+                    yield ": ping\n\n"
+                elif event["id"] not in replayed:
+                    yield format_sse(event)
+        finally:
+            stream.unsubscribe(subscription)
+
+    # Pas de session ouverte pendant le flux : la connexion retourne au pool dès ici
+    db.session.remove()
+    return Response(events(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # nginx : pas de mise en tampon
+    })
+
+
+@bp.route('/api/admin/activity/<activity_id>', methods=['DELETE'])
+def delete_activity(activity_id):
+    """Supprime une activité spécifique"""
+    activity = Activity.query.get(activity_id)
+    if activity:
+        db.session.delete(activity)
+        bump_counters(counter_changes("activities", -1, activity.user_id))
+        db.session.commit()
+        return jsonify({"message": "Activité supprimée"}), 200
+    return jsonify({"error": "Activité non trouvée"}), 404
+
+
+@bp.route('/api/admin/activities', methods=['DELETE'])
+def clear_all_activities():
+    """Supprime toutes les activités"""
+    activity_log.flush()
+    Activity.query.delete()
+    Counter.query.filter_by(name="activities").delete()
+    db.session.commit()
+    return jsonify({"message": "Toutes les activités ont été supprimées"}), 200
+
+
+@bp.route('/api/admin/users', methods=['GET'])
+def get_all_users():
+    users = User.query.all()
+    return jsonify([{
+        "id": u.id,
+        "matricule": u.matricule,
+        "email": u.email,
+        "pseudo": u.pseudo,
+        "role": u.role,
+        "dateInscription": u.dateInscription
+    } for u in users])
+
+
+@bp.route('/api/admin/projects', methods=['GET'])
+@cached_response
+def admin_projects():
+    return project_listing(Project.query, ADMIN_PROJECT_FIELDS)
+
+
+@bp.route('/api/admin/projects/categories', methods=['GET'])
+@cached_response
+def admin_project_categories():
+    """Nombre de projets par catégorie (statistiques de la liste admin, paginée)"""
+    count = func.count(Project.id)
+    rows = db.session.query(Project.categorie, count)\
+        .group_by(Project.categorie)\
+        .order_by(count.desc())\
+        .all()
+    return jsonify([{"categorie": categorie, "count": n} for categorie, n in rows])
+
+
+def delete_projects(projects):
+    """
+    Supprime des projets et leurs téléchargements dans la transaction en cours,
+    sans commit. Renvoie les fichiers d'archive à supprimer APRÈS le commit.
+    """
+    ids = [p.id for p in projects]
+    orphan_paths = []
+    changes = []
+    references = {}
+    for project in projects:
+        if project.archiveSha256:
+            references[project.archiveSha256] = references.get(project.archiveSha256, 0) + 1
+        elif project.filePath:
+            orphan_paths.append(project.filePath)
+        changes += counter_changes("projects", -1, project.auteurId)
+    # Archive partagée : une mise à jour par contenu, le fichier ne part qu'avec sa dernière référence
+    for sha256, count in references.items():
+        orphan_path = release_archive(sha256, count)
+        if orphan_path:
+            orphan_paths.append(orphan_path)
+
+    # Supprimer aussi les téléchargements associés (et les décompter)
+    per_user = db.session.query(Download.user_id, func.count())\
+        .filter(Download.project_id.in_(ids))\
+        .group_by(Download.user_id)
+    for downloader, n in per_user:
+        changes += counter_changes("downloads", -n, downloader)
+    bump_counters(changes)
+    Download.query.filter(Download.project_id.in_(ids)).delete(synchronize_session=False)
+
+    for project in projects:
+        db.session.delete(project)
+    return orphan_paths
+
+
+def remove_project_files(projects, orphan_paths):
+    """Après commit : archives et images qui ne sont plus référencées"""
+    # Images distinctes du lot, vérifiées en une seule requête par release_images
+    images = {image['sha256']: image for project in projects for image in project.images or []}
+    release_images(list(images.values()))
+    for path in orphan_paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@bp.route('/api/admin/project/<project_id>', methods=['DELETE'])
+def delete_project(project_id):
+    project = Project.query.get_or_404(project_id)
+    orphan_paths = delete_projects([project])
+    db.session.commit()
+    response_cache.invalidate()
+
+    # Log de l'activité
+    log_activity(
+        user_id="system",
+        user_name="Administrateur",
+        action="Suppression projet",
+        details=f"Projet supprimé: {project.titre}"
+    )
+
+    remove_project_files([project], orphan_paths)
+    return jsonify({"message": "Projet supprimé"}), 200
+
+
+# -----------------------------
+# OPÉRATIONS GROUPÉES (ADMIN)
+# -----------------------------
+USER_ROLES = ("admin", "formateur", "stagiaire")
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+def bulk_ids():
+    """Lit {"ids": [...]} (dédoublonnés, ordre conservé). Lève ValueError si invalide."""
+    ids = (request.get_json(silent=True) or {}).get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, str) for i in ids):
+        raise ValueError("Liste d'ids attendue : {\"ids\": [...]}")
+    ids = list(dict.fromkeys(ids))
+    max_items = current_app.config['BULK_MAX_ITEMS']
+    if len(ids) > max_items:
+        raise ValueError(f"{max_items} éléments au maximum par lot")
+    return ids
+
+
+def summarize(names, limit=10):
+    shown = ", ".join(names[:limit])
+    return shown + (f" … (+{len(names) - limit})" if len(names) > limit else "")
+
+
+@bp.route('/api/admin/projects/bulk-delete', methods=['POST'])
+def bulk_delete_projects():
+    """Supprime un lot de projets en une transaction ; résultat par id"""
+    try:
+        ids = bulk_ids()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    projects = Project.query.filter(Project.id.in_(ids)).all()
+    found = {p.id for p in projects}
+    try:
+        orphan_paths = delete_projects(projects)
+        db.session.commit()
+    except Exception:
+        # Rien n'est supprimé, ni en base ni sur disque
+        db.session.rollback()
+        raise
+    response_cache.invalidate()
+
+    if projects:
+        log_activity(
+            user_id="system",
+            user_name="Administrateur",
+            action="Suppression projets (lot)",
+            details=f"{len(projects)} projet(s) supprimé(s): {summarize([p.titre for p in projects])}"
+        )
+    remove_project_files(projects, orphan_paths)
+
+    results = [{"id": i, "status": "supprime" if i in found else "introuvable"} for i in ids]
+    return jsonify({"deleted": len(found), "results": results}), 200
+
+
+@bp.route('/api/admin/users/bulk-role', methods=['POST'])
+def bulk_change_roles():
+    """Change le rôle d'un lot d'utilisateurs en une transaction : {"ids": [...], "role": "formateur"}"""
+    try:
+        ids = bulk_ids()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    role = (request.get_json(silent=True) or {}).get('role')
+    if role not in USER_ROLES:
+        return jsonify({"error": f"Rôle invalide (attendu : {', '.join(USER_ROLES)})"}), 400
+
+    users = {u.id: u for u in User.query.filter(User.id.in_(ids))}
+    results, changed = [], []
+    for user_id in ids:
+        user = users.get(user_id)
+        if user is None:
+            results.append({"id": user_id, "status": "introuvable"})
+        elif user.role == role:
+            results.append({"id": user_id, "status": "inchange"})
+        else:
+            results.append({"id": user_id, "status": "modifie", "ancienRole": user.role})
+            user.role = role
+            changed.append(user.pseudo)
+    db.session.commit()
+
+    if changed:
+        log_activity(
+            user_id="system",
+            user_name="Administrateur",
+            action="Changement de rôle (lot)",
+            details=f"{len(changed)} utilisateur(s) passé(s) {role}: {summarize(changed)}"
+        )
+    return jsonify({"updated": len(changed), "results": results}), 200
+
+
+def import_keys(row):
+    """Valeurs uniques d'un utilisateur, telles que comparées à la connexion (pseudo sans casse)"""
+    return {"matricule": row["matricule"], "email": row["email"], "pseudo": row["pseudo"].lower()}
+
+
+def import_row_error(row, seen):
+    """Message d'erreur d'une ligne CSV (hors doublons en base), None si elle est valide"""
+    if not all(row.get(k) for k in ("matricule", "email", "pseudo", "password")):
+        return "Colonnes matricule, email, pseudo et password obligatoires"
+    if not (row["matricule"].startswith("AD-") or row["matricule"].startswith("MAT-")):
+        return "Format de matricule invalide"
+    if not EMAIL_PATTERN.match(row["email"]):
+        return "Email invalide"
+    if row["role"] not in USER_ROLES:
+        return f"Rôle invalide (attendu : {', '.join(USER_ROLES)})"
+    for key, value in import_keys(row).items():
+        if value in seen[key]:
+            return f"{key} en double dans le fichier"
+    return None
+
+
+def import_plan(rows):
+    """
+    Lignes à créer et résultat par ligne, sans écrire : doublons du fichier et de la
+    base écartés (lecture seule, ne prend pas le verrou d'écriture SQLite).
+    """
+    taken = {key: set() for key in ("matricule", "email", "pseudo")}
+    existing = User.query.filter(or_(
+        User.matricule.in_([row["matricule"] for _, row in rows]),
+        func.lower(User.email).in_([row["email"] for _, row in rows]),
+        func.lower(User.pseudo).in_([row["pseudo"].lower() for _, row in rows]),
+    )).options(load_only(User.matricule, User.email, User.pseudo))
+    for user in existing:
+        taken["matricule"].add(user.matricule)
+        taken["email"].add(user.email.lower())
+        taken["pseudo"].add(user.pseudo.lower())
+
+    seen = {key: set() for key in ("matricule", "email", "pseudo")}
+    accepted, results = [], []
+    for line, row in rows:
+        error = import_row_error(row, seen)
+        keys = import_keys(row) if error is None else {}
+        clash = [key for key, value in keys.items() if value in taken[key]]
+        if clash:
+            error = f"{clash[0]} déjà utilisé"
+        if error:
+            results.append({"ligne": line, "matricule": row.get("matricule"), "status": "erreur", "error": error})
+            continue
+        for key, value in keys.items():
+            seen[key].add(value)
+        accepted.append(row)
+        results.append({"ligne": line, "matricule": row["matricule"], "status": "cree"})
+    return accepted, results
+
+
+@bp.route('/api/admin/users/import', methods=['POST'])
+def import_users():
+    """
+    Import CSV (en-tête : matricule,email,pseudo,password[,role]), corps text/csv
+    ou champ multipart `file`, BULK_IMPORT_MAX_ROWS lignes au plus (413 au-delà).
+    Le fichier est lu et vérifié, les mots de passe hachés (≈ 150 ms par ligne),
+    puis toutes les lignes valides sont créées en une seule courte transaction :
+    le verrou d'écriture SQLite n'est pas tenu pendant le hachage. Les lignes
+    refusées sont signalées dans `results`.
+    """
+    upload = request.files.get('file')
+    raw = upload.stream if upload else request.stream
+    # Décodage ligne à ligne : l'entrée WSGI de gunicorn n'est pas un flux io (pas de TextIOWrapper)
+    reader = csv.DictReader(codecs.iterdecode(raw, 'utf-8-sig'))
+    if not reader.fieldnames or not {"matricule", "email", "pseudo", "password"} <= set(reader.fieldnames):
+        return jsonify({"error": "En-tête CSV attendu : matricule,email,pseudo,password[,role]"}), 400
+
+    max_rows = current_app.config['BULK_IMPORT_MAX_ROWS']
+    rows = []
+    try:
+        for line, row in enumerate(reader, start=2):
+            if line - 1 > max_rows:
+                return jsonify({"error": f"{max_rows} lignes au maximum"}), 413
+            row = {k: (v or "").strip() for k, v in row.items() if k}
+            row["matricule"] = row["matricule"].upper()
+            row["email"] = row["email"].lower()
+            row["role"] = row.get("role") or ("admin" if row["matricule"].startswith("AD-") else "stagiaire")
+            rows.append((line, row))
+    except (UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"error": f"CSV illisible : {e}"}), 400
+
+    accepted, results = import_plan(rows) if rows else ([], [])
+    # Fin de la transaction de lecture avant le hachage, qui ne touche pas la base
+    db.session.rollback()
+    users = [User(matricule=row["matricule"], email=row["email"], pseudo=row["pseudo"],
+                  password=generate_password_hash(row["password"]), role=row["role"])
+             for row in accepted]
+
+    if users:
+        try:
+            db.session.add_all(users)
+            bump_counters(counter_changes("users", len(users)))
+            db.session.commit()
+        except IntegrityError:
+            # Un compte créé entre-temps avec le même matricule, email ou pseudo : rien n'est importé
+            db.session.rollback()
+            return jsonify({"error": "Import annulé : utilisateur créé entre-temps, réessayez"}), 409
+        except Exception:
+            db.session.rollback()
+            raise
+        log_activity(
+            user_id="system",
+            user_name="Administrateur",
+            action="Import utilisateurs",
+            details=f"{len(users)} utilisateur(s) importé(s): {summarize([u.pseudo for u in users])}"
+        )
+    errors = sum(1 for r in results if r["status"] == "erreur")
+    return jsonify({"created": len(users), "errors": errors, "results": results}), 200
+
+
+@bp.cli.command('archive-activities')
+@click.option('--days', type=int, default=None,
+              help="Âge (jours) au-delà duquel une activité est archivée (défaut : ACTIVITY_RETENTION_DAYS).")
+@click.option('--batch-size', type=int, default=None, help="Défaut : ACTIVITY_ARCHIVE_BATCH.")
+@initialized
+def archive_activities_command(days, batch_size):
+    """Déplace les anciennes activités vers des fichiers NDJSON compressés."""
+    total = archive_old_activities(days, batch_size)
+    print(f"{total} activité(s) archivée(s) dans {current_app.config['ACTIVITY_ARCHIVE_DIR']}")
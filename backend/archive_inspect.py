@@ -0,0 +1,171 @@
+"""
+Inspection des archives de projets (zip, tar, tar.gz/bz2/xz).
+
+`inspect_archive` lit l'archive en un seul passage, sans rien extraire sur
+disque : liste des fichiers (chemin, taille), octets par langage détecté,
+README et petits fichiers texte gardés en mémoire jusqu'à un plafond. Pour
+un zip seul le répertoire central est lu, plus les fichiers retenus ; un tar
+est parcouru en flux.
+
+`open_entry` relit un fichier précis directement dans l'archive, par blocs.
+"""
+import lzma
+import zlib
+import tarfile
+import zipfile
+import posixpath
+
+
+CHUNK_SIZE = 64 * 1024
+
+LANGUAGES = {
+    ".py": "Python", ".js": "JavaScript", ".jsx": "JavaScript", ".mjs": "JavaScript",
+    ".ts": "TypeScript", ".tsx": "TypeScript", ".html": "HTML", ".htm": "HTML",
+    ".css": "CSS", ".scss": "SCSS", ".sass": "SCSS", ".php": "PHP", ".java": "Java",
+    ".kt": "Kotlin", ".swift": "Swift", ".dart": "Dart", ".c": "C", ".h": "C",
+    ".cpp": "C++", ".hpp": "C++", ".cc": "C++", ".cs": "C#", ".go": "Go", ".rs": "Rust",
+    ".rb": "Ruby", ".vue": "Vue", ".svelte": "Svelte", ".sql": "SQL", ".sh": "Shell",
+    ".ipynb": "Jupyter Notebook", ".r": "R",
+}
+
+TEXT_EXTENSIONS = set(LANGUAGES) | {
+    ".md", ".txt", ".rst", ".json", ".yml", ".yaml", ".toml", ".ini", ".cfg", ".env.example",
+    ".xml", ".svg", ".gitignore", ".lock", ".csv",
+}
+
+# Dossiers de dépendances ou de build : listés, mais ignorés pour les langages et les aperçus
+VENDORED = {"node_modules", "vendor", "venv", ".venv", "__pycache__", ".git", "dist", "build"}
+
+
+class ArchiveError(Exception):
+    pass
+
+
+# Archive corrompue ou tronquée, selon le format et la compression
+CORRUPT_ARCHIVE_ERRORS = (zipfile.BadZipFile, tarfile.TarError, EOFError, zlib.error, lzma.LZMAError, OSError)
+
+
+def archive_format(path):
+    if zipfile.is_zipfile(path):
+        return "zip"
+    if tarfile.is_tarfile(path):
+        return "tar"
+    raise ArchiveError("Format d'archive non pris en charge (zip ou tar attendu)")
+
+
+def clean_path(name):
+    """Chemin relatif normalisé ('./a//b' -> 'a/b'), None pour une entrée à ignorer"""
+    name = posixpath.normpath(name.replace("\\", "/")).lstrip("/")
+    if name in ("", ".") or name.startswith("../"):
+        return None
+    return name
+
+
+def is_vendored(path):
+    return any(part in VENDORED for part in path.split("/")[:-1])
+
+
+def is_text_candidate(path):
+    base = posixpath.basename(path).lower()
+    return base.startswith("readme") or posixpath.splitext(base)[1] in TEXT_EXTENSIONS or base in TEXT_EXTENSIONS
+
+
+def decode_text(data):
+    if b"\x00" in data:
+        return None
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def members(path, fmt):
+    """(chemin, taille, est_dossier, ouvrir) pour chaque entrée, dans l'ordre de l'archive"""
+    if fmt == "zip":
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                yield info.filename, info.file_size, info.is_dir(), lambda info=info: zf.open(info)
+    else:
+        with tarfile.open(path, mode="r|*") as tf:
+            for member in tf:
+                if not (member.isfile() or member.isdir()):
+                    continue
+                yield member.name, member.size, member.isdir(), lambda member=member: tf.extractfile(member)
+
+
+def inspect_archive(path, max_entries=20000, preview_max_bytes=64 * 1024, preview_total_bytes=2 * 1024 * 1024):
+    """Manifeste de l'archive : format, fichiers, langages, README et aperçus texte"""
+    try:
+        return read_manifest(path, max_entries, preview_max_bytes, preview_total_bytes)
+    except CORRUPT_ARCHIVE_ERRORS as e:
+        raise ArchiveError(f"Archive illisible : {e}")
+
+
+def read_manifest(path, max_entries, preview_max_bytes, preview_total_bytes):
+    fmt = archive_format(path)
+    entries, languages, previews = [], {}, {}
+    preview_budget = preview_total_bytes
+    readme_path = None
+    truncated = False
+
+    for name, size, is_dir, open_member in members(path, fmt):
+        name = clean_path(name)
+        if name is None:
+            continue
+        if len(entries) >= max_entries:
+            truncated = True
+            break
+        entries.append({"path": name, "size": 0 if is_dir else size, "dir": is_dir})
+        if is_dir or is_vendored(name):
+            continue
+
+        language = LANGUAGES.get(posixpath.splitext(name)[1].lower())
+        if language:
+            languages[language] = languages.get(language, 0) + size
+
+        base = posixpath.basename(name).lower()
+        is_readme = base.startswith("readme")
+        if size > preview_max_bytes or size > preview_budget or not is_text_candidate(name):
+            continue
+        with open_member() as f:
+            text = decode_text(f.read(preview_max_bytes + 1))
+        if text is None:
+            continue
+        previews[name] = text
+        preview_budget -= size
+        # README le moins profond
+        if is_readme and (readme_path is None or name.count("/") < readme_path.count("/")):
+            readme_path = name
+
+    return {
+        "format": fmt,
+        "entries": entries,
+        "languages": language_shares(languages),
+        "readme_path": readme_path,
+        "previews": previews,
+        "truncated": truncated,
+    }
+
+
+def language_shares(languages):
+    """[{"nom", "octets", "part"}], du langage le plus présent au moins présent"""
+    total = sum(languages.values()) or 1
+    return [
+        {"nom": name, "octets": size, "part": round(100 * size / total, 1)}
+        for name, size in sorted(languages.items(), key=lambda item: -item[1])
+    ]
+
+
+def open_entry(path, entry_path):
+    """
+    Générateur des blocs d'un fichier de l'archive (sans extraction sur disque).
+    Lève KeyError si le fichier n'existe pas.
+    """
+    fmt = archive_format(path)
+    for name, size, is_dir, open_member in members(path, fmt):
+        if not is_dir and clean_path(name) == entry_path:
+            with open_member() as f:
+                for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    yield block
+            return
+    raise KeyError(entry_path)
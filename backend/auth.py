@@ -0,0 +1,259 @@
+"""
+Blueprint auth : codes d'activation, inscription, connexion et profil.
+"""
+import random
+
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy import func
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from activities import log_activity
+from extensions import db, mail_queue, temp_codes, rate_limiter
+from models import User, counter_changes, bump_counters, read_counters
+from rate_limit import limit, client_ip, json_field, view_arg
+
+
+bp = Blueprint('auth', __name__)
+
+
+@bp.route('/send-code', methods=['POST'])
+@limit(rate_limiter, 'send_code', [
+    ('ip', 'send_code_ip', client_ip),
+    ('email', 'send_code_email', json_field('email')),
+])
+def send_code():
+    data = request.json
+    email = data.get('email', '').lower().strip()
+    matricule = data.get('matricule', '').upper().strip()
+
+    if not email or not matricule:
+        return jsonify({"error": "Email et Matricule requis"}), 400
+
+    # Validation du format du matricule
+    if not (matricule.startswith("AD-") or matricule.startswith("MAT-")):
+        return jsonify({"error": "Format de matricule invalide. Utilisez AD-xxx ou MAT-xxx"}), 400
+
+    # Validation de la partie numérique
+    try:
+        prefix, number = matricule.split('-')
+        if not number.isdigit():
+            return jsonify({"error": "La partie après le tiret doit être numérique"}), 400
+    except ValueError:
+        return jsonify({"error": "Format de matricule invalide. Utilisez AD-xxx ou MAT-xxx"}), 400
+
+    code = str(random.randint(100000, 999999))
+    temp_codes.set(email, {"code": code, "matricule": matricule}, current_app.config['CODE_TTL_SECONDS'])
+
+    # Envoi asynchrone : la requête n'attend pas le serveur SMTP
+    mail_queue.enqueue(
+        "Code d'activation - Simplon Code Hub",
+        [email],
+        f"Votre code d'activation est : {code}"
+    )
+
+    return jsonify({"message": "Code envoyé"}), 200
+
+
+@bp.route('/verify-code', methods=['POST'])
+@limit(rate_limiter, 'verify_code', [
+    ('ip', 'verify_code_ip', client_ip),
+])
+def verify_code():
+    data = request.json
+    email = data.get('email', '').lower().strip()
+    code = str(data.get('code', '')).strip()
+
+    entry = temp_codes.get(email)
+    if not entry:
+        return jsonify({"error": "Code invalide ou expiré"}), 400
+
+    # Au-delà de CODE_MAX_ATTEMPTS essais, le code est détruit : il faut en redemander un
+    if temp_codes.incr_attempts(email) > current_app.config['CODE_MAX_ATTEMPTS']:
+        temp_codes.delete(email)
+        return jsonify({"error": "Trop de tentatives, demandez un nouveau code"}), 429
+
+    if entry['code'] == code:
+        return jsonify({"status": "success"}), 200
+
+    return jsonify({"error": "Code invalide"}), 400
+
+
+@bp.route('/api/activation', methods=['POST'])
+@limit(rate_limiter, 'activation', [
+    ('ip', 'activation_ip', client_ip),
+])
+def final_activation():
+    data = request.json
+    email = data.get('email').lower().strip()
+    matricule = data.get('matricule').upper().strip()
+    pseudo = data.get('pseudo').strip()
+    password = data.get('password')
+
+    # Validation supplémentaire
+    if not (matricule.startswith("AD-") or matricule.startswith("MAT-")):
+        return jsonify({"error": "Format de matricule invalide"}), 400
+
+    if User.query.filter((User.email == email) | (User.matricule == matricule)).first():
+        return jsonify({"error": "Email ou matricule déjà utilisé"}), 400
+
+    # Déterminer le rôle selon le format du matricule
+    if matricule.startswith("AD-"):
+        role = "admin"
+    elif matricule.startswith("MAT-"):
+        role = "stagiaire"
+    else:
+        role = "stagiaire"  # Par défaut
+
+    new_user = User(
+        email=email,
+        matricule=matricule,
+        pseudo=pseudo,
+        password=generate_password_hash(password),
+        role=role
+    )
+    db.session.add(new_user)
+    bump_counters(counter_changes("users", 1))
+    db.session.commit()
+
+    # Créer une activité log
+    log_activity(
+        user_id=new_user.id,
+        user_name=new_user.pseudo,
+        action="Inscription",
+        details=f"Nouvel utilisateur inscrit: {pseudo} ({matricule})"
+    )
+
+    temp_codes.delete(email)
+    return jsonify({"message": "Compte créé", "role": role}), 201
+
+
+@bp.route('/api/login', methods=['POST'])
+@limit(rate_limiter, 'login', [
+    ('ip', 'login_ip', client_ip),
+    ('identifier', 'login_identifier', json_field('identifier')),
+], refund_if=lambda response: response.status_code == 200)
+def login():
+    data = request.json
+    identifier = data.get("identifier", "").strip()
+    password = data.get("password", "").strip()
+
+    if not identifier or not password:
+        return jsonify({"error": "Identifiant et mot de passe requis"}), 400
+
+    # Recherche insensible à la casse par email ou pseudo
+    user = User.query.filter(
+        (func.lower(User.email) == func.lower(identifier)) | 
+        (func.lower(User.pseudo) == func.lower(identifier))
+    ).first()
+
+    # Vérification utilisateur + mot de passe
+    if not user or not check_password_hash(user.password, password):
+        return jsonify({"error": "Identifiants incorrects"}), 401
+
+    # Redirection selon le matricule
+    if user.matricule.startswith("AD-"):
+        redirect_to = "/admin-dashboard"
+    elif user.matricule.startswith("MAT-"):
+        redirect_to = "/dashboard"
+    else:
+        # Fallback selon le rôle
+        redirect_to = "/admin-dashboard" if user.role == "admin" else "/dashboard"
+
+    # Créer une activité log pour la connexion
+    log_activity(
+        user_id=user.id,
+        user_name=user.pseudo,
+        action="Connexion",
+        details=f"Connexion réussie depuis l'adresse {request.remote_addr}"
+    )
+
+    return jsonify({
+        "message": "Connexion réussie",
+        "user": {
+            "id": user.id,
+            "pseudo": user.pseudo,
+            "email": user.email,
+            "matricule": user.matricule,
+            "role": user.role
+        },
+        "redirectTo": redirect_to
+    }), 200
+
+
+# -----------------------------
+# USER PROFILE UPDATE
+# -----------------------------
+@bp.route('/api/users/<user_id>', methods=['PATCH'])
+@limit(rate_limiter, 'update_user', [
+    ('ip', 'update_user', client_ip),
+    ('user', 'update_user', view_arg('user_id')),
+])
+def update_user(user_id):
+    data = request.json
+    
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "Utilisateur non trouvé"}), 404
+    
+    # Mettre à jour les champs autorisés
+    if 'pseudo' in data:
+        # Vérifier que le pseudo n'est pas déjà utilisé par un autre utilisateur
+        existing_user = User.query.filter(
+            User.pseudo == data['pseudo'],
+            User.id != user_id
+        ).first()
+        if existing_user:
+            return jsonify({"error": "Ce pseudo est déjà utilisé"}), 400
+        user.pseudo = data['pseudo']
+    
+    if 'password' in data and data['password']:
+        user.password = generate_password_hash(data['password'])
+    
+    db.session.commit()
+    
+    # Créer une activité log
+    log_activity(
+        user_id=user.id,
+        user_name=user.pseudo,
+        action="Mise à jour profil",
+        details=f"Profil mis à jour par {user.pseudo}"
+    )
+    
+    return jsonify({
+        "message": "Profil mis à jour",
+        "user": {
+            "id": user.id,
+            "pseudo": user.pseudo,
+            "email": user.email,
+            "matricule": user.matricule,
+            "role": user.role
+        }
+    }), 200
+
+
+# -----------------------------
+# USER PROFILE
+# -----------------------------
+@bp.route('/api/user/profile', methods=['GET'])
+def get_user_profile():
+    user_id = request.args.get('user_id')
+    if not user_id:
+        return jsonify({"error": "User ID requis"}), 400
+    
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "Utilisateur non trouvé"}), 404
+    
+    # Compteurs matérialisés (pas de COUNT(*) à chaque affichage)
+    counters = read_counters(user_id)
+    
+    return jsonify({
+        "id": user.id,
+        "matricule": user.matricule,
+        "email": user.email,
+        "pseudo": user.pseudo,
+        "role": user.role,
+        "dateInscription": user.dateInscription.isoformat() if user.dateInscription else None,
+        "projectCount": counters.get("projects", 0),
+        "downloadCount": counters.get("downloads", 0)
+    }), 200
@@ -0,0 +1,66 @@
+"""
+Tâches d'arrière-plan par clé (inspection d'archives, variantes d'images…).
+
+Un thread par processus, créé à la première tâche (celui du maître gunicorn
+ne survit pas au fork). Une clé déjà en file n'est pas ajoutée deux fois ;
+la file est bornée et `submit` ne bloque jamais la requête. Les tâches sont
+idempotentes : une tâche perdue (processus arrêté) est refaite à la demande
+ou par une commande CLI.
+"""
+import os
+import queue
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWorker:
+    def __init__(self, handler, name, max_queue=1000):
+        """handler(clé) exécute la tâche ; ses exceptions sont journalisées"""
+        self.handler = handler
+        self.name = name
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._pending = set()
+
+    def _ensure_worker(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pending = set()
+            threading.Thread(target=self._run, name=self.name, daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, key):
+        """Planifie la tâche ; sans effet si elle est déjà en file. Renvoie False si la file est pleine."""
+        self._ensure_worker()
+        with self._lock:
+            if key in self._pending:
+                return True
+            try:
+                self._queue.put_nowait(key)
+            except queue.Full:
+                return False
+            self._pending.add(key)
+        return True
+
+    def _run(self):
+        while True:
+            key = self._queue.get()
+            try:
+                self.handler(key)
+            except Exception:
+                logger.exception("Tâche %s impossible pour %s", self.name, key)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+    def pending(self):
+        return len(self._pending) if self._pid == os.getpid() else 0
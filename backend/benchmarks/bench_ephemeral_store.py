@@ -0,0 +1,93 @@
+"""
+Benchmark des backends du stockage éphémère (codes d'activation).
+
+    cd backend
+    python -m benchmarks.bench_ephemeral_store --ops 20000 --workers 4
+
+Mesure set/get/incr_attempts en un seul processus pour chaque backend, puis
+le backend SQLite avec plusieurs processus qui écrivent et relisent les clés
+des autres (le cas gunicorn multi-workers).
+"""
+import os
+import time
+import argparse
+import tempfile
+from multiprocessing import Pool
+
+from ephemeral_store import make_store
+
+
+def timed(fn, n):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "ops/s": int(n / sum(samples)),
+        "p50 µs": round(samples[n // 2] * 1e6, 1),
+        "p99 µs": round(samples[int(n * 0.99)] * 1e6, 1),
+    }
+
+
+def bench_store(store, n):
+    value = {"code": "123456", "matricule": "MAT-001"}
+    return {
+        "set": timed(lambda i: store.set(f"user{i}@simplon.co", value, 600), n),
+        "get": timed(lambda i: store.get(f"user{i}@simplon.co"), n),
+        "incr_attempts": timed(lambda i: store.incr_attempts(f"user{i}@simplon.co"), n),
+    }
+
+
+def shared_writer(args):
+    url, worker, n = args
+    store = make_store(url)
+    value = {"code": "123456", "matricule": "MAT-001"}
+    start = time.perf_counter()
+    for i in range(n):
+        store.set(f"w{worker}-{i}", value, 600)
+    return time.perf_counter() - start
+
+
+def shared_reader(args):
+    # Relit les clés écrites par un autre processus : vérifie le partage entre workers
+    url, worker, n, workers = args
+    store = make_store(url)
+    neighbour = (worker + 1) % workers
+    start = time.perf_counter()
+    seen = sum(1 for i in range(n) if store.get(f"w{neighbour}-{i}") is not None)
+    return time.perf_counter() - start, seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = "sqlite:///" + os.path.join(tmp, "bench.db")
+        for name, store_url in (("memory", "memory://"), ("sqlite", url)):
+            print(f"\n== {name} (1 processus, {args.ops} opérations) ==")
+            for op, result in bench_store(make_store(store_url), args.ops).items():
+                print(f"  {op:<14} {result}")
+
+        shared_url = "sqlite:///" + os.path.join(tmp, "shared.db")
+        make_store(shared_url)
+        per_worker = args.ops // args.workers
+        with Pool(args.workers) as pool:
+            write_times = pool.map(shared_writer, [
+                (shared_url, w, per_worker) for w in range(args.workers)
+            ])
+            reads = pool.map(shared_reader, [
+                (shared_url, w, per_worker, args.workers) for w in range(args.workers)
+            ])
+        total = args.workers * per_worker
+        print(f"\n== sqlite partagé ({args.workers} processus, {per_worker} clés chacun) ==")
+        print(f"  set concurrents  {int(total / max(write_times))} ops/s")
+        print(f"  get concurrents  {int(total / max(r[0] for r in reads))} ops/s")
+        print(f"  clés d'un autre processus visibles : {sum(r[1] for r in reads)}/{total}")
+
+if __name__ == "__main__":
+    main()
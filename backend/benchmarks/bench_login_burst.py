@@ -0,0 +1,117 @@
+"""
+Test de charge : rafale de "credential stuffing" sur /api/login.
+
+    cd backend
+    python -m benchmarks.bench_login_burst --attackers 16 --duration 10
+
+Des threads attaquants envoient des mots de passe faux en continu depuis
+quelques IP, pendant qu'un utilisateur légitime se connecte depuis sa propre
+IP. Le scénario est joué sans puis avec limitation de débit ; on compare la
+latence (p50/p95/p99) des connexions légitimes.
+
+Utilise une application isolée (create_app) sur une base et un stockage
+éphémère jetables (dossier temporaire).
+"""
+import os
+import time
+import argparse
+import tempfile
+import threading
+from collections import Counter
+
+
+VICTIMS = 500
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000 if samples else float("nan")
+
+
+def run_scenario(app, attackers, attacker_ips, duration, limited):
+    from extensions import resources
+    resources(app).ensure()["rate_limiter"].enabled = limited
+    stop = threading.Event()
+    statuses = Counter()
+    legit = []
+
+    def attacker(n):
+        client = app.test_client()
+        i = 0
+        while not stop.is_set():
+            ip = f"203.0.113.{(n + i) % attacker_ips + 1}"
+            r = client.post("/api/login", json={"identifier": f"victime{i % VICTIMS}@simplon.co", "password": "123456"},
+                            environ_base={"REMOTE_ADDR": ip})
+            statuses[r.status_code] += 1
+            i += 1
+
+    def user():
+        client = app.test_client()
+        while not stop.is_set():
+            start = time.perf_counter()
+            r = client.post("/api/login", json={"identifier": "bench", "password": "motdepasse"},
+                            environ_base={"REMOTE_ADDR": "198.51.100.7"})
+            legit.append(time.perf_counter() - start)
+            assert r.status_code == 200, r.status_code
+            time.sleep(0.2)
+
+    threads = [threading.Thread(target=attacker, args=(n,)) for n in range(attackers)]
+    threads.append(threading.Thread(target=user))
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    label = "avec limitation" if limited else "sans limitation"
+    print(f"\n== {label} ({attackers} attaquants, {attacker_ips} IP, {duration}s) ==")
+    print(f"  connexions légitimes : {len(legit)}  "
+          f"p50 {percentile(legit, .5):.0f} ms  p95 {percentile(legit, .95):.0f} ms  p99 {percentile(legit, .99):.0f} ms")
+    print(f"  requêtes attaquantes : {dict(statuses)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--attackers", type=int, default=16)
+    parser.add_argument("--attacker-ips", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        from app import create_app, initialize
+        from extensions import db, activity_log, metrics
+        from models import User
+        from werkzeug.security import generate_password_hash
+
+        app = create_app({
+            "DATA_DIR": tmp,
+            "UPLOAD_FOLDER": os.path.join(tmp, "uploads"),
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(tmp, "bench.db"),
+            "CODE_STORE_URL": "memory://",
+        })
+        initialize(app)
+        with app.app_context():
+            db.session.add(User(
+                matricule="MAT-999", email="bench@simplon.co", pseudo="bench",
+                password=generate_password_hash("motdepasse")
+            ))
+            # Comptes visés : chaque essai coûte une vérification de hash complète
+            victim_hash = generate_password_hash("secret-inconnu")
+            db.session.add_all([
+                User(matricule=f"MAT-{i}", email=f"victime{i}@simplon.co",
+                                pseudo=f"victime{i}", password=victim_hash)
+                for i in range(VICTIMS)
+            ])
+            db.session.commit()
+
+        for limited in (False, True):
+            run_scenario(app, args.attackers, args.attacker_ips, args.duration, limited)
+        # Journal différé et métriques écrits avant la suppression du dossier temporaire
+        with app.app_context():
+            activity_log.close()
+            metrics.close()
+
+
+if __name__ == "__main__":
+    main()
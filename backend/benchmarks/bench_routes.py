@@ -0,0 +1,452 @@
+"""
+Latence, débit et requêtes SQL de chaque route, comparés à une référence.
+
+    cd backend
+    python -m benchmarks.seed --dir /tmp/simplon-bench --scale 0.1
+    python -m benchmarks.bench_routes --dir /tmp/simplon-bench                   # client de test Flask
+    python -m benchmarks.bench_routes --dir /tmp/simplon-bench --gunicorn        # vrai serveur HTTP
+    python -m benchmarks.bench_routes --dir /tmp/simplon-bench --save-baseline   # nouvelle référence
+
+Chaque scénario rejoue une route de l'application avec des paramètres tirés de la
+base de test (projets, auteurs prolifiques, gros téléchargeurs…). On mesure
+p50/p95/p99, le débit et, avec le client de test, le nombre moyen de requêtes
+SQL par appel. Les routes qui modifient la base passent en dernier, celles
+qui suppriment consomment des éléments tirés au départ.
+
+Le résultat est comparé à `benchmarks/baseline.json` (même mode) : une route
+dont le p95 dépasse la référence de plus de --tolerance (et de plus de
+--min-delta-ms), qui fait plus de requêtes SQL ou plus d'erreurs 5xx est
+une régression ; le code de sortie est alors 1. Une référence n'a de sens que
+sur la même machine et la même échelle de base (`seed.json`).
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import threading
+import subprocess
+import http.client
+from collections import Counter
+from urllib.parse import urlencode
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_login_burst import percentile
+from benchmarks.seed import DEFAULT_DIR, BACKEND_DIR, PASSWORD, WORDS, load_app, read_meta, scratch_env
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Routes volontairement absentes des scénarios
+SKIPPED = {
+    ("POST", "/send-code"): "envoie un email",
+    ("POST", "/verify-code"): "suppose un code reçu par email",
+    ("POST", "/api/activation"): "suppose un code vérifié",
+    ("GET", "/api/admin/activities/stream"): "flux SSE de longue durée",
+    ("DELETE", "/api/admin/activities"): "vide tout le journal de la base de test",
+    ("GET", "/api/uploads/<upload_id>"): "séquence d'upload par morceaux",
+    ("PUT", "/api/uploads/<upload_id>/chunks/<int:index>"): "séquence d'upload par morceaux",
+    ("POST", "/api/uploads/<upload_id>/finalize"): "séquence d'upload par morceaux",
+}
+
+
+class Scenario:
+    def __init__(self, name, method, rule, build, share=1.0):
+        """build(fixtures, i) -> requête ; share : part du nombre de requêtes par route"""
+        self.name = name
+        self.method = method
+        self.rule = rule
+        self.build = build
+        self.share = share
+
+
+def get(path, **params):
+    return {"path": path + ("?" + urlencode(params, doseq=True) if params else "")}
+
+
+SCENARIOS = [
+    # Lecture
+    Scenario("projects", "GET", "/api/projects", lambda fx, i: get("/api/projects"), share=0.1),
+    Scenario("projects_page", "GET", "/api/projects", lambda fx, i: get("/api/projects", limit=20)),
+    Scenario("projects_fields", "GET", "/api/projects",
+             lambda fx, i: get("/api/projects", limit=50, fields="id,titre,auteurNom")),
+    Scenario("project", "GET", "/api/projects/<project_id>",
+             lambda fx, i: get(f"/api/projects/{fx.pick('projects', i)}")),
+    Scenario("user_projects", "GET", "/api/projects/user/<user_id>",
+             lambda fx, i: get(f"/api/projects/user/{fx.pick('authors', i)}")),
+    Scenario("search_text", "GET", "/api/projects/search",
+             lambda fx, i: get("/api/projects/search", q=fx.pick('words', i))),
+    Scenario("search_tech", "GET", "/api/projects/search",
+             lambda fx, i: get("/api/projects/search", tech=fx.pick('techs', i, 2), tech_mode="all")),
+    Scenario("technologies", "GET", "/api/technologies", lambda fx, i: get("/api/technologies")),
+    Scenario("project_files", "GET", "/api/projects/<project_id>/files",
+             lambda fx, i: get(f"/api/projects/{fx.pick('projects', i)}/files")),
+    Scenario("project_file_entry", "GET", "/api/projects/<project_id>/files/<path:entry_path>",
+             lambda fx, i: get(f"/api/projects/{fx.pick('projects', i)}/files/{fx.entry_path}")),
+    Scenario("image", "GET", "/api/images/<name>", lambda fx, i: get(f"/api/images/{fx.image}")),
+    Scenario("my_downloads", "GET", "/api/my-downloads/<user_id>",
+             lambda fx, i: get(f"/api/my-downloads/{fx.pick('downloaders', i)}")),
+    Scenario("profile", "GET", "/api/user/profile",
+             lambda fx, i: get("/api/user/profile", user_id=fx.pick('users', i))),
+    Scenario("admin_users", "GET", "/api/admin/users", lambda fx, i: get("/api/admin/users"), share=0.25),
+    Scenario("admin_projects", "GET", "/api/admin/projects", lambda fx, i: get("/api/admin/projects", limit=50)),
+    Scenario("admin_activities", "GET", "/api/admin/activities", lambda fx, i: get("/api/admin/activities")),
+    Scenario("admin_activities_filtered", "GET", "/api/admin/activities",
+             lambda fx, i: get("/api/admin/activities", action="Téléchargement",
+                               user_id=fx.pick('downloaders', i), limit=50)),
+    Scenario("admin_activities_since", "GET", "/api/admin/activities",
+             lambda fx, i: get("/api/admin/activities", since=fx.last_week, limit=50)),
+    Scenario("health_live", "GET", "/api/health/live", lambda fx, i: get("/api/health/live")),
+    Scenario("health_ready", "GET", "/api/health/ready", lambda fx, i: get("/api/health/ready")),
+    Scenario("health_stats", "GET", "/api/health/stats", lambda fx, i: get("/api/health/stats")),
+    Scenario("health", "GET", "/api/health", lambda fx, i: get("/api/health")),
+    Scenario("metrics", "GET", "/metrics", lambda fx, i: get("/metrics"), share=0.25),
+    # Écriture
+    Scenario("login", "POST", "/api/login", lambda fx, i: {
+        "json": {"identifier": fx.pick('pseudos', i), "password": PASSWORD}}, share=0.25),
+    Scenario("update_user", "PATCH", "/api/users/<user_id>", lambda fx, i: {
+        "path": f"/api/users/{fx.pick('users', i)}", "json": {}}),
+    Scenario("download_file", "GET", "/api/download-file/<project_id>",
+             lambda fx, i: get(f"/api/download-file/{fx.pick('projects', i)}", user_id=fx.pick('users', i))),
+    Scenario("record_download", "POST", "/api/record-download", lambda fx, i: {
+        "json": {"user_id": fx.pick('users', i), "project_id": fx.pick('projects', i)}}),
+    Scenario("create_project", "POST", "/api/projects", lambda fx, i: {
+        "form": {"titre": f"Projet bench {i}", "description": fx.pick('words', i),
+                 "auteurId": fx.pick('authors', i), "auteurNom": "bench",
+                 "technologies": fx.pick('techs', i, 2), "categorie": "Web"}}),
+    Scenario("create_upload", "POST", "/api/uploads", lambda fx, i: {
+        "json": {"filename": f"bench-{i}.zip", "size": 1024}}),
+    Scenario("bulk_role", "POST", "/api/admin/users/bulk-role", lambda fx, i: {
+        "json": {"ids": fx.pick('users', i, 20), "role": "stagiaire"}}, share=0.25),
+    Scenario("import_users", "POST", "/api/admin/users/import", lambda fx, i: {
+        "body": fx.import_csv(i), "headers": {"Content-Type": "text/csv"}}, share=0.1),
+    # Suppression (éléments consommés)
+    Scenario("delete_activity", "DELETE", "/api/admin/activity/<activity_id>",
+             lambda fx, i: {"path": f"/api/admin/activity/{fx.take('activities')}"}),
+    Scenario("delete_project", "DELETE", "/api/admin/project/<project_id>",
+             lambda fx, i: {"path": f"/api/admin/project/{fx.take('doomed')}"}, share=0.25),
+    Scenario("bulk_delete", "POST", "/api/admin/projects/bulk-delete", lambda fx, i: {
+        "json": {"ids": [fx.take('doomed') for _ in range(20)]}}, share=0.1),
+]
+
+
+# -----------------------------
+# DONNÉES DE TEST
+# -----------------------------
+class Fixtures:
+    """Identifiants tirés de la base de test, partagés par les scénarios"""
+
+    def __init__(self, pool_size):
+        from sqlalchemy import func
+        from extensions import db
+        from images import variant_name
+        from models import User, Project, Counter, Technology, Activity, ArchiveManifest, GLOBAL_SCOPE
+        sample = lambda column, n=pool_size, *where: [row[0] for row in db.session.query(column).filter(*where)
+                                                      .order_by(func.random()).limit(n)]
+        top = lambda name: [row[0] for row in db.session.query(Counter.scope)
+                            .filter(Counter.name == name, Counter.scope != GLOBAL_SCOPE)
+                            .order_by(Counter.value.desc()).limit(pool_size)]
+        # Projets avec archive (ceux créés par un passage précédent n'en ont pas)
+        projects = sample(Project.id, 6 * pool_size, Project.archiveSha256.isnot(None))
+        self.pools = {
+            "projects": projects[:pool_size],
+            "users": sample(User.id),
+            "pseudos": sample(User.pseudo),
+            "authors": top("projects"),
+            "downloaders": top("downloads"),
+            "techs": [row[0] for row in db.session.query(Technology.nom)],
+            "words": WORDS,
+        }
+        self.consumable = {
+            "doomed": projects[pool_size:],
+            "activities": sample(Activity.id, 2 * pool_size),
+        }
+        self._lock = threading.Lock()
+        manifest = ArchiveManifest.query.filter_by(status="pret").first()
+        self.entry_path = next(e["path"] for e in manifest.entries if not e["dir"]) if manifest else "README.md"
+        image = db.session.query(Project.images)\
+            .filter(db.cast(Project.images, db.Text).contains("sha256")).first()
+        self.image = variant_name(image[0][0]["sha256"], "thumb") if image and image[0] else "absente.png"
+        self.last_week = (datetime.utcnow() - timedelta(days=7)).isoformat()
+        self.run_id = int(time.time())
+
+    def pick(self, pool, i, n=None):
+        values = self.pools[pool]
+        if n is None:
+            return values[i % len(values)]
+        return [values[(i + k) % len(values)] for k in range(n)]
+
+    def take(self, pool):
+        with self._lock:
+            values = self.consumable[pool]
+            return values.pop() if values else "epuise"
+
+    def import_csv(self, i):
+        rows = ["matricule,email,pseudo,password"] + [
+            f"MAT-B{self.run_id}{i:05d}{k},bench{self.run_id}-{i}-{k}@simplon.bench,"
+            f"bench{self.run_id}-{i}-{k},{PASSWORD}"
+            for k in range(5)
+        ]
+        return ("\n".join(rows) + "\n").encode()
+
+
+# -----------------------------
+# CLIENTS
+# -----------------------------
+def encode(req):
+    """(méthode, chemin, corps, en-têtes) d'une requête de scénario"""
+    headers = dict(req.get("headers", {}))
+    body = req.get("body")
+    if "json" in req:
+        body = json.dumps(req["json"]).encode()
+        headers["Content-Type"] = "application/json"
+    elif "form" in req:
+        body = urlencode(req["form"], doseq=True).encode()
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+    return body, headers
+
+
+class TestClientDriver:
+    """Appels en processus ; compte les requêtes SQL du thread de la requête"""
+    label = "client"
+
+    def __init__(self, app):
+        from sqlalchemy import event
+        from extensions import db
+        self.client = app.test_client()
+        self._local = threading.local()
+
+        with app.app_context():
+            engine = db.engine
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count(conn, cursor, statement, parameters, context, executemany):
+            self._local.sql = getattr(self._local, "sql", 0) + 1
+
+    def send(self, method, path, req):
+        body, headers = encode(req)
+        self._local.sql = 0
+        start = time.perf_counter()
+        response = self.client.open(path, method=method, data=body, headers=headers)
+        response.get_data()
+        response.close()
+        return response.status_code, time.perf_counter() - start, self._local.sql
+
+
+class HttpDriver:
+    """Appels HTTP (connexion persistante par thread) vers un serveur déjà lancé"""
+    label = "gunicorn"
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self._local = threading.local()
+
+    def send(self, method, path, req):
+        body, headers = encode(req)
+        start = time.perf_counter()
+        for attempt in (1, 2):
+            conn = getattr(self._local, "conn", None) or http.client.HTTPConnection(self.host, self.port, timeout=60)
+            self._local.conn = conn
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # Connexion keep-alive fermée par le serveur : une nouvelle tentative
+                conn.close()
+                self._local.conn = None
+                if attempt == 2:
+                    raise
+        return response.status, time.perf_counter() - start, None
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(workdir, workers, threads):
+    port = free_port()
+    command = [
+        sys.executable, "-m", "gunicorn", "--config", os.path.join(BACKEND_DIR, "gunicorn.conf.py"),
+        "--pythonpath", BACKEND_DIR, "--workers", str(workers), "--threads", str(threads),
+        "--bind", f"127.0.0.1:{port}", "--log-level", "warning",
+    ]
+    server = subprocess.Popen(command, cwd=workdir, env={**os.environ, **scratch_env(workdir)})
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit("gunicorn s'est arrêté au démarrage (pip install gunicorn ?)")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/health/live")
+            if conn.getresponse().status == 200:
+                return server, port
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    sys.exit("gunicorn ne répond pas")
+
+
+# -----------------------------
+# MESURE
+# -----------------------------
+def run_scenario(driver, fx, scenario, requests, concurrency, warmup):
+    n = max(5, int(requests * scenario.share))
+
+    def one(i):
+        req = scenario.build(fx, i)
+        return driver.send(scenario.method, req.get("path", scenario.rule), req)
+
+    for i in range(min(warmup, n)):
+        one(n + i)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(n)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [r[1] for r in results]
+    sql = [r[2] for r in results if r[2] is not None]
+    statuses = Counter(r[0] for r in results)
+    return {
+        "requests": n,
+        "p50": round(percentile(latencies, .50), 2),
+        "p95": round(percentile(latencies, .95), 2),
+        "p99": round(percentile(latencies, .99), 2),
+        "rps": round(n / elapsed, 1),
+        "sql": round(sum(sql) / len(sql), 1) if sql else None,
+        "errors": sum(v for k, v in statuses.items() if k >= 500),
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+def check_coverage(app):
+    """Routes de l'application sans scénario ni raison d'être ignorées"""
+    covered = {(s.method, s.rule) for s in SCENARIOS} | set(SKIPPED)
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == "static":
+            continue
+        for method in sorted(rule.methods - {"HEAD", "OPTIONS"}):
+            if (method, rule.rule) not in covered:
+                missing.append(f"{method} {rule.rule}")
+    return missing
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Liste des régressions par rapport à la référence"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if current["p95"] > base["p95"] * (1 + tolerance) and current["p95"] - base["p95"] > min_delta_ms:
+            regressions.append(f"{name} : p95 {base['p95']} -> {current['p95']} ms")
+        if current["sql"] is not None and base.get("sql") is not None and current["sql"] > base["sql"] + 0.5:
+            regressions.append(f"{name} : SQL {base['sql']} -> {current['sql']} requêtes")
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{name} : erreurs 5xx {base.get('errors', 0)} -> {current['errors']}")
+    return regressions
+
+
+def print_results(results, baseline):
+    print(f"\n{'scénario':<26} {'n':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'SQL':>5}  {'p95 réf.':>9}  statuts")
+    for name, r in results.items():
+        base = baseline.get(name, {}).get("p95")
+        delta = f"{(r['p95'] / base - 1) * 100:+.0f} %" if base else "-"
+        sql = f"{r['sql']:.1f}" if r["sql"] is not None else "-"
+        print(f"{name:<26} {r['requests']:>5} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f} "
+              f"{r['rps']:>8.1f} {sql:>5}  {delta:>9}  {r['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="base de test créée par benchmarks.seed")
+    parser.add_argument("--requests", type=int, default=200, help="requêtes mesurées par scénario")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="requêtes simultanées (défaut : 1 en client de test, 16 avec gunicorn)")
+    parser.add_argument("--only", help="scénarios à lancer, séparés par des virgules")
+    parser.add_argument("--gunicorn", action="store_true", help="mesure à travers un vrai serveur gunicorn")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="enregistre les résultats comme référence")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="hausse du p95 tolérée (0.25 = 25 %%)")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="hausse du p95 ignorée en dessous")
+    args = parser.parse_args()
+
+    workdir = os.path.abspath(args.dir)
+    meta = read_meta(workdir)
+    if meta is None:
+        sys.exit(f"Pas de base de test dans {workdir} : lancer d'abord python -m benchmarks.seed")
+    app = load_app(workdir)
+    from extensions import activity_log
+    scenarios = [s for s in SCENARIOS if not args.only or s.name in args.only.split(",")]
+
+    missing = check_coverage(app)
+    if missing:
+        print(f"⚠️  Routes sans scénario : {', '.join(missing)}")
+
+    server = None
+    if args.gunicorn:
+        server, port = start_gunicorn(workdir, args.workers, args.threads)
+        driver = HttpDriver("127.0.0.1", port)
+    else:
+        driver = TestClientDriver(app)
+    concurrency = args.concurrency or (16 if args.gunicorn else 1)
+
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    baseline = stored.get(driver.label, {})
+    if baseline and baseline.get("meta", {}).get("volumes") != meta["volumes"]:
+        print(f"⚠️  Référence mesurée sur une autre base : {baseline['meta'].get('volumes')}")
+
+    results = {}
+    try:
+        with app.app_context():
+            fx = Fixtures(pool_size=max(args.requests, 100))
+        for scenario in scenarios:
+            results[scenario.name] = run_scenario(driver, fx, scenario, args.requests, concurrency, args.warmup)
+            print(f"  {scenario.name:<26} p95 {results[scenario.name]['p95']:>8.2f} ms", flush=True)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        with app.app_context():
+            activity_log.close()
+
+    routes = baseline.get("routes", {})
+    print_results(results, routes)
+    regressions = compare(results, routes, args.tolerance, args.min_delta_ms)
+
+    if args.save_baseline:
+        stored[driver.label] = {
+            "meta": {"volumes": meta["volumes"], "requests": args.requests, "concurrency": concurrency,
+                     "python": platform.python_version(), "machine": platform.platform(),
+                     "date": datetime.utcnow().isoformat(timespec="seconds")},
+            "routes": {**routes, **results},
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(stored, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nRéférence enregistrée : {args.baseline}")
+    elif regressions:
+        print("\n❌ Régressions :")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    elif routes:
+        print("\n✅ Aucune régression par rapport à la référence")
+
+
+if __name__ == "__main__":
+    main()
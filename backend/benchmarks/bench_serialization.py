@@ -0,0 +1,92 @@
+"""
+Coût CPU de la sérialisation JSON et octets envoyés pour une liste de projets.
+
+    cd backend
+    python -m benchmarks.seed --dir /tmp/simplon-bench --scale 0.1   # 10k projets
+    python -m benchmarks.bench_serialization --dir /tmp/simplon-bench --projects 10000
+
+Les projets sont lus une fois dans la base de test, puis la réponse de
+GET /api/projects (liste complète) est construite de deux façons :
+
+- avant : .isoformat() par ligne et fournisseur JSON par défaut de Flask
+  (json standard, clés triées, non-ASCII échappé en \\uXXXX) ;
+- après : serializers.py (datetime passés tels quels, orjson, UTF-8).
+
+Les temps sont des temps CPU du processus (meilleur de --repeat essais),
+séparés entre construction des dictionnaires et encodage. Les tailles sont
+données brutes, en gzip et en brotli, avec le temps de compression : sur
+les routes en cache (cached_response), ce temps est payé une fois par
+encodage et par version des données, pas à chaque requête.
+"""
+import time
+import argparse
+
+from benchmarks.seed import DEFAULT_DIR, load_app, read_meta
+
+
+def cpu_ms(fn, repeat):
+    """Meilleur temps CPU de fn() en ms, et son dernier résultat"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.process_time()
+        result = fn()
+        best = min(best, time.process_time() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="base de test créée par benchmarks.seed")
+    parser.add_argument("--projects", type=int, default=10_000, help="taille de la liste")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    meta = read_meta(args.dir)
+    if meta is None:
+        parser.error(f"{args.dir} : pas de base de test (lancer benchmarks.seed)")
+
+    app = load_app(args.dir)
+    import serializers
+    from compression import HAS_BROTLI, GZIP_LEVEL, BROTLI_QUALITY, encode
+    from extensions import db
+    from models import Project
+    from flask.json.provider import DefaultJSONProvider
+
+    with app.app_context():
+        rows = Project.query.order_by(Project.dateCreation.desc(), Project.id.desc())\
+            .limit(args.projects).all()
+        db.session.expunge_all()
+    if len(rows) < args.projects:
+        print(f"Attention : {len(rows)} projets seulement dans la base (échelle {meta['scale']})")
+
+    old_spec = {**serializers.PROJECT_FIELDS, "dateCreation": ("dateCreation", serializers.iso)}
+    old_provider = DefaultJSONProvider(app)
+    new_provider = app.json
+
+    with app.app_context():
+        old_build, old_items = cpu_ms(lambda: [serializers.serialize_fields(p, old_spec) for p in rows], args.repeat)
+        new_build, new_items = cpu_ms(
+            lambda: [serializers.serialize_fields(p, serializers.PROJECT_FIELDS) for p in rows], args.repeat)
+        old_encode, old_body = cpu_ms(lambda: old_provider.response(old_items).get_data(), args.repeat)
+        new_encode, new_body = cpu_ms(lambda: new_provider.response(new_items).get_data(), args.repeat)
+
+    assert serializers.loads(old_body) == serializers.loads(new_body), "les deux chemins divergent"
+
+    print(f"{len(rows)} projets, backend JSON : {'orjson' if serializers.HAS_ORJSON else 'json (repli)'}")
+    print(f"\n{'CPU (ms)':<12}{'dicts':>10}{'encodage':>10}{'total':>10}")
+    print(f"{'avant':<12}{old_build:>10.1f}{old_encode:>10.1f}{old_build + old_encode:>10.1f}")
+    print(f"{'après':<12}{new_build:>10.1f}{new_encode:>10.1f}{new_build + new_encode:>10.1f}")
+    saved = (old_build + old_encode) - (new_build + new_encode)
+    print(f"économie : {saved:.1f} ms par réponse ({saved / (old_build + old_encode):.0%})")
+
+    print(f"\n{'octets':<14}{'avant':>12}{'après':>12}{'CPU (ms)':>10}")
+    print(f"{'brut':<14}{len(old_body):>12,}{len(new_body):>12,}{'-':>10}")
+    encodings = [("gzip", f"gzip -{GZIP_LEVEL}")] + ([("br", f"brotli q{BROTLI_QUALITY}")] if HAS_BROTLI else [])
+    for encoding, name in encodings:
+        elapsed, new_size = cpu_ms(lambda: len(encode(new_body, encoding)), args.repeat)
+        old_size = len(encode(old_body, encoding))
+        print(f"{name:<14}{old_size:>12,}{new_size:>12,}{elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
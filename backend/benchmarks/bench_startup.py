@@ -0,0 +1,209 @@
+"""
+Démarrage à froid de l'application et démarrage des workers gunicorn.
+
+    cd backend
+    python -m benchmarks.seed --dir /tmp/simplon-bench --scale 0.1
+    python -m benchmarks.bench_startup --dir /tmp/simplon-bench
+    python -m benchmarks.bench_startup --dir /tmp/simplon-bench --preload off   # init dans chaque worker
+
+    # avant / après : même base, autre copie du code
+    git worktree add /tmp/avant <commit> && \\
+        python -m benchmarks.bench_startup --backend /tmp/avant/backend --target app:app
+
+Démarrage à froid : dans un processus neuf, temps d'import et de construction
+de l'application (`--target`, module:expression), puis du premier appel à
+`--path` (il paie l'initialisation paresseuse) et du second.
+
+gunicorn : le fichier gunicorn.conf.py du code mesuré est chargé, complété
+par des hooks qui horodatent le maître prêt (`when_ready`) et chaque worker,
+du fork (`pre_fork`) à la fin de son initialisation (`post_worker_init`).
+Une rafale de premières requêtes (deux par worker) mesure ensuite ce qu'il
+reste à payer au premier appel. Médianes sur --repeat lancements.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_routes import free_port
+from benchmarks.seed import DEFAULT_DIR, BACKEND_DIR, read_meta, scratch_env
+
+
+PROBE = r"""
+import sys, time, json, importlib
+start = time.perf_counter()
+module_name, _, expression = sys.argv[1].partition(":")
+module = importlib.import_module(module_name)
+app = eval(expression, vars(module))
+built = time.perf_counter()
+client = app.test_client()
+status = client.get(sys.argv[2]).status_code
+first = time.perf_counter()
+client.get(sys.argv[2])
+second = time.perf_counter()
+print(json.dumps({"build": built - start, "first": first - built, "second": second - first, "status": status}))
+"""
+
+HOOKS = """
+import os, time, runpy
+if os.path.exists({base!r}):
+    globals().update({{k: v for k, v in runpy.run_path({base!r}).items() if not k.startswith("__")}})
+{preload}
+_base_hooks = {{name: globals().get(name) for name in ("when_ready", "pre_fork", "post_worker_init")}}
+
+
+def _log(event, age=0):
+    with open({log!r}, "a") as f:
+        f.write(f"{{event}} {{age}} {{time.time()}}\\n")
+
+
+def when_ready(server):
+    if _base_hooks["when_ready"]:
+        _base_hooks["when_ready"](server)
+    _log("ready")
+
+
+def pre_fork(server, worker):
+    if _base_hooks["pre_fork"]:
+        _base_hooks["pre_fork"](server, worker)
+    _log("fork", worker.age)
+
+
+def post_worker_init(worker):
+    if _base_hooks["post_worker_init"]:
+        _base_hooks["post_worker_init"](worker)
+    _log("worker", worker.age)
+"""
+
+
+def app_env(workdir, backend):
+    return {**os.environ, **scratch_env(workdir), "PYTHONPATH": backend}
+
+
+def cold_start(workdir, backend, target, path):
+    """Un processus neuf : import + construction, premier et second appel (s)"""
+    launched = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", PROBE, target, path], cwd=workdir,
+                            env=app_env(workdir, backend), capture_output=True, text=True)
+    total = time.perf_counter() - launched
+    if output.returncode != 0:
+        sys.exit(f"Échec du démarrage à froid :\n{output.stderr[-2000:]}")
+    return {**json.loads(output.stdout.strip().splitlines()[-1]), "process": total}
+
+
+def first_requests(port, count, path):
+    def one(_):
+        start = time.perf_counter()
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        conn.request("GET", path)
+        status = conn.getresponse().status
+        conn.close()
+        return status, time.perf_counter() - start
+
+    with ThreadPoolExecutor(count) as pool:
+        return list(pool.map(one, range(count)))
+
+
+def gunicorn_start(workdir, backend, target, workers, preload, path):
+    """Lance gunicorn, relève les horodatages des hooks et une rafale de premières requêtes"""
+    log = tempfile.NamedTemporaryFile(suffix=".log", delete=False).name
+    conf = tempfile.NamedTemporaryFile("w", suffix=".py", delete=False)
+    with conf:
+        conf.write(HOOKS.format(
+            base=os.path.join(backend, "gunicorn.conf.py"), log=log,
+            preload="" if preload == "config" else f"preload_app = {preload == 'on'}"
+        ))
+    port = free_port()
+    command = [sys.executable, "-m", "gunicorn", "--config", conf.name, "--pythonpath", backend,
+               "--workers", str(workers), "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+    command.append(target)
+
+    launched = time.time()
+    server = subprocess.Popen(command, cwd=workdir, env=app_env(workdir, backend))
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            if server.poll() is not None:
+                sys.exit("gunicorn s'est arrêté au démarrage (pip install gunicorn ?)")
+            if time.monotonic() > deadline:
+                sys.exit("gunicorn ne démarre pas")
+            with open(log) as f:
+                events = [line.split() for line in f]
+            if sum(1 for e in events if e[0] == "worker") >= workers:
+                break
+            time.sleep(0.01)
+        burst = first_requests(port, 2 * workers, path)
+    finally:
+        server.terminate()
+        server.wait()
+        os.remove(conf.name)
+        os.remove(log)
+
+    forks = {int(age): float(t) for event, age, t in events if event == "fork"}
+    ready = {int(age): float(t) for event, age, t in events if event == "worker"}
+    master = next(float(t) for event, _, t in events if event == "ready")
+    boots = [ready[age] - forks[age] for age in ready]
+    latencies = [elapsed for _, elapsed in burst]
+    return {
+        "master": master - launched,
+        "all_workers": max(ready.values()) - launched,
+        "worker_boot": statistics.median(boots),
+        "worker_boot_max": max(boots),
+        "first_p50": statistics.median(latencies),
+        "first_max": max(latencies),
+        "errors": sum(1 for status, _ in burst if status >= 500),
+    }
+
+
+def median_of(runs):
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0] if key != "status"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="base de test créée par benchmarks.seed")
+    parser.add_argument("--backend", default=BACKEND_DIR, help="dossier backend du code à mesurer")
+    parser.add_argument("--target", default="app:create_app()", help="application WSGI (module:expression)")
+    parser.add_argument("--path", default="/api/projects?limit=1", help="route du premier appel")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--preload", choices=("config", "on", "off"), default="config",
+                        help="preload_app de gunicorn : celui de gunicorn.conf.py, forcé ou désactivé")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-gunicorn", action="store_true")
+    args = parser.parse_args()
+
+    meta = read_meta(args.dir)
+    if meta is None:
+        parser.error(f"{args.dir} : pas de base de test (lancer benchmarks.seed)")
+    workdir, backend = os.path.abspath(args.dir), os.path.abspath(args.backend)
+    print(f"Code : {backend} ({args.target}) — base : {workdir} (échelle {meta['scale']})")
+
+    cold = median_of([cold_start(workdir, backend, args.target, args.path) for _ in range(args.repeat)])
+    print("\nDémarrage à froid (ms, médianes)")
+    print(f"  import + construction   {cold['build'] * 1000:8.1f}")
+    print(f"  premier appel           {cold['first'] * 1000:8.1f}")
+    print(f"  second appel            {cold['second'] * 1000:8.1f}")
+    print(f"  processus complet       {cold['process'] * 1000:8.1f}")
+    if args.skip_gunicorn:
+        return
+
+    runs = [gunicorn_start(workdir, backend, args.target, args.workers, args.preload, args.path)
+            for _ in range(args.repeat)]
+    boot = median_of(runs)
+    print(f"\ngunicorn, {args.workers} workers, preload={args.preload} (ms, médianes)")
+    print(f"  maître prêt             {boot['master'] * 1000:8.1f}")
+    print(f"  fork -> worker prêt     {boot['worker_boot'] * 1000:8.1f}   (max {boot['worker_boot_max'] * 1000:.1f})")
+    print(f"  tous les workers prêts  {boot['all_workers'] * 1000:8.1f}")
+    print(f"  premières requêtes      {boot['first_p50'] * 1000:8.1f}   (max {boot['first_max'] * 1000:.1f})")
+    if boot["errors"]:
+        print(f"  ⚠️ erreurs 5xx : {boot['errors']}")
+
+
+if __name__ == "__main__":
+    main()
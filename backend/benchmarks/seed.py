@@ -0,0 +1,302 @@
+"""
+Génère une base de test volumineuse et réaliste dans un dossier jetable.
+
+    cd backend
+    python -m benchmarks.seed --dir /tmp/simplon-bench              # 100k projets, 1M téléchargements, 5M activités
+    python -m benchmarks.seed --dir /tmp/simplon-bench --scale 0.05 # essai rapide
+
+Le dossier contient la base SQLite, le stockage éphémère et les uploads
+(une archive et une image partagées par les projets). Les volumes suivent des
+lois de puissance : quelques projets concentrent les téléchargements, quelques
+utilisateurs l'essentiel de l'activité. Les identifiants sont tirés d'un
+générateur initialisé par `--seed` : deux bases de même échelle sont identiques
+(aux dates près, relatives au moment du remplissage).
+
+Tous les comptes ont le mot de passe PASSWORD. `seed.json` décrit la base.
+"""
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import zipfile
+import argparse
+import tempfile
+import itertools
+from datetime import datetime, timedelta
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), "simplon-bench")
+
+# Volumes à l'échelle 1
+VOLUMES = {"users": 5_000, "projects": 100_000, "downloads": 1_000_000, "activities": 5_000_000}
+BATCH_SIZE = 10_000
+PASSWORD = "motdepasse"
+
+TECHNOLOGIES = [
+    "Python", "JavaScript", "TypeScript", "React", "Vue", "Angular", "Node.js", "Flask",
+    "Django", "FastAPI", "PHP", "Laravel", "Symfony", "Java", "Spring", "Kotlin", "Swift",
+    "Flutter", "Dart", "C#", ".NET", "Go", "Rust", "SQL", "PostgreSQL", "MongoDB", "Docker",
+    "HTML", "CSS", "Tailwind",
+]
+CATEGORIES = ["Web", "Mobile", "Data", "IA", "DevOps", "Jeu", "Outil", "API"]
+WORDS = [
+    "gestion", "plateforme", "application", "tableau", "bord", "réservation", "bibliothèque",
+    "boutique", "portfolio", "chat", "messagerie", "météo", "quiz", "agenda", "budget",
+    "recettes", "covoiturage", "inventaire", "blog", "forum", "annuaire", "stage", "formation",
+    "paiement", "carte", "analyse", "prédiction", "tri", "recherche", "notification",
+]
+ACTIONS = [
+    ("Connexion", 50), ("Téléchargement", 30), ("Nouveau projet", 6),
+    ("Mise à jour profil", 6), ("Inscription", 3), ("Suppression projet", 1),
+]
+
+
+def scratch_env(workdir):
+    """Variables d'environnement de l'application pour un dossier de test"""
+    store = "sqlite:///" + os.path.join(workdir, "ephemeral.db")
+    return {
+        "DATABASE_URL": "sqlite:///" + os.path.join(workdir, "simplon_hub.db"),
+        "RATE_LIMIT_STORE_URL": store,
+        "CODE_STORE_URL": store,
+        "RATE_LIMIT_ENABLED": "false",
+        "ACTIVITY_ARCHIVE_DIR": os.path.join(workdir, "activity_archive"),
+        "METRICS_DB": os.path.join(workdir, "metrics.db"),
+        # Outbox, cache des réponses… (ignoré par le code d'avant create_app)
+        "DATA_DIR": workdir,
+    }
+
+
+def load_app(workdir):
+    """Construit et initialise l'application sur la base du dossier (les uploads relatifs y sont rangés)"""
+    os.makedirs(workdir, exist_ok=True)
+    os.environ.update(scratch_env(workdir))
+    os.chdir(workdir)
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    from app import create_app, initialize
+    app = create_app()
+    initialize(app)
+    return app
+
+
+def read_meta(workdir):
+    path = os.path.join(workdir, "seed.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+# -----------------------------
+# GÉNÉRATION
+# -----------------------------
+class Generator:
+    def __init__(self, seed, now):
+        self.rng = random.Random(seed)
+        self.now = now
+
+    def uuid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def moment(self, days):
+        """Date uniforme sur les `days` derniers jours"""
+        return self.now - timedelta(seconds=self.rng.random() * days * 86400)
+
+    def popular(self, population, k, exponent=1.1):
+        """k tirages selon une loi de Zipf sur population (le premier est le plus tiré)"""
+        cum_weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, len(population) + 1)))
+        return self.rng.choices(population, cum_weights=cum_weights, k=k)
+
+    def sentence(self, n):
+        return " ".join(self.rng.choice(WORDS) for _ in range(n))
+
+
+def batches(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def insert(engine, table, rows, total, label):
+    start = time.perf_counter()
+    done = 0
+    for batch in batches(rows):
+        with engine.begin() as conn:
+            conn.execute(table.insert(), batch)
+        done += len(batch)
+        print(f"\r  {label:<12} {done:>10,}/{total:,}", end="", flush=True)
+    print(f"  ({time.perf_counter() - start:.0f} s)")
+
+
+def sample_archive():
+    """Petite archive de projet (README, code Python et JavaScript)"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("projet/README.md", "# Projet de démonstration\n\nGénéré pour les benchmarks.\n")
+        zf.writestr("projet/app.py", "def main():\n    print('bonjour')\n" * 50)
+        zf.writestr("projet/static/app.js", "console.log('bonjour');\n" * 80)
+        zf.writestr("projet/static/style.css", "body { margin: 0; }\n" * 20)
+    return buffer.getvalue()
+
+
+def sample_image():
+    """PNG 1280x720 (Pillow) ou, à défaut, un PNG 1x1"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return bytes.fromhex(
+            "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+            "1f15c4890000000d49444154789c6360f8cfc0f01f0005000201a3a6e5"
+            "f20000000049454e44ae426082"
+        )
+    buffer = io.BytesIO()
+    Image.linear_gradient("L").resize((1280, 720)).convert("RGB").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def seed(app, volumes, seed_value):
+    from sqlalchemy import text
+    from werkzeug.security import generate_password_hash
+    from extensions import db
+    from images import validate_image
+    from models import (User, Project, Technology, ArchiveBlob, Activity, Download, project_technology,
+                        technology_slug, setup_fulltext, rebuild_counters)
+    from projects import store_archive, build_manifest, file_sha256, image_path, build_image_variants, format_size
+
+    gen = Generator(seed_value, datetime.utcnow())
+    engine = db.engine
+    password = generate_password_hash(PASSWORD)
+
+    # Fichiers partagés : une archive (manifeste construit) et une image
+    archive_tmp = os.path.join(app.config['UPLOAD_TMP'], "seed.zip")
+    with open(archive_tmp, "wb") as f:
+        f.write(sample_archive())
+    blob, _ = store_archive(archive_tmp)
+    db.session.commit()
+    os.remove(archive_tmp)
+    build_manifest(blob.sha256)
+    image_tmp = os.path.join(app.config['UPLOAD_TMP'], "seed.png")
+    with open(image_tmp, "wb") as f:
+        f.write(sample_image())
+    image_sha = file_sha256(image_tmp)
+    ext, width, height = validate_image(image_tmp, app.config['IMAGE_MAX_PIXELS'])
+    os.makedirs(os.path.dirname(image_path(f"{image_sha}.{ext}")), exist_ok=True)
+    os.replace(image_tmp, image_path(f"{image_sha}.{ext}"))
+    build_image_variants(f"{image_sha}.{ext}")
+    image = {"sha256": image_sha, "ext": ext, "width": width, "height": height}
+
+    print("Utilisateurs")
+    users = []
+    for i in range(volumes["users"]):
+        admin = i % 100 == 0
+        users.append({
+            "id": gen.uuid(), "matricule": f"{'AD' if admin else 'MAT'}-{i:06d}",
+            "email": f"user{i}@simplon.bench", "pseudo": f"user{i}", "password": password,
+            "role": "admin" if admin else ("formateur" if i % 20 == 0 else "stagiaire"),
+            "dateInscription": gen.moment(3 * 365),
+        })
+    insert(engine, User.__table__, users, len(users), "users")
+    # Ordre aléatoire : les plus actifs (tirages de Zipf) ne sont pas les premiers inscrits
+    gen.rng.shuffle(users)
+
+    print("Technologies")
+    with engine.begin() as conn:
+        conn.execute(Technology.__table__.insert(), [
+            {"id": i, "nom": nom, "slug": technology_slug(nom)} for i, nom in enumerate(TECHNOLOGIES, 1)
+        ])
+
+    print("Projets")
+    projects, links = [], []
+    authors = gen.popular(users, volumes["projects"], exponent=0.8)
+    for i, author in enumerate(authors):
+        tech_ids = sorted(set(gen.popular(range(1, len(TECHNOLOGIES) + 1), gen.rng.randint(1, 4))))
+        project_id = gen.uuid()
+        projects.append({
+            "id": project_id,
+            "titre": f"{gen.sentence(3).capitalize()} {i}",
+            "description": gen.sentence(gen.rng.randint(10, 60)),
+            "technologies": [TECHNOLOGIES[t - 1] for t in tech_ids],
+            "categorie": gen.rng.choice(CATEGORIES),
+            "auteurId": author["id"], "auteurNom": author["pseudo"],
+            "dateCreation": gen.moment(3 * 365),
+            "taille": format_size(blob.size), "images": [image] if i % 3 == 0 else [],
+            "filePath": blob.path, "archiveSha256": blob.sha256, "fileName": f"projet-{i}.zip",
+        })
+        links += [{"project_id": project_id, "technology_id": t} for t in tech_ids]
+    insert(engine, Project.__table__, projects, len(projects), "projects")
+    insert(engine, project_technology, links, len(links), "tags")
+    # Une référence par projet (store_archive en a compté une)
+    with engine.begin() as conn:
+        conn.execute(ArchiveBlob.__table__.update().values(ref_count=len(projects)))
+    project_ids = [p["id"] for p in projects]
+    del projects, links
+
+    print("Téléchargements")
+    n = volumes["downloads"]
+    downloaders = gen.popular(users, n)
+    downloaded = gen.popular(project_ids, n)
+    insert(engine, Download.__table__, (
+        {"id": gen.uuid(), "user_id": u["id"], "project_id": p, "downloaded_at": gen.moment(2 * 365)}
+        for u, p in zip(downloaders, downloaded)
+    ), n, "downloads")
+    del downloaders, downloaded
+
+    print("Activités")
+    n = volumes["activities"]
+    actions = [a for a, _ in ACTIONS]
+    weights = [w for _, w in ACTIONS]
+    insert(engine, Activity.__table__, (
+        {"id": gen.uuid(), "user_id": u["id"], "user_name": u["pseudo"], "action": action,
+         "details": f"{action} : {gen.sentence(4)}", "timestamp": gen.moment(2 * 365)}
+        for u, action in zip(gen.popular(users, n), gen.rng.choices(actions, weights, k=n))
+    ), n, "activities")
+
+    print("Index plein texte, compteurs, statistiques du planificateur")
+    setup_fulltext()
+    rebuild_counters()
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="dossier de la base de test")
+    parser.add_argument("--scale", type=float, default=1.0, help="facteur appliqué aux volumes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="remplace une base existante")
+    args = parser.parse_args()
+
+    workdir = os.path.abspath(args.dir)
+    if os.path.exists(workdir):
+        if not args.force:
+            sys.exit(f"{workdir} existe déjà (--force pour le remplacer)")
+        shutil.rmtree(workdir)
+    volumes = {name: max(1, int(n * args.scale)) for name, n in VOLUMES.items()}
+    print(f"Base de test {workdir} : {volumes}")
+
+    start = time.perf_counter()
+    app = load_app(workdir)
+    from extensions import activity_log
+    with app.app_context():
+        seed(app, volumes, args.seed)
+        activity_log.close()
+
+    with open(os.path.join(workdir, "seed.json"), "w") as f:
+        json.dump({"scale": args.scale, "seed": args.seed, "volumes": volumes,
+                   "created_at": datetime.utcnow().isoformat()}, f, indent=2)
+    print(f"Terminé en {time.perf_counter() - start:.0f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compression des réponses (brotli ou gzip) négociée sur Accept-Encoding.
+
+Seules les réponses 200 en mémoire d'un type texte (JSON, texte, CSV…) et
+d'au moins `min_size` octets sont compressées. Les flux (SSE) et les
+fichiers passent tels quels : réponses de send_file, entrées d'archive
+(servies en text/plain avec Content-Disposition) et toute réponse qui
+accepte les requêtes Range. Brotli (module `brotli`, optionnel) est
+préféré quand le client l'accepte, gzip sinon.
+
+L'ETag d'une réponse compressée devient faible (W/"…") : le corps n'est
+pas identique octet pour octet, et If-None-Match se compare en mode
+faible, les 304 restent donc servis. Les fichiers gardent leur ETag fort,
+qu'exige If-Range.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli absent
+    brotli = None
+
+
+HAS_BROTLI = brotli is not None
+
+COMPRESSIBLE_TYPES = {"application/json", "application/javascript", "application/xml", "image/svg+xml"}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # au-delà, le gain en octets ne paie plus le temps CPU par requête
+
+
+def compressible(response, min_size):
+    mimetype = response.mimetype or ""
+    if mimetype == "text/event-stream":
+        return False
+    if not (mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES):
+        return False
+    return (response.status_code == 200
+            and not response.is_streamed
+            and not response.direct_passthrough
+            and "Content-Encoding" not in response.headers
+            and "Content-Disposition" not in response.headers
+            and "Accept-Ranges" not in response.headers
+            and len(response.get_data()) >= min_size)
+
+
+def choose_encoding(accept_encodings):
+    """'br', 'gzip' ou None selon l'en-tête Accept-Encoding déjà analysé"""
+    if HAS_BROTLI and accept_encodings.quality("br") > 0:
+        return "br"
+    if accept_encodings.quality("gzip") > 0:
+        return "gzip"
+    return None
+
+
+def encode(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response, accept_encodings, min_size, cache=None):
+    """Compresse la réponse sur place ; cache : encodage -> corps déjà compressé"""
+    if not compressible(response, min_size):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None:
+        return response
+
+    body = cache.get(encoding) if cache is not None else None
+    if body is None:
+        body = encode(response.get_data(), encoding)
+        if cache is not None:
+            cache[encoding] = body
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
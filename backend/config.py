@@ -0,0 +1,139 @@
+"""
+Réglages de l'application, lus dans l'environnement (et le fichier .env).
+
+Chaque réglage est une clé de app.config du nom de sa variable
+d'environnement (les RATE_LIMIT_<NOM> sont regroupées dans RATE_LIMITS).
+`create_app(config)` applique ses propres valeurs par-dessus, puis
+`resolve_paths` complète les chemins non fournis sous DATA_DIR : une
+application isolée (tests, benchmarks) n'a qu'à donner DATA_DIR, et
+UPLOAD_FOLDER si elle ne doit pas écrire dans ./uploads.
+"""
+import os
+
+from db_config import env_value, database_url, engine_options, sqlite_pragmas
+
+
+BASEDIR = os.path.abspath(os.path.dirname(__file__))
+
+# Limites par défaut "capacité/période en secondes", surchargées par RATE_LIMIT_<NOM>
+RATE_LIMITS = {
+    'login_ip': '20/60',
+    'login_identifier': '5/60',
+    'send_code_ip': '5/300',
+    'send_code_email': '3/600',
+    'verify_code_ip': '20/300',
+    'activation_ip': '5/300',
+    'update_user': '10/60',
+}
+
+
+def load_config(env=None):
+    """Réglages lus dans env (os.environ par défaut)"""
+    env = os.environ if env is None else env
+    text = lambda name, default=None: env.get(name, default)
+    integer = lambda name, default: int(env.get(name, default))
+    number = lambda name, default: float(env.get(name, default))
+    flag = lambda name, default='true': env.get(name, default).lower() != 'false'
+
+    config = {
+        # Derrière un proxy (nginx, load balancer) : nombre de proxys de confiance pour X-Forwarded-For
+        'TRUSTED_PROXY_COUNT': integer('TRUSTED_PROXY_COUNT', 0),
+        'CORS_ORIGINS': ["http://localhost:5173", "http://localhost:5174"],
+        'DATA_DIR': text('DATA_DIR', os.path.join(BASEDIR, 'data')),
+
+        # Mail
+        'MAIL_SERVER': text('MAIL_SERVER', 'smtp.gmail.com'),
+        'MAIL_PORT': integer('MAIL_PORT', 587),
+        'MAIL_USE_TLS': flag('MAIL_USE_TLS'),
+        'MAIL_USERNAME': text('MAIL_USER'),
+        'MAIL_PASSWORD': text('MAIL_PASS'),
+        'MAIL_DEFAULT_SENDER': text('MAIL_USER'),
+        'MAIL_MAX_ATTEMPTS': integer('MAIL_MAX_ATTEMPTS', 6),
+
+        # Base de données : DATABASE_URL, pool et PRAGMA SQLite (voir db_config.py)
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'SQLITE_PRAGMAS': sqlite_pragmas(env),
+
+        # Fichiers : chemins relatifs au dossier courant, comme ceux déjà enregistrés en base
+        'UPLOAD_FOLDER': text('UPLOAD_FOLDER', 'uploads'),
+        # Upload par morceaux : taille maximale d'un morceau, d'une archive et durée de vie d'une session
+        'UPLOAD_CHUNK_SIZE': integer('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024),
+        'UPLOAD_MAX_SIZE': integer('UPLOAD_MAX_SIZE', 2 * 1024 * 1024 * 1024),
+        'UPLOAD_SESSION_TTL_HOURS': integer('UPLOAD_SESSION_TTL_HOURS', 24),
+        # Envoi des archives délégué au proxy : '' (Flask envoie), 'nginx' (X-Accel-Redirect)
+        # ou 'sendfile' (X-Sendfile, Apache/lighttpd). Flask ne fait alors qu'autoriser et journaliser.
+        'DOWNLOAD_OFFLOAD': text('DOWNLOAD_OFFLOAD', '').lower(),
+        'DOWNLOAD_ACCEL_PREFIX': text('DOWNLOAD_ACCEL_PREFIX', '/_protected/archives/'),
+
+        # Contenu des archives et images
+        'ARCHIVE_MAX_ENTRIES': integer('ARCHIVE_MAX_ENTRIES', 20000),
+        'ARCHIVE_PREVIEW_MAX_BYTES': integer('ARCHIVE_PREVIEW_MAX_BYTES', 64 * 1024),
+        'ARCHIVE_PREVIEW_TOTAL_BYTES': integer('ARCHIVE_PREVIEW_TOTAL_BYTES', 2 * 1024 * 1024),
+        'ARCHIVE_ENTRY_MAX_BYTES': integer('ARCHIVE_ENTRY_MAX_BYTES', 5 * 1024 * 1024),
+        'IMAGE_MAX_COUNT': integer('IMAGE_MAX_COUNT', 6),
+        'IMAGE_MAX_BYTES': integer('IMAGE_MAX_BYTES', 5 * 1024 * 1024),
+        'IMAGE_MAX_PIXELS': integer('IMAGE_MAX_PIXELS', 40_000_000),
+
+        # Journal d'activité (écriture différée) et rétention
+        'ACTIVITY_QUEUE_SIZE': integer('ACTIVITY_QUEUE_SIZE', 10000),
+        'ACTIVITY_BATCH_SIZE': integer('ACTIVITY_BATCH_SIZE', 200),
+        'ACTIVITY_FLUSH_INTERVAL': number('ACTIVITY_FLUSH_INTERVAL', 1.0),
+        'ACTIVITY_RETENTION_DAYS': integer('ACTIVITY_RETENTION_DAYS', 90),
+        'ACTIVITY_ARCHIVE_BATCH': integer('ACTIVITY_ARCHIVE_BATCH', 2000),
+
+        # Flux d'activités (SSE)
+        'STREAM_HEARTBEAT': number('STREAM_HEARTBEAT', 15),
+        'STREAM_REPLAY_LIMIT': integer('STREAM_REPLAY_LIMIT', 500),
+        'STREAM_RETRY_MS': integer('STREAM_RETRY_MS', 5000),
+        'STREAM_POLL_INTERVAL': number('STREAM_POLL_INTERVAL', 1.0),
+        'STREAM_MAX_SUBSCRIBERS': integer('STREAM_MAX_SUBSCRIBERS', 16),
+
+        # Cache des réponses, compression, métriques
+        'RESPONSE_CACHE_SIZE': integer('RESPONSE_CACHE_SIZE', 256),
+        'COMPRESS_ENABLED': flag('COMPRESS_ENABLED'),
+        'COMPRESS_MIN_BYTES': integer('COMPRESS_MIN_BYTES', 1024),
+        'METRICS_FLUSH_INTERVAL': number('METRICS_FLUSH_INTERVAL', 5),
+        'SLOW_QUERY_MS': number('SLOW_QUERY_MS', 200),
+        'HEALTH_STATS_TTL': number('HEALTH_STATS_TTL', 30),
+
+        # Codes d'activation et limitation de débit
+        'CODE_TTL_SECONDS': integer('CODE_TTL_SECONDS', 600),
+        'CODE_MAX_ATTEMPTS': integer('CODE_MAX_ATTEMPTS', 5),
+        'RATE_LIMIT_ENABLED': flag('RATE_LIMIT_ENABLED'),
+        'RATE_LIMITS': {name: text(f'RATE_LIMIT_{name.upper()}', spec) for name, spec in RATE_LIMITS.items()},
+
+        # Opérations groupées (admin)
+        'BULK_MAX_ITEMS': integer('BULK_MAX_ITEMS', 500),
+        'BULK_IMPORT_MAX_ROWS': integer('BULK_IMPORT_MAX_ROWS', 200),
+    }
+
+    # Chemins : pris dans l'environnement s'ils y sont, sinon déduits de DATA_DIR (resolve_paths)
+    if env_value(env, 'DATABASE_URL', None):
+        config['SQLALCHEMY_DATABASE_URI'] = database_url(None, env)
+    for name in ('ACTIVITY_ARCHIVE_DIR', 'CODE_STORE_URL', 'RATE_LIMIT_STORE_URL'):
+        if name in env:
+            config[name] = env[name]
+    if 'METRICS_DB' in env:
+        # METRICS_DB= (vide) : métriques propres à chaque processus
+        config['METRICS_DB'] = env['METRICS_DB'] or None
+    return config
+
+
+def resolve_paths(config, env=None):
+    """Complète les chemins non fournis sous DATA_DIR, puis les options du moteur"""
+    data_dir = config['DATA_DIR']
+    sqlite_file = lambda name: 'sqlite:///' + os.path.join(data_dir, name)
+    config.setdefault('SQLALCHEMY_DATABASE_URI', sqlite_file('simplon_hub.db'))
+    config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(config['SQLALCHEMY_DATABASE_URI'], env))
+    config.setdefault('ACTIVITY_ARCHIVE_DIR', os.path.join(data_dir, 'activity_archive'))
+    # Partagés entre workers gunicorn (SQLite par défaut) ; memory:// pour un seul processus
+    config.setdefault('CODE_STORE_URL', sqlite_file('ephemeral.db'))
+    config.setdefault('RATE_LIMIT_STORE_URL', sqlite_file('ephemeral.db'))
+    config.setdefault('METRICS_DB', os.path.join(data_dir, 'metrics.db'))
+    config.setdefault('MAIL_OUTBOX_DB', os.path.join(data_dir, 'mail_outbox.db'))
+    config.setdefault('CACHE_VERSION_FILE', os.path.join(data_dir, '.cache_version'))
+    upload_folder = config['UPLOAD_FOLDER']
+    config.setdefault('UPLOAD_ARCHIVES', os.path.join(upload_folder, 'archives'))
+    config.setdefault('UPLOAD_IMAGES', os.path.join(upload_folder, 'images'))
+    config.setdefault('UPLOAD_TMP', os.path.join(upload_folder, 'tmp'))
+    return config
@@ -0,0 +1,38 @@
+"""
+Fixtures communes : une application isolée (create_app) par test, avec sa base,
+ses uploads et ses files d'attente dans le dossier temporaire du test.
+"""
+import os
+
+import pytest
+
+from app import create_app, initialize
+from extensions import db, activity_log, mail_queue
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """make_app(**config) : application initialisée, réglages remplacés par `config`"""
+    apps = []
+
+    def make(**overrides):
+        app = create_app({
+            "TESTING": True,
+            "DATA_DIR": str(tmp_path),
+            "UPLOAD_FOLDER": str(tmp_path / "uploads"),
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(tmp_path, "test.db"),
+            "CODE_STORE_URL": "memory://",
+            "RATE_LIMIT_STORE_URL": "memory://",
+            "METRICS_DB": None,
+            **overrides,
+        })
+        initialize(app)
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            activity_log.close()
+            mail_queue.close()
+            db.engine.dispose()
@@ -0,0 +1,99 @@
+"""
+Configuration du moteur de base de données, lue dans l'environnement.
+
+- `DATABASE_URL` choisit le backend : fichier SQLite (défaut) ou PostgreSQL
+  (`postgresql://user:mdp@hôte/base`, pilote psycopg2).
+- Pool de connexions : `DB_POOL_SIZE`, `DB_MAX_OVERFLOW`, `DB_POOL_TIMEOUT`,
+  et pour PostgreSQL `DB_POOL_RECYCLE` (les connexions sont testées avant usage).
+- SQLite : PRAGMA appliqués à chaque nouvelle connexion. WAL laisse les
+  lectures continuer pendant une écriture, `busy_timeout` fait attendre un
+  writer au lieu d'échouer sur « database is locked », `synchronous=NORMAL`
+  suffit en WAL (pas de corruption, seule la dernière transaction peut être
+  perdue sur coupure de courant).
+"""
+import os
+import weakref
+
+from sqlalchemy import event
+
+
+def env_value(env, name, default):
+    value = env.get(name)
+    return default if value in (None, "") else value
+
+
+def database_url(default, env=None):
+    env = os.environ if env is None else env
+    url = env_value(env, "DATABASE_URL", default)
+    # Heroku, Render… fournissent postgres://, refusé par SQLAlchemy
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def is_sqlite(url):
+    return url.startswith("sqlite")
+
+
+def engine_options(url, env=None):
+    """Options de create_engine (SQLALCHEMY_ENGINE_OPTIONS) pour cette URL"""
+    env = os.environ if env is None else env
+    if is_sqlite(url) and url in ("sqlite://", "sqlite:///:memory:"):
+        # Base en mémoire : pool à connexion unique imposé par SQLAlchemy
+        return {}
+    options = {
+        "pool_size": int(env_value(env, "DB_POOL_SIZE", 5)),
+        "max_overflow": int(env_value(env, "DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(env_value(env, "DB_POOL_TIMEOUT", 30)),
+    }
+    if not is_sqlite(url):
+        # Connexions coupées par le serveur ou un pgbouncer : recyclées et testées avant usage
+        options["pool_recycle"] = int(env_value(env, "DB_POOL_RECYCLE", 1800))
+        options["pool_pre_ping"] = True
+        options["connect_args"] = {"connect_timeout": int(env_value(env, "DB_CONNECT_TIMEOUT", 10))}
+    return options
+
+
+def sqlite_pragmas(env=None):
+    env = os.environ if env is None else env
+    return [
+        ("journal_mode", env_value(env, "SQLITE_JOURNAL_MODE", "WAL")),
+        ("synchronous", env_value(env, "SQLITE_SYNCHRONOUS", "NORMAL")),
+        ("busy_timeout", int(env_value(env, "SQLITE_BUSY_TIMEOUT_MS", 5000))),
+    ]
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Applique les PRAGMA à chaque connexion ouverte par le pool (sans effet hors SQLite)"""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+# Moteurs à vider après un fork ; références faibles : les applications de test libèrent les leurs
+_fork_engines = weakref.WeakSet()
+
+
+def _dispose_engines_in_child():
+    for engine in list(_fork_engines):
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    # Un seul hook par processus, quel que soit le nombre d'applications créées
+    os.register_at_fork(after_in_child=_dispose_engines_in_child)
+
+
+def dispose_after_fork(engine):
+    """
+    Les connexions ouvertes par le maître gunicorn (create_all, migrations)
+    ne doivent pas être partagées avec les workers : chaque enfant repart d'un
+    pool vide, sans fermer les connexions du parent.
+    """
+    _fork_engines.add(engine)
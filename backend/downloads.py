@@ -0,0 +1,181 @@
+"""
+Blueprint downloads : envoi des archives et historique des téléchargements.
+"""
+import os
+from datetime import datetime
+
+from flask import Blueprint, current_app, request, jsonify, send_file, make_response
+from sqlalchemy import func
+
+from activities import log_activity
+from extensions import db
+from models import User, Project, Download, counter_changes, bump_counters
+from pagination import keyset_page
+from projects import archive_name
+
+
+bp = Blueprint('downloads', __name__)
+
+
+# -----------------------------
+# DOWNLOAD ROUTES
+# -----------------------------
+@bp.route('/api/download-file/<project_id>')
+def download_file(project_id):
+    project = Project.query.get_or_404(project_id)
+    if not (project.filePath and os.path.exists(project.filePath)):
+        return jsonify({"error": "Fichier introuvable"}), 404
+
+    if current_app.config['DOWNLOAD_OFFLOAD']:
+        response = offloaded_archive_response(project)
+    else:
+        # Range / If-Range / If-None-Match / If-Modified-Since gérés par send_file
+        # (chemin absolu : send_file résout les chemins relatifs depuis app.root_path, pas le cwd)
+        response = send_file(
+            os.path.abspath(project.filePath),
+            as_attachment=True,
+            download_name=archive_name(project),
+            mimetype='application/octet-stream',
+            etag=project.archiveSha256 or True,
+            conditional=True,
+            max_age=0
+        )
+    response.headers["X-Content-Type-Options"] = "nosniff"
+
+    if is_new_download(response):
+        # Récupérer l'utilisateur connecté s'il existe
+        user_id = request.args.get('user_id')
+        if user_id:
+            # Enregistrer le téléchargement dans la base de données
+            download = Download(
+                user_id=user_id,
+                project_id=project_id
+            )
+            db.session.add(download)
+            bump_counters(counter_changes("downloads", 1, user_id))
+            db.session.commit()
+
+        # Log de l'activité
+        log_activity(
+            user_id=user_id or "anonymous",
+            user_name=user_id or "Anonymous",
+            action="Téléchargement",
+            details=f"Fichier téléchargé: {archive_name(project)}"
+        )
+
+    return response
+
+
+def is_new_download(response):
+    """Un 304 ou une reprise (Range au-delà du premier octet) n'est pas un nouveau téléchargement"""
+    if response.status_code not in (200, 206):
+        return False
+    if response.status_code == 200 and not current_app.config['DOWNLOAD_OFFLOAD']:
+        # Fichier complet : pas de Range, ou If-Range périmé
+        return True
+    return request.range is None or request.range.ranges[0][0] == 0
+
+
+def offloaded_archive_response(project):
+    """Réponse vide dont le proxy (nginx, Apache) envoie lui-même le fichier, Range compris"""
+    config = current_app.config
+    response = make_response('')
+    response.mimetype = 'application/octet-stream'
+    if config['DOWNLOAD_OFFLOAD'] == 'nginx':
+        relative = os.path.relpath(project.filePath, config['UPLOAD_ARCHIVES']).replace(os.sep, '/')
+        response.headers['X-Accel-Redirect'] = config['DOWNLOAD_ACCEL_PREFIX'] + relative
+    else:
+        response.headers['X-Sendfile'] = os.path.abspath(project.filePath)
+    response.headers['Content-Disposition'] = f'attachment; filename="{archive_name(project)}"'
+
+    stat = os.stat(project.filePath)
+    response.set_etag(project.archiveSha256 or f"{int(stat.st_mtime)}-{stat.st_size}")
+    response.last_modified = datetime.utcfromtimestamp(int(stat.st_mtime))
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+@bp.route('/api/my-downloads/<user_id>', methods=['GET'])
+def get_user_downloads(user_id):
+    """Récupère les projets téléchargés par un utilisateur (une entrée par projet, le plus récent d'abord)"""
+    query, latest = user_downloads_query(user_id)
+    return keyset_page(query, latest.c.downloaded_at, Project.id, lambda row: {
+        "id": row.id,
+        "titre": row.titre,
+        "description": row.description,
+        "taille": row.taille,
+        "dateCreation": row.dateCreation,
+        "downloadDate": row.downloaded_at,
+        "categorie": row.categorie,
+        "technologies": row.technologies,
+        "auteurNom": row.auteurPseudo or row.auteurNom or "Anonyme",
+        "auteurId": row.auteurId
+    })
+
+
+def user_downloads_query(user_id):
+    """Projets téléchargés par user_id avec la date du dernier téléchargement et le pseudo de l'auteur"""
+    # Dernier téléchargement par projet, calculé en base
+    latest = db.session.query(
+        Download.project_id.label('project_id'),
+        func.max(Download.downloaded_at).label('downloaded_at')
+    ).filter(Download.user_id == user_id)\
+        .group_by(Download.project_id)\
+        .subquery()
+
+    # Projet + pseudo de l'auteur en une seule requête
+    query = db.session.query(
+        Project.id.label('id'),
+        Project.titre,
+        Project.description,
+        Project.taille,
+        Project.dateCreation,
+        Project.categorie,
+        Project.technologies,
+        Project.auteurId,
+        Project.auteurNom,
+        User.pseudo.label('auteurPseudo'),
+        latest.c.downloaded_at
+    ).join(latest, latest.c.project_id == Project.id)\
+        .outerjoin(User, User.id == Project.auteurId)
+    return query, latest
+
+
+# -----------------------------
+# RECORD DOWNLOAD
+# -----------------------------
+@bp.route('/api/record-download', methods=['POST'])
+def record_download():
+    """Enregistre un téléchargement dans la base de données"""
+    data = request.json
+    
+    user_id = data.get('user_id')
+    project_id = data.get('project_id')
+    
+    if not user_id or not project_id:
+        return jsonify({"error": "Données manquantes"}), 400
+    
+    # Vérifier si le projet existe
+    project = Project.query.get(project_id)
+    if not project:
+        return jsonify({"error": "Projet non trouvé"}), 404
+    
+    # Créer l'entrée de téléchargement
+    download = Download(
+        user_id=user_id,
+        project_id=project_id
+    )
+    
+    db.session.add(download)
+    bump_counters(counter_changes("downloads", 1, user_id))
+    db.session.commit()
+    
+    return jsonify({
+        "message": "Téléchargement enregistré",
+        "download": {
+            "id": download.id,
+            "user_id": download.user_id,
+            "project_id": download.project_id,
+            "downloaded_at": download.downloaded_at.isoformat()
+        }
+    }), 201
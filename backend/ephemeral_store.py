@@ -0,0 +1,221 @@
+"""
+Stockage clé/valeur éphémère (codes d'activation, jetons…).
+
+Chaque clé a une durée de vie et un compteur de tentatives. Les entrées
+expirées sont ignorées à la lecture (expiration paresseuse) et purgées au
+plus toutes les `purge_interval` secondes lors d'une écriture (expiration
+périodique, sans thread).
+
+Les backends tiennent aussi des seaux à jetons (`consume`) pour la limitation
+de débit : un seau plein est équivalent à un seau absent, il expire donc dès
+qu'il s'est rempli.
+
+Deux backends, même interface :
+- MemoryStore : dictionnaire du processus, pour un seul worker (dev, tests) ;
+- SQLiteStore : fichier SQLite partagé par tous les workers gunicorn.
+
+`make_store("memory://")` ou `make_store("sqlite:///chemin/fichier.db")`.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class MemoryStore:
+    def __init__(self, purge_interval=60.0):
+        self.purge_interval = purge_interval
+        self._data = {}  # clé -> [valeur, expire_à, tentatives]
+        self._buckets = {}  # clé -> (jetons, mis_à_jour, plein_à)
+        self._lock = threading.Lock()
+        self._next_purge = time.time() + purge_interval
+
+    def _live(self, key, now):
+        entry = self._data.get(key)
+        if entry and entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._data[key] = [value, now + ttl, 0]
+            if now >= self._next_purge:
+                self._purge(now)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key, time.time())
+            return entry[0] if entry else None
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr_attempts(self, key):
+        """Incrémente et renvoie le compteur de tentatives, None si la clé n'existe pas"""
+        with self._lock:
+            entry = self._live(key, time.time())
+            if not entry:
+                return None
+            entry[2] += 1
+            return entry[2]
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        """
+        Retire `cost` jetons du seau `key` (capacity jetons, refill_rate jetons/s ;
+        un coût négatif rend des jetons). Renvoie (True, 0) si accepté, sinon (False, secondes avant d'avoir assez de jetons).
+        """
+        now = time.time()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens = min(capacity, tokens - cost)
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+            if now >= self._next_purge:
+                self._purge(now)
+        return (True, 0.0) if allowed else (False, (cost - tokens) / refill_rate)
+
+    def _purge(self, now):
+        expired = [k for k, entry in self._data.items() if entry[1] <= now]
+        for k in expired:
+            del self._data[k]
+        full = [k for k, bucket in self._buckets.items() if bucket[2] <= now]
+        for k in full:
+            del self._buckets[k]
+        self._next_purge = now + self.purge_interval
+        return len(expired)
+
+    def purge_expired(self):
+        with self._lock:
+            return self._purge(time.time())
+
+
+class SQLiteStore:
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS ephemeral ("
+        "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+        "expires_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0)"
+    )
+
+    def __init__(self, path, purge_interval=60.0):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._next_purge = time.time() + purge_interval
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(self.SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_ephemeral_expires ON ephemeral (expires_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS token_bucket ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                "updated_at REAL NOT NULL, full_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_token_bucket_full ON token_bucket (full_at)")
+
+    @contextmanager
+    def _connect(self):
+        # Une connexion par thread et par processus (jamais héritée d'un fork),
+        # réutilisée : évite d'ouvrir le fichier à chaque appel
+        if getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        yield self._local.conn
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO ephemeral (key, value, expires_at, attempts) VALUES (?, ?, ?, 0) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+                "expires_at = excluded.expires_at, attempts = 0",
+                (key, json.dumps(value), now + ttl)
+            )
+        if now >= self._next_purge:
+            self.purge_expired()
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM ephemeral WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM ephemeral WHERE key = ?", (key,))
+
+    def incr_attempts(self, key):
+        """Incrémente et renvoie le compteur de tentatives, None si la clé n'existe pas"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.execute(
+                    "UPDATE ephemeral SET attempts = attempts + 1 WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                )
+                attempts = None
+                if cursor.rowcount:
+                    attempts = conn.execute(
+                        "SELECT attempts FROM ephemeral WHERE key = ?", (key,)
+                    ).fetchone()[0]
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return attempts
+
+    def consume(self, key, capacity, refill_rate, cost=1):
+        """
+        Retire `cost` jetons du seau `key` (capacity jetons, refill_rate jetons/s ;
+        un coût négatif rend des jetons). Renvoie (True, 0) si accepté, sinon (False, secondes avant d'avoir assez de jetons).
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM token_bucket WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                tokens = min(capacity, tokens + (now - updated) * refill_rate)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens = min(capacity, tokens - cost)
+                conn.execute(
+                    "INSERT INTO token_bucket (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, "
+                    "updated_at = excluded.updated_at, full_at = excluded.full_at",
+                    (key, tokens, now, now + (capacity - tokens) / refill_rate)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if now >= self._next_purge:
+            self.purge_expired()
+        return (True, 0.0) if allowed else (False, (cost - tokens) / refill_rate)
+
+    def purge_expired(self):
+        now = time.time()
+        self._next_purge = now + self.purge_interval
+        with self._connect() as conn:
+            conn.execute("DELETE FROM token_bucket WHERE full_at <= ?", (now,))
+            return conn.execute("DELETE FROM ephemeral WHERE expires_at <= ?", (now,)).rowcount
+
+
+def make_store(url, purge_interval=60.0):
+    if url.startswith("memory://"):
+        return MemoryStore(purge_interval)
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):], purge_interval)
+    raise ValueError(f"Backend de stockage éphémère inconnu : {url}")
@@ -0,0 +1,76 @@
+"""
+Extensions et services partagés par les blueprints.
+
+`db` est lié à chaque application par create_app (db.init_app). Les autres
+services (journal d'activité, file d'emails, limiteur de débit, cache des
+réponses, métriques, workers d'arrière-plan) appartiennent à une
+application : `Resources` les crée au premier besoin — première requête,
+commande CLI — ou une seule fois dans le maître gunicorn avant le fork
+(gunicorn.conf.py). Les noms exportés ici sont des proxys vers les services
+de l'application courante (current_app).
+"""
+import threading
+from functools import wraps
+
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+from werkzeug.local import LocalProxy
+
+
+db = SQLAlchemy()
+
+
+class Resources:
+    """Initialisation unique d'une application : setup(app) renvoie ses services"""
+
+    def __init__(self, app, setup):
+        self.app = app
+        self._setup = setup
+        self._services = None
+        self._lock = threading.Lock()
+        # Index FTS5 disponible : lu par les listeners de Project, y compris pendant setup
+        self.fulltext = False
+
+    @property
+    def ready(self):
+        return self._services is not None
+
+    def ensure(self):
+        """Initialise l'application au premier appel (sans effet ensuite) et renvoie ses services"""
+        if self._services is None:
+            with self._lock:
+                if self._services is None:
+                    self._services = self._setup(self.app)
+        return self._services
+
+    def get(self, name):
+        """Service déjà créé, ou None pendant l'initialisation (ne la déclenche pas)"""
+        return self._services.get(name) if self._services else None
+
+
+def resources(app=None):
+    return (app or current_app).extensions['simplon']
+
+
+def initialized(command):
+    """Commande CLI : initialise l'application courante avant de l'exécuter"""
+    @wraps(command)
+    def wrapper(*args, **kwargs):
+        resources().ensure()
+        return command(*args, **kwargs)
+    return wrapper
+
+
+def service(name):
+    return LocalProxy(lambda: resources().ensure()[name])
+
+
+activity_log = service('activity_log')
+activity_stream = service('activity_stream')
+mail_queue = service('mail_queue')
+temp_codes = service('temp_codes')
+rate_limiter = service('rate_limiter')
+response_cache = service('response_cache')
+metrics = service('metrics')
+manifest_worker = service('manifest_worker')
+image_worker = service('image_worker')
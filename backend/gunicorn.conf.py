@@ -0,0 +1,25 @@
+"""
+Configuration gunicorn, lue par défaut dans le dossier courant :
+
+    gunicorn            # ou : gunicorn --config gunicorn.conf.py
+
+L'application est construite une fois dans le maître (preload_app) puis
+initialisée avant le fork (when_ready) : dossiers, schéma et migrations,
+compteurs, index plein texte. Les workers héritent d'une application
+prête ; leurs pools de connexions et threads d'arrière-plan repartent de
+zéro après le fork (voir dispose_after_fork et les vérifications de pid).
+Sans preload_app, chaque worker construit et initialise sa propre
+application à sa première requête.
+"""
+import os
+
+wsgi_app = "app:create_app()"
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 32))
+preload_app = True
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        from app import initialize
+        initialize(server.app.wsgi())
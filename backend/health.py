@@ -0,0 +1,188 @@
+"""
+Blueprint health : points de santé et métriques Prometheus.
+
+Les métriques sont agrégées par worker puis cumulées dans un fichier SQLite
+commun : /metrics donne le total de tous les workers gunicorn. METRICS_DB=
+(vide) : par processus. Les hooks de requête et les écouteurs SQL sont
+installés sur l'application qui enregistre le blueprint.
+"""
+import os
+import time
+import threading
+from datetime import datetime
+
+from flask import Blueprint, Response, current_app, request, jsonify, g, has_request_context
+from sqlalchemy import event, text
+
+from extensions import db, resources, activity_log, activity_stream, mail_queue, rate_limiter, metrics
+from metrics import Metrics
+from models import GLOBAL_SCOPE, read_counters
+
+
+bp = Blueprint('health', __name__)
+
+
+# -----------------------------
+# MÉTRIQUES (PROMETHEUS)
+# -----------------------------
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def create_metrics(config):
+    """Registre des métriques d'une application et ses familles"""
+    registry = Metrics(config['METRICS_DB'], flush_interval=config['METRICS_FLUSH_INTERVAL'])
+    registry.counter('http_requests_total', "Requêtes HTTP par route, méthode et statut")
+    registry.histogram('http_request_duration_seconds',
+                       "Durée des requêtes HTTP jusqu'au retour de la vue (hors envoi d'un flux)", LATENCY_BUCKETS)
+    registry.histogram('http_request_sql_queries', "Requêtes SQL par requête HTTP", (0, 1, 2, 3, 5, 10, 20, 50, 100))
+    registry.histogram('http_request_sql_duration_seconds', "Temps SQL cumulé par requête HTTP", LATENCY_BUCKETS)
+    registry.counter('sql_slow_queries_total',
+                     f"Requêtes SQL de plus de SLOW_QUERY_MS ({config['SLOW_QUERY_MS']:g} ms)")
+    return registry
+
+
+def metrics_route():
+    """Modèle de la route (/api/projects/<project_id>) : une série par route, pas par URL"""
+    return request.url_rule.rule if request.url_rule else "<inconnue>"
+
+
+def before_sql(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def sql_listener(app):
+    """Écouteur after_cursor_execute : temps SQL de la requête en cours et requêtes lentes"""
+    slow_query_ms = app.config['SLOW_QUERY_MS']
+
+    def after_sql(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, '_metrics_start', None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        in_request = has_request_context() and 'metrics_start' in g
+        if in_request:
+            g.sql_queries += 1
+            g.sql_seconds += elapsed
+        if elapsed * 1000 >= slow_query_ms:
+            route = metrics_route() if in_request else "<hors requête>"
+            # Pendant l'initialisation (create_all, index FTS…), les métriques n'existent pas encore
+            registry = resources(app).get('metrics')
+            if registry is not None:
+                registry.inc('sql_slow_queries_total', route=route)
+            app.logger.warning("Requête SQL lente (%.0f ms) sur %s : %s", elapsed * 1000, route,
+                               ' '.join(statement.split())[:1000])
+    return after_sql
+
+
+@bp.record_once
+def install_sql_listeners(state):
+    app = state.app
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', before_sql)
+        event.listen(db.engine, 'after_cursor_execute', sql_listener(app))
+
+
+@bp.before_app_request
+def start_request_metrics():
+    g.metrics_start = time.perf_counter()
+    g.sql_queries = 0
+    g.sql_seconds = 0.0
+
+
+@bp.after_app_request
+def record_request_metrics(response):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    labels = {"method": request.method, "route": metrics_route()}
+    metrics.inc('http_requests_total', status=str(response.status_code), **labels)
+    metrics.observe('http_request_duration_seconds', elapsed, **labels)
+    metrics.observe('http_request_sql_queries', g.sql_queries, **labels)
+    metrics.observe('http_request_sql_duration_seconds', g.sql_seconds, **labels)
+    # Visible dans l'onglet Réseau du navigateur
+    response.headers['Server-Timing'] = (
+        f'app;dur={elapsed * 1000:.1f}, db;dur={g.sql_seconds * 1000:.1f};desc="{g.sql_queries} SQL"'
+    )
+    return response
+
+
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Exposition Prometheus, cumulée sur tous les workers"""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# -----------------------------
+# HEALTH CHECK
+# -----------------------------
+# Statistiques recalculées au plus toutes les HEALTH_STATS_TTL secondes (une entrée par application)
+_stats_lock = threading.Lock()
+
+
+def cached_stats():
+    cache = resources().ensure()['health_stats']
+    now = time.monotonic()
+    if cache["value"] is None or now >= cache["expires"]:
+        with _stats_lock:
+            if cache["value"] is None or now >= cache["expires"]:
+                counters = read_counters(GLOBAL_SCOPE)
+                cache["value"] = {
+                    "users_count": counters.get("users", 0),
+                    "projects_count": counters.get("projects", 0),
+                    "downloads_count": counters.get("downloads", 0),
+                    "activities_count": counters.get("activities", 0),
+                    "mail_queue": mail_queue.stats(),
+                    "rate_limited": rate_limiter.rejected,
+                    "db_pool": {"dialect": db.engine.dialect.name, "status": db.engine.pool.status()},
+                    "computed_at": datetime.utcnow().isoformat()
+                }
+                cache["expires"] = now + current_app.config['HEALTH_STATS_TTL']
+    return cache["value"]
+
+
+@bp.route('/api/health/live', methods=['GET'])
+def health_live():
+    """Liveness : le processus répond, sans toucher à la base"""
+    return jsonify({"status": "ok"}), 200
+
+
+@bp.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness : base joignable et dossiers d'upload inscriptibles"""
+    checks = {}
+    try:
+        db.session.execute(text("SELECT 1"))
+        checks["database"] = "ok"
+    except Exception as e:
+        db.session.rollback()
+        checks["database"] = f"erreur: {e.__class__.__name__}"
+    for name, key in (("archives", 'UPLOAD_ARCHIVES'), ("tmp", 'UPLOAD_TMP')):
+        checks[name] = "ok" if os.access(current_app.config[key], os.W_OK) else "non inscriptible"
+
+    ready = all(v == "ok" for v in checks.values())
+    return jsonify({"status": "ok" if ready else "indisponible", "checks": checks}), 200 if ready else 503
+
+
+@bp.route('/api/health/stats', methods=['GET'])
+def health_stats():
+    """Volumétrie, mise en cache HEALTH_STATS_TTL secondes"""
+    return jsonify({
+        **cached_stats(),
+        "activity_log": activity_log.snapshot(),
+        "activity_stream": activity_stream.snapshot()
+    }), 200
+
+
+@bp.route('/api/health', methods=['GET'])
+def health_check():
+    """Ancien point de santé (Login.jsx) : statistiques en cache, sans COUNT"""
+    return jsonify({
+        "status": "ok",
+        "timestamp": datetime.utcnow().isoformat(),
+        "database": "connected",
+        **cached_stats(),
+        "activity_log": activity_log.snapshot(),
+        "activity_stream": activity_stream.snapshot()
+    }), 200
@@ -0,0 +1,90 @@
+"""
+Images des projets (captures d'écran) : validation et variantes redimensionnées.
+
+Chaque image est rangée sous son SHA-256 ; ses variantes (vignette de la
+grille Explore, format carte) sont des WebP dérivés de manière déterministe
+de l'original. Le nom d'une variante contient sa taille : changer une taille
+change l'URL, ce qui permet un cache navigateur « immutable ».
+
+Pillow est optionnel : sans lui, seuls les formats sont vérifiés (signature
+des premiers octets) et l'original est servi à la place des variantes.
+"""
+import os
+import re
+import threading
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - Pillow absent
+    Image = None
+
+
+HAS_PIL = Image is not None
+
+# nom de variante -> largeur maximale (px)
+VARIANTS = {"thumb": 320, "card": 800}
+WEBP_QUALITY = 80
+
+FORMATS = {"PNG": "png", "JPEG": "jpg", "GIF": "gif", "WEBP": "webp"}
+MIMETYPES = {"png": "image/png", "jpg": "image/jpeg", "gif": "image/gif", "webp": "image/webp"}
+
+# <sha256>.<ext> pour l'original, <sha256>-<variante><largeur>.webp pour une variante
+IMAGE_NAME = re.compile(r"^(?P<sha>[0-9a-f]{64})(?:-(?P<variant>[a-z]+)(?P<width>\d+))?\.(?P<ext>png|jpg|gif|webp)$")
+
+
+class ImageError(Exception):
+    pass
+
+
+def sniff_format(head):
+    """Format d'après la signature du fichier, None si ce n'est pas une image acceptée"""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def validate_image(path, max_pixels):
+    """Vérifie l'image et renvoie (extension, largeur, hauteur). Lève ImageError sinon."""
+    with open(path, "rb") as f:
+        ext = sniff_format(f.read(16))
+    if ext is None:
+        raise ImageError("Format d'image non accepté (PNG, JPEG, GIF ou WebP)")
+    if not HAS_PIL:
+        return ext, None, None
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            if img.format not in FORMATS:
+                raise ImageError("Format d'image non accepté (PNG, JPEG, GIF ou WebP)")
+            if width * height > max_pixels:
+                raise ImageError("Image trop grande")
+            img.verify()
+    except ImageError:
+        raise
+    except Exception:
+        raise ImageError("Image illisible ou corrompue")
+    return FORMATS[img.format], width, height
+
+
+def variant_name(sha256, variant):
+    return f"{sha256}-{variant}{VARIANTS[variant]}.webp"
+
+
+def make_variant(src_path, dest_path, width):
+    """Écrit une version WebP de largeur au plus `width` (écriture atomique)"""
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "P") else "RGB")
+        if img.width > width:
+            img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+        # Nom propre au thread : le worker d'images et une requête peuvent produire la même variante
+        tmp_path = f"{dest_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        img.save(tmp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+    os.replace(tmp_path, dest_path)
@@ -0,0 +1,245 @@
+"""
+File d'envoi d'emails persistante.
+
+Les routes ne parlent plus au serveur SMTP : elles déposent le message dans
+une table SQLite (`mail_outbox`) et répondent aussitôt. Un thread par
+processus réclame les messages dus, les envoie sur une seule connexion SMTP
+par lot, et replanifie les échecs avec un délai exponentiel. Après
+`max_attempts` essais le message passe en lettre morte (`echec`) et n'est
+plus retenté sans intervention (`retry_dead`).
+
+La file vit dans son propre fichier SQLite : elle est partagée par les
+workers gunicorn et survit aux redémarrages.
+"""
+import os
+import time
+import atexit
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from email.message import EmailMessage
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mail_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sender TEXT,
+    recipients TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'en_attente',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    claimed_at REAL,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    sent_at TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_mail_outbox_due ON mail_outbox (status, next_attempt_at);
+"""
+
+
+class MailQueue:
+    def __init__(self, db_path, smtp_factory, default_sender=None, max_attempts=6,
+                 base_delay=30.0, max_delay=3600.0, poll_interval=5.0, batch_size=20,
+                 claim_timeout=600.0):
+        """
+        smtp_factory() renvoie une connexion smtplib prête (connectée, authentifiée).
+        Délai avant le n-ième nouvel essai : base_delay * 2^(n-1), plafonné à max_delay.
+        """
+        self.db_path = db_path
+        self.smtp_factory = smtp_factory
+        self.default_sender = default_sender
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.claim_timeout = claim_timeout
+        self._pid = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        atexit.register(self.close)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # -----------------------------
+    # PRODUCTEUR
+    # -----------------------------
+    def enqueue(self, subject, recipients, body, sender=None):
+        """Enregistre le message et réveille l'envoi. Renvoie l'id du message."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO mail_outbox (sender, recipients, subject, body, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (sender or self.default_sender, ",".join(recipients), subject, body,
+                 time.time(), datetime.utcnow().isoformat())
+            )
+            message_id = cursor.lastrowid
+        self.start()
+        self._wake.set()
+        return message_id
+
+    # -----------------------------
+    # CONSOMMATEUR
+    # -----------------------------
+    def start(self):
+        # Un thread par processus : celui du maître gunicorn ne survit pas au fork
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="mail-queue", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _claim(self, conn):
+        """Réserve les messages dus (transaction IMMEDIATE : un seul worker les obtient)"""
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Réservations d'un worker mort : on les remet en file
+            conn.execute(
+                "UPDATE mail_outbox SET status = 'en_attente', claimed_at = NULL "
+                "WHERE status = 'envoi' AND claimed_at < ?",
+                (now - self.claim_timeout,)
+            )
+            rows = conn.execute(
+                "SELECT * FROM mail_outbox WHERE status = 'en_attente' AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at LIMIT ?",
+                (now, self.batch_size)
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE mail_outbox SET status = 'envoi', claimed_at = ? WHERE id = ?",
+                    [(now, row["id"]) for row in rows]
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return rows
+
+    def _build(self, row):
+        msg = EmailMessage()
+        msg["Subject"] = row["subject"]
+        msg["From"] = row["sender"]
+        msg["To"] = row["recipients"]
+        msg.set_content(row["body"])
+        return msg
+
+    def _failed(self, conn, row, error):
+        attempts = row["attempts"] + 1
+        if attempts >= self.max_attempts:
+            status, next_at = "echec", time.time()
+            logger.error("Email %s abandonné après %s essais : %s", row["id"], attempts, error)
+        else:
+            status = "en_attente"
+            next_at = time.time() + min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+        conn.execute(
+            "UPDATE mail_outbox SET status = ?, attempts = ?, next_attempt_at = ?, "
+            "claimed_at = NULL, last_error = ? WHERE id = ?",
+            (status, attempts, next_at, str(error)[:500], row["id"])
+        )
+
+    def process_once(self):
+        """Envoie un lot de messages dus. Renvoie le nombre de messages traités."""
+        with self._connect() as conn:
+            rows = self._claim(conn)
+            if not rows:
+                return 0
+            try:
+                smtp = self.smtp_factory()
+            except Exception as e:
+                for row in rows:
+                    self._failed(conn, row, e)
+                return len(rows)
+
+            # Une seule connexion (et une seule poignée de main TLS) pour tout le lot
+            try:
+                for row in rows:
+                    try:
+                        smtp.send_message(self._build(row))
+                    except Exception as e:
+                        self._failed(conn, row, e)
+                    else:
+                        conn.execute(
+                            "UPDATE mail_outbox SET status = 'envoye', attempts = attempts + 1, "
+                            "claimed_at = NULL, sent_at = ? WHERE id = ?",
+                            (datetime.utcnow().isoformat(), row["id"])
+                        )
+            finally:
+                try:
+                    smtp.quit()
+                except Exception:
+                    pass
+            return len(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Effacé avant l'envoi : un message déposé pendant le lot réveille le tour suivant
+            self._wake.clear()
+            try:
+                processed = self.process_once()
+            except Exception:
+                logger.exception("File d'emails : erreur inattendue")
+                processed = 0
+            if processed < self.batch_size:
+                self._wake.wait(self._idle_delay())
+
+    def _idle_delay(self):
+        """Attente jusqu'au prochain message dû (nouvel essai), au plus poll_interval"""
+        try:
+            with self._connect() as conn:
+                next_at = conn.execute(
+                    "SELECT min(next_attempt_at) FROM mail_outbox WHERE status = 'en_attente'"
+                ).fetchone()[0]
+        except sqlite3.Error:
+            return self.poll_interval
+        if next_at is None:
+            return self.poll_interval
+        return max(0.0, min(self.poll_interval, next_at - time.time()))
+
+    def close(self):
+        if self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self._pid = None
+
+    # -----------------------------
+    # ADMINISTRATION
+    # -----------------------------
+    def stats(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, count(*) FROM mail_outbox GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+    def retry_dead(self):
+        """Remet les lettres mortes en file. Renvoie leur nombre."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE mail_outbox SET status = 'en_attente', attempts = 0, next_attempt_at = ? "
+                "WHERE status = 'echec'",
+                (time.time(),)
+            )
+        self._wake.set()
+        return cursor.rowcount
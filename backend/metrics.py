@@ -0,0 +1,218 @@
+"""
+Métriques au format Prometheus, partagées entre les workers gunicorn.
+
+Chaque processus agrège ses mesures en mémoire (compteurs, histogrammes) ;
+un thread ajoute les variations toutes les `flush_interval` secondes à une
+table SQLite commune (`value = value + delta`). `render` lit la table : la
+réponse de `/metrics` couvre tous les workers, quel que soit celui qui la
+sert, et les compteurs ne repartent pas de zéro quand gunicorn remplace un
+worker. Les séries d'un worker apparaissent au plus `flush_interval`
+secondes après leur mesure (immédiatement pour le worker qui répond).
+
+Sans fichier (db_path None), les mesures restent dans le processus.
+"""
+import os
+import math
+import atexit
+import logging
+import sqlite3
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metric (
+    sample TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    le TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (sample, labels, le)
+);
+"""
+UPSERT = (
+    "INSERT INTO metric (sample, labels, le, value) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (sample, labels, le) DO UPDATE SET value = value + excluded.value"
+)
+HISTOGRAM_SUFFIXES = {"_bucket": 0, "_sum": 1, "_count": 2}
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    return ",".join(f'{name}="{escape(value)}"' for name, value in sorted(labels.items()))
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metrics:
+    def __init__(self, db_path=None, flush_interval=5.0):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._families = {}  # nom -> (type, aide, seuils)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}   # (échantillon, labels, le) -> variation
+        self._histograms = {}  # (nom, labels) -> [compte par intervalle…, +Inf, somme]
+        self._label_text = {}
+        self._local = {}     # totaux du processus quand il n'y a pas de fichier
+        self._pid = None
+        self._stop = threading.Event()
+        if db_path:
+            with self._connect() as conn:
+                conn.executescript(SCHEMA)
+        atexit.register(self.close)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:  # une transaction
+                yield conn
+        finally:
+            conn.close()
+
+    # -----------------------------
+    # DÉCLARATION
+    # -----------------------------
+    def counter(self, name, help_text):
+        self._families[name] = ("counter", help_text, None)
+
+    def histogram(self, name, help_text, buckets):
+        self._families[name] = ("histogram", help_text, tuple(sorted(buckets)))
+
+    # -----------------------------
+    # MESURES
+    # -----------------------------
+    def _ensure_worker(self):
+        # Un thread d'écriture par processus ; l'enfant ne reprend pas les mesures du parent
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pending = {}
+            self._histograms = {}
+            self._stop.clear()
+            if self.db_path:
+                threading.Thread(target=self._run, name="metrics", daemon=True).start()
+            self._pid = os.getpid()
+
+    def labels(self, labels):
+        """Texte des labels, mis en cache (les combinaisons sont en nombre borné)"""
+        key = tuple(labels.items())
+        text = self._label_text.get(key)
+        if text is None:
+            text = self._label_text[key] = format_labels(labels)
+        return text
+
+    def inc(self, name, value=1, **labels):
+        self._ensure_worker()
+        key = (name, self.labels(labels), "")
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Compte value dans le premier intervalle qui la contient ; cumul fait à l'écriture"""
+        self._ensure_worker()
+        buckets = self._families[name][2]
+        key = (name, self.labels(labels))
+        with self._lock:
+            counts = self._histograms.get(key)
+            if counts is None:
+                counts = self._histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            counts[bisect_left(buckets, value)] += 1
+            counts[-1] += value
+
+    def _histogram_rows(self, histograms):
+        """Variations des séries _bucket (cumulées), _sum et _count"""
+        rows = {}
+        for (name, label_text), counts in histograms.items():
+            bounds = [format_value(le) for le in self._families[name][2]] + ["+Inf"]
+            total = 0
+            for le, n in zip(bounds, counts):
+                total += n
+                rows[(f"{name}_bucket", label_text, le)] = total
+            rows[(f"{name}_count", label_text, "")] = total
+            rows[(f"{name}_sum", label_text, "")] = counts[-1]
+        return rows
+
+    # -----------------------------
+    # ÉCRITURE
+    # -----------------------------
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Reporte les variations du processus dans le total commun"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                histograms, self._histograms = self._histograms, {}
+            for key, delta in self._histogram_rows(histograms).items():
+                pending[key] = pending.get(key, 0) + delta
+            if not pending:
+                return
+            if not self.db_path:
+                for key, delta in pending.items():
+                    self._local[key] = self._local.get(key, 0) + delta
+                return
+            try:
+                with self._connect() as conn:
+                    conn.executemany(UPSERT, [(*key, delta) for key, delta in pending.items()])
+            except sqlite3.Error:
+                logger.exception("Métriques : écriture impossible, nouvel essai au prochain passage")
+                with self._lock:
+                    for key, delta in pending.items():
+                        self._pending[key] = self._pending.get(key, 0) + delta
+
+    def close(self):
+        self._stop.set()
+        if self._pid == os.getpid():
+            self.flush()
+
+    # -----------------------------
+    # LECTURE
+    # -----------------------------
+    def totals(self):
+        self.flush()
+        if not self.db_path:
+            return dict(self._local)
+        with self._connect() as conn:
+            return {(sample, labels, le): value
+                    for sample, labels, le, value in conn.execute("SELECT sample, labels, le, value FROM metric")}
+
+    def family_of(self, sample):
+        for suffix in HISTOGRAM_SUFFIXES:
+            name = sample[:-len(suffix)]
+            if sample.endswith(suffix) and self._families.get(name, ("",))[0] == "histogram":
+                return name, HISTOGRAM_SUFFIXES[suffix]
+        return sample, 0
+
+    def render(self):
+        """Texte d'exposition Prometheus (version 0.0.4) de toutes les familles déclarées"""
+        rows = {}
+        for (sample, labels, le), value in self.totals().items():
+            name, rank = self.family_of(sample)
+            order = math.inf if le == "+Inf" else float(le or 0)
+            rows.setdefault(name, []).append(((labels, rank, order), sample, labels, le, value))
+
+        lines = []
+        for name, (kind, help_text, _) in sorted(self._families.items()):
+            help_text = help_text.replace("\\", "\\\\").replace("\n", "\\n")
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for _, sample, labels, le, value in sorted(rows.get(name, [])):
+                label_text = ",".join(filter(None, [labels, f'le="{le}"' if le else ""]))
+                lines.append(f"{sample}{{{label_text}}} {format_value(value)}" if label_text
+                             else f"{sample} {format_value(value)}")
+        return "\n".join(lines) + "\n"
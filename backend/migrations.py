@@ -0,0 +1,132 @@
+"""
+Migrations de schéma versionnées.
+
+`db.create_all()` crée les tables manquantes mais ne touche jamais une table
+existante : tout changement sur une base déjà en service (index, colonnes)
+passe par une migration numérotée ci-dessous. Chaque migration est appliquée
+une seule fois, dans sa propre transaction, et enregistrée dans
+`schema_migrations`. Les instructions doivent rester idempotentes
+(IF NOT EXISTS) pour pouvoir rejouer une base créée avant ce système.
+"""
+from datetime import datetime
+
+from sqlalchemy import text, inspect
+
+
+def add_column(table, name, ddl):
+    """Étape ALTER TABLE ADD COLUMN, ignorée si create_all a déjà créé la colonne."""
+    def step(conn):
+        if name not in {c["name"] for c in inspect(conn).get_columns(table)}:
+            conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN "{name}" {ddl}'))
+    return step
+
+
+# (version, nom, étapes : instructions SQL ou fonctions recevant la connexion)
+MIGRATIONS = [
+    (1, "index_projets", [
+        # GET /api/projects et /api/admin/projects : tri (dateCreation, id)
+        'CREATE INDEX IF NOT EXISTS ix_project_date_id ON project ("dateCreation", id)',
+        # GET /api/projects/user/<id> et compteur du profil
+        'CREATE INDEX IF NOT EXISTS ix_project_auteur_date ON project ("auteurId", "dateCreation", id)',
+    ]),
+    (2, "index_telechargements", [
+        # /api/my-downloads : dernier téléchargement par projet d'un utilisateur
+        "CREATE INDEX IF NOT EXISTS ix_download_user_project_date ON download (user_id, project_id, downloaded_at)",
+        # suppression d'un projet : nettoyage de ses téléchargements
+        "CREATE INDEX IF NOT EXISTS ix_download_project ON download (project_id)",
+    ]),
+    (3, "index_activites", [
+        # /api/admin/activities : 50 plus récentes
+        "CREATE INDEX IF NOT EXISTS ix_activity_timestamp ON activity (timestamp)",
+    ]),
+    (4, "index_connexion", [
+        # /api/login : recherche insensible à la casse par email ou pseudo
+        'CREATE INDEX IF NOT EXISTS ix_user_email_lower ON "user" (lower(email))',
+        'CREATE INDEX IF NOT EXISTS ix_user_pseudo_lower ON "user" (lower(pseudo))',
+    ]),
+    (5, "archives_par_contenu", [
+        # stockage adressé par contenu : empreinte de l'archive et nom d'origine
+        add_column("project", "archiveSha256", "VARCHAR(64)"),
+        add_column("project", "fileName", "VARCHAR(255)"),
+        'CREATE INDEX IF NOT EXISTS ix_project_archive ON project ("archiveSha256")',
+    ]),
+    (6, "index_activites_filtres", [
+        # /api/admin/activities : pagination (timestamp, id) et archivage des plus anciennes
+        "CREATE INDEX IF NOT EXISTS ix_activity_timestamp_id ON activity (timestamp, id)",
+        "DROP INDEX IF EXISTS ix_activity_timestamp",
+        # filtres par action et par utilisateur, dans l'ordre de la pagination
+        "CREATE INDEX IF NOT EXISTS ix_activity_action_timestamp ON activity (action, timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS ix_activity_user_timestamp ON activity (user_id, timestamp, id)",
+    ]),
+    (7, "index_archive_en_double", [
+        # archiveSha256 était aussi indexée par create_all (index=True) : doublon de ix_project_archive
+        'DROP INDEX IF EXISTS "ix_project_archiveSha256"',
+    ]),
+]
+
+
+def applied_versions(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at VARCHAR(32) NOT NULL)"
+    ))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(engine):
+    """Applique les migrations manquantes, dans l'ordre. Renvoie les versions appliquées."""
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+
+    applied = []
+    for version, name, statements in sorted(MIGRATIONS):
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(text(statement))
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :at)"),
+                {"v": version, "n": name, "at": datetime.utcnow().isoformat()}
+            )
+        applied.append(version)
+    return applied
+
+
+# -----------------------------
+# VÉRIFICATION DES PLANS D'EXÉCUTION
+# -----------------------------
+def explain(conn, query):
+    """Plan SQLite (EXPLAIN QUERY PLAN) d'une requête ORM, sous forme de lignes texte."""
+    compiled = query.statement.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup or [])
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, params)
+    return [row[-1] for row in rows]
+
+
+def full_scans(plan, tables):
+    """Lignes du plan qui parcourent une table entière sans index (sous-requêtes exclues)."""
+    return [
+        line for line in plan
+        if line.startswith("SCAN ") and line.split()[1] in tables and " USING " not in line
+    ]
+
+
+def check_query_plans(engine, queries):
+    """
+    Renvoie {nom: lignes fautives} pour chaque requête chaude dont le plan
+    retombe sur un parcours complet de table. Vide si tout passe par un index.
+    """
+    if engine.dialect.name != 'sqlite':
+        raise RuntimeError("La vérification des plans ne gère que SQLite")
+    failures = {}
+    with engine.connect() as conn:
+        tables = set(inspect(conn).get_table_names())
+        for name, query in queries.items():
+            scans = full_scans(explain(conn, query), tables)
+            if scans:
+                failures[name] = scans
+    return failures
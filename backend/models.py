@@ -0,0 +1,330 @@
+"""
+Modèles, tags, compteurs matérialisés et index plein texte.
+
+`init_schema` est l'initialisation du schéma faite une seule fois par
+application (voir Resources dans extensions.py) : tables, migrations,
+rattachement des tags, compteurs et index FTS5.
+"""
+import re
+import html
+import uuid
+from datetime import datetime
+
+from sqlalchemy import func, event, text, table, column, literal_column
+from sqlalchemy.exc import OperationalError
+
+from extensions import db, resources
+from migrations import run_migrations
+
+
+# -----------------------------
+# MODÈLES
+# -----------------------------
+class User(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    matricule = db.Column(db.String(20), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    pseudo = db.Column(db.String(80), unique=True, nullable=False)
+    password = db.Column(db.String(255), nullable=False)
+    role = db.Column(db.String(20), default="stagiaire")
+    dateInscription = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Project(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    titre = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    technologies = db.Column(db.JSON)
+    categorie = db.Column(db.String(50))
+    auteurId = db.Column(db.String(36))
+    auteurNom = db.Column(db.String(100))
+    dateCreation = db.Column(db.DateTime, default=datetime.utcnow)
+    taille = db.Column(db.String(20))
+    images = db.Column(db.JSON)
+    filePath = db.Column(db.String(255))
+    archiveSha256 = db.Column(db.String(64))  # index ix_project_archive (migration 5)
+    fileName = db.Column(db.String(255))
+    tags = db.relationship('Technology', secondary='project_technology', lazy='select')
+
+# Compteurs matérialisés : scope = 'global' ou id utilisateur
+class Counter(db.Model):
+    scope = db.Column(db.String(36), primary_key=True)
+    name = db.Column(db.String(30), primary_key=True)  # users | projects | downloads | activities
+    value = db.Column(db.BigInteger, default=0, nullable=False)
+
+# Archives stockées par contenu (SHA-256), partagées entre projets identiques
+class ArchiveBlob(db.Model):
+    sha256 = db.Column(db.String(64), primary_key=True)
+    path = db.Column(db.String(255), nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Contenu d'une archive (par empreinte) : fichiers, langages, README et petits fichiers texte
+class ArchiveManifest(db.Model):
+    sha256 = db.Column(db.String(64), primary_key=True)
+    status = db.Column(db.String(20), nullable=False)  # pret | echec
+    format = db.Column(db.String(10))
+    entries = db.Column(db.JSON)
+    languages = db.Column(db.JSON)
+    readme_path = db.Column(db.String(500))
+    previews = db.Column(db.JSON)
+    truncated = db.Column(db.Boolean, default=False)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Sessions d'upload par morceaux (create -> PUT chunks -> finalize)
+class UploadSession(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    filename = db.Column(db.String(255), nullable=False)
+    total_size = db.Column(db.BigInteger)
+    sha256 = db.Column(db.String(64))
+    received = db.Column(db.BigInteger, default=0, nullable=False)
+    next_chunk = db.Column(db.Integer, default=0, nullable=False)
+    status = db.Column(db.String(20), default="en_cours", nullable=False)  # en_cours | termine
+    filePath = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Technologies normalisées : une ligne par tag, reliée aux projets par une table d'association
+project_technology = db.Table(
+    'project_technology',
+    db.Column('project_id', db.String(36), db.ForeignKey('project.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('technology_id', db.Integer, db.ForeignKey('technology.id'), primary_key=True),
+    db.Index('ix_project_technology_technology', 'technology_id', 'project_id')
+)
+
+class Technology(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nom = db.Column(db.String(80), nullable=False)
+    slug = db.Column(db.String(80), unique=True, nullable=False, index=True)
+
+# Table pour les activités/logs
+class Activity(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.String(36))
+    user_name = db.Column(db.String(100))
+    action = db.Column(db.String(200))
+    details = db.Column(db.Text)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Table pour suivre les téléchargements
+class Download(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.String(36), nullable=False)
+    project_id = db.Column(db.String(36), nullable=False)
+    downloaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# -----------------------------
+# TECHNOLOGIES (TAGS)
+# -----------------------------
+def technology_slug(name):
+    return ' '.join(name.split()).lower()
+
+
+def get_or_create_technologies(names):
+    """Renvoie les Technology correspondant aux noms donnés, en créant les manquantes."""
+    by_slug = {}
+    for name in names or []:
+        name = ' '.join(str(name).split())
+        if name:
+            by_slug.setdefault(technology_slug(name), name)
+    if not by_slug:
+        return []
+
+    existing = {t.slug: t for t in Technology.query.filter(Technology.slug.in_(list(by_slug)))}
+    for slug, name in by_slug.items():
+        if slug not in existing:
+            existing[slug] = Technology(nom=name, slug=slug)
+            db.session.add(existing[slug])
+    return [existing[slug] for slug in by_slug]
+
+
+def sync_project_technologies():
+    """Relie aux tags les projets créés avant l'apparition de la table project_technology."""
+    orphans = Project.query\
+        .outerjoin(project_technology, project_technology.c.project_id == Project.id)\
+        .filter(project_technology.c.project_id.is_(None), Project.technologies.isnot(None))\
+        .all()
+    for project in orphans:
+        project.tags = get_or_create_technologies(project.technologies)
+    if orphans:
+        db.session.commit()
+
+
+def technology_filter(names, mode='all'):
+    """
+    Clause sur Project.id : projets portant tous les tags (mode 'all')
+    ou au moins un (mode 'any'). Résolue par l'index de project_technology.
+    """
+    slugs = {technology_slug(n) for n in names if n.strip()}
+    subquery = db.session.query(project_technology.c.project_id)\
+        .join(Technology, Technology.id == project_technology.c.technology_id)\
+        .filter(Technology.slug.in_(slugs))
+    if mode == 'all':
+        subquery = subquery.group_by(project_technology.c.project_id)\
+            .having(func.count(project_technology.c.technology_id) == len(slugs))
+    return Project.id.in_(subquery)
+
+
+# -----------------------------
+# COMPTEURS
+# -----------------------------
+# Tenus à jour dans la transaction de chaque écriture : les lectures (profil,
+# santé) ne font plus de COUNT(*). `flask repair-counters` les recalcule.
+GLOBAL_SCOPE = 'global'
+
+COUNTER_UPSERT = text(
+    "INSERT INTO counter (scope, name, value) VALUES (:scope, :name, :delta) "
+    "ON CONFLICT (scope, name) DO UPDATE SET value = counter.value + excluded.value"
+)
+
+
+def counter_changes(name, delta, user_id=None):
+    """Variation d'un compteur global, et de celui de l'utilisateur s'il est donné"""
+    changes = [{"scope": GLOBAL_SCOPE, "name": name, "delta": delta}]
+    if user_id:
+        changes.append({"scope": user_id, "name": name, "delta": delta})
+    return changes
+
+
+def bump_counters(changes, connection=None):
+    """Applique les variations dans la transaction en cours (session ou connexion donnée)"""
+    if changes:
+        (connection or db.session).execute(COUNTER_UPSERT, changes)
+
+
+def read_counters(scope):
+    return {c.name: c.value for c in Counter.query.filter_by(scope=scope)}
+
+
+def rebuild_counters():
+    """Recalcule tous les compteurs à partir des tables"""
+    Counter.query.delete()
+    rows = [
+        {"scope": GLOBAL_SCOPE, "name": "users", "value": User.query.count()},
+        {"scope": GLOBAL_SCOPE, "name": "projects", "value": Project.query.count()},
+        {"scope": GLOBAL_SCOPE, "name": "downloads", "value": Download.query.count()},
+        {"scope": GLOBAL_SCOPE, "name": "activities", "value": Activity.query.count()},
+    ]
+    per_user = [
+        ("projects", Project.auteurId),
+        ("downloads", Download.user_id),
+        ("activities", Activity.user_id),
+    ]
+    for name, user_column in per_user:
+        counts = db.session.query(user_column, func.count())\
+            .filter(user_column.isnot(None))\
+            .group_by(user_column)
+        rows += [{"scope": scope, "name": name, "value": n} for scope, n in counts]
+    db.session.execute(Counter.__table__.insert(), rows)
+    db.session.commit()
+
+
+# -----------------------------
+# RECHERCHE PLEIN TEXTE (SQLite FTS5)
+# -----------------------------
+# Index externe synchronisé avec Project. Le tokenizer unicode61 retire les
+# accents : "développeur" est trouvé par "developpeur" et inversement.
+project_fts = table('project_fts', column('project_id'))
+
+FTS_INSERT = text(
+    "INSERT INTO project_fts (project_id, titre, description, technologies, auteurNom) "
+    "VALUES (:id, :titre, :description, :technologies, :auteurNom)"
+)
+FTS_DELETE = text("DELETE FROM project_fts WHERE project_id = :id")
+
+# Poids bm25 par colonne : project_id, titre, description, technologies, auteurNom
+FTS_RANK = literal_column("bm25(project_fts, 0.0, 10.0, 1.0, 5.0, 3.0)")
+# Termes trouvés encadrés par deux caractères à usage privé (U+E000, U+E001) plutôt que
+# par <mark> : le texte saisi est échappé ensuite (mark_matches), puis seuls ces
+# marqueurs deviennent du HTML.
+FTS_MARK_START, FTS_MARK_END = "\ue000", "\ue001"
+FTS_TITLE = literal_column("highlight(project_fts, 1, char(57344), char(57345))")
+FTS_SNIPPET = literal_column("snippet(project_fts, 2, char(57344), char(57345), '…', 16)")
+
+
+def mark_matches(value):
+    """Texte surligné par FTS5 → HTML sûr : contenu échappé, termes trouvés dans <mark>"""
+    if value is None:
+        return None
+    return html.escape(value).replace(FTS_MARK_START, "<mark>").replace(FTS_MARK_END, "</mark>")
+
+
+def setup_fulltext():
+    """Crée l'index FTS5 et le reconstruit s'il n'est plus aligné sur la table project."""
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS project_fts USING fts5("
+                "project_id UNINDEXED, titre, description, technologies, auteurNom, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+            indexed = conn.execute(text("SELECT count(*) FROM project_fts")).scalar()
+            total = conn.execute(text("SELECT count(*) FROM project")).scalar()
+            if indexed != total:
+                conn.execute(text("DELETE FROM project_fts"))
+                conn.execute(text(
+                    "INSERT INTO project_fts (project_id, titre, description, technologies, auteurNom) "
+                    "SELECT id, titre, coalesce(description, ''), coalesce(technologies, ''), "
+                    "coalesce(auteurNom, '') FROM project"
+                ))
+    except OperationalError:
+        # SQLite compilé sans FTS5 : on retombe sur la recherche LIKE
+        return False
+    return True
+
+
+def fulltext_enabled():
+    """Index FTS5 en place pour l'application courante (fixé par init_schema)"""
+    return resources().fulltext
+
+
+def fts_params(project):
+    return {
+        "id": project.id,
+        "titre": project.titre,
+        "description": project.description or '',
+        "technologies": ' '.join(project.technologies or []),
+        "auteurNom": project.auteurNom or ''
+    }
+
+
+@event.listens_for(Project, 'after_insert')
+def fts_after_insert(mapper, connection, target):
+    if fulltext_enabled():
+        connection.execute(FTS_INSERT, fts_params(target))
+
+
+@event.listens_for(Project, 'after_update')
+def fts_after_update(mapper, connection, target):
+    if fulltext_enabled():
+        connection.execute(FTS_DELETE, {"id": target.id})
+        connection.execute(FTS_INSERT, fts_params(target))
+
+
+@event.listens_for(Project, 'after_delete')
+def fts_after_delete(mapper, connection, target):
+    if fulltext_enabled():
+        connection.execute(FTS_DELETE, {"id": target.id})
+
+
+def fts_match_expression(q):
+    """Transforme la saisie utilisateur en requête FTS5 : chaque mot en préfixe, tous requis."""
+    terms = re.findall(r'\w+', q, re.UNICODE)
+    return ' '.join(f'"{t}"*' for t in terms)
+
+
+# -----------------------------
+# INITIALISATION DU SCHÉMA
+# -----------------------------
+def init_schema(app):
+    """Tables, migrations, tags, compteurs et index plein texte (une fois par application)"""
+    with app.app_context():
+        db.create_all()
+        run_migrations(db.engine)
+        sync_project_technologies()
+        if not Counter.query.first():
+            rebuild_counters()
+        resources(app).fulltext = setup_fulltext()
@@ -0,0 +1,107 @@
+"""
+Pagination par curseur (keyset) et projection des listes (?fields=).
+"""
+import json
+import base64
+from datetime import datetime
+
+from flask import request, jsonify
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import load_only
+
+from models import Project
+from serializers import iso, serialize_fields
+
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 200
+
+
+def encode_cursor(date_value, row_id):
+    # Date NULL (lignes anciennes sans date) : [null, id]
+    raw = json.dumps([iso(date_value), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Décode un curseur opaque en (date ou None, id). Lève ValueError si invalide."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date_str, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (None if date_str is None else datetime.fromisoformat(date_str)), str(row_id)
+    except Exception:
+        raise ValueError("Curseur invalide")
+
+
+def after_cursor(date_col, id_col, last_date, last_id):
+    """Lignes après (last_date, last_id) dans l'ordre date décroissante (NULL en dernier), id décroissant"""
+    if last_date is None:
+        return and_(date_col.is_(None), id_col < last_id)
+    return or_(
+        date_col < last_date,
+        and_(date_col == last_date, id_col < last_id),
+        date_col.is_(None)
+    )
+
+
+def parse_limit():
+    """Lit ?limit=, borné à [1, MAX_PAGE_LIMIT]. Lève ValueError si non numérique."""
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_LIMIT))
+    except ValueError:
+        raise ValueError("Paramètre limit invalide")
+    return max(1, min(limit, MAX_PAGE_LIMIT))
+
+
+def parse_fields(spec):
+    """Lit le paramètre ?fields=a,b,c et ne garde que les champs connus."""
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    fields = [f.strip() for f in raw.split(',') if f.strip() in spec]
+    return fields or None
+
+
+def keyset_page(query, date_col, id_col, serialize):
+    """
+    Pagine une requête triée par (date_col, id_col) décroissants, dates NULL en dernier.
+    Renvoie {"items": [...], "next_cursor": "..."} : `limit` (défaut DEFAULT_PAGE_LIMIT)
+    éléments au plus, next_cursor à null sur la dernière page.
+    Les lignes doivent exposer la date et l'id sous les noms des colonnes de tri.
+    """
+    query = query.order_by(date_col.desc().nullslast(), id_col.desc())
+    try:
+        limit = parse_limit()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            last_date, last_id = decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        query = query.filter(after_cursor(date_col, id_col, last_date, last_id))
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, date_col.key), getattr(last, id_col.key))
+
+    return jsonify({
+        "items": [serialize(row) for row in rows],
+        "next_cursor": next_cursor
+    })
+
+
+def project_listing(query, spec):
+    """Liste de projets paginée, avec projection optionnelle via ?fields=."""
+    fields = parse_fields(spec)
+    if fields:
+        columns = {spec[f][0] for f in fields} | {"id", "dateCreation"}
+        query = query.options(load_only(*[getattr(Project, c) for c in columns]))
+
+    return keyset_page(query, Project.dateCreation, Project.id,
+                       lambda p: serialize_fields(p, spec, fields))
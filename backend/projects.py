@@ -0,0 +1,724 @@
+"""
+Blueprint projects : projets, archives (stockage par contenu, manifestes),
+images, uploads par morceaux, recherche et technologies.
+"""
+import os
+import re
+import uuid
+import shutil
+import hashlib
+import mimetypes
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, current_app, request, jsonify, send_file
+from sqlalchemy import func, or_, text, literal_column, exists, select
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import secure_filename
+
+from activities import log_activity
+from archive_inspect import ArchiveError, CORRUPT_ARCHIVE_ERRORS, inspect_archive, open_entry, is_text_candidate
+from extensions import db, initialized, response_cache, manifest_worker, image_worker
+from images import HAS_PIL, VARIANTS, IMAGE_NAME, MIMETYPES, ImageError, validate_image, variant_name, make_variant
+from models import (User, Project, ArchiveBlob, ArchiveManifest, UploadSession, Technology, project_technology,
+                    get_or_create_technologies, technology_filter, counter_changes, bump_counters,
+                    project_fts, FTS_RANK, FTS_TITLE, FTS_SNIPPET, mark_matches, fulltext_enabled,
+                    fts_match_expression)
+from pagination import parse_limit, project_listing
+from response_cache import cached_response
+from serializers import serialize_fields, PROJECT_FIELDS, USER_PROJECT_FIELDS, SEARCH_PROJECT_FIELDS
+
+
+bp = Blueprint('projects', __name__, cli_group=None)
+
+
+# -----------------------------
+# PROJECTS
+# -----------------------------
+@bp.route('/api/projects', methods=['GET', 'POST'])
+@cached_response
+def projects():
+    if request.method == 'GET':
+        return project_listing(Project.query, PROJECT_FIELDS)
+
+    # POST un nouveau projet : formulaire et archive vérifiés avant toute écriture
+    titre = (request.form.get('titre') or '').strip()
+    if not titre or len(titre) > 200:
+        return jsonify({"error": "Titre requis (200 caractères au maximum)"}), 400
+
+    file = request.files.get('file')
+    upload_id = request.form.get('uploadId')
+    upload = None
+    src_path, sha256, original_name = None, None, None
+
+    if upload_id:
+        # Archive envoyée par morceaux : la session doit être finalisée (checksum vérifié)
+        upload = UploadSession.query.get(upload_id)
+        if not upload:
+            return jsonify({"error": "Session d'upload introuvable"}), 404
+        if upload.status != "termine":
+            return jsonify({"error": "Upload non finalisé"}), 409
+        if not (upload.filePath and os.path.exists(upload.filePath)):
+            return jsonify({"error": "Archive de la session introuvable, renvoyez-la"}), 410
+        src_path, sha256, original_name = upload.filePath, upload.sha256, upload.filename
+
+    try:
+        images = store_images(request.files.getlist('images'))
+    except ImageError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if file and not upload:
+        src_path = os.path.join(current_app.config['UPLOAD_TMP'], str(uuid.uuid4()))
+        sha256 = save_stream(file.stream, src_path)
+        original_name = secure_filename(file.filename)
+
+    project = Project(
+        titre=titre,
+        description=request.form.get('description'),
+        auteurId=request.form.get('auteurId'),
+        auteurNom=request.form.get('auteurNom'),
+        technologies=request.form.getlist('technologies'),
+        categorie=request.form.get('categorie'),
+        taille="0 MB",
+        fileName=original_name,
+        images=images
+    )
+    blob, placed = None, None
+    try:
+        project.tags = get_or_create_technologies(project.technologies)
+        db.session.add(project)
+        db.session.flush()
+        # L'archive ne rejoint le stockage qu'une fois la ligne du projet acceptée
+        if src_path:
+            blob, placed = store_archive(src_path, sha256)
+            project.taille = format_size(blob.size)
+            project.filePath = blob.path
+            project.archiveSha256 = blob.sha256
+        if upload:
+            db.session.delete(upload)
+        bump_counters(counter_changes("projects", 1, project.auteurId))
+        db.session.commit()
+    except Exception:
+        # Rien n'est enregistré : la session reste finalisée et réutilisable avec son fichier
+        db.session.rollback()
+        if blob:
+            unstore_archive(blob.sha256, placed)
+        if src_path and not upload and os.path.exists(src_path):
+            os.remove(src_path)
+        release_images(images)
+        raise
+    if src_path and os.path.exists(src_path):
+        os.remove(src_path)
+    response_cache.invalidate()
+    if blob:
+        # Inspection du contenu hors requête (sans effet si le contenu est déjà connu)
+        manifest_worker.submit(blob.sha256)
+    for image in images:
+        image_worker.submit(f"{image['sha256']}.{image['ext']}")
+
+    # Log de l'activité
+    if project.auteurId:
+        user = User.query.get(project.auteurId)
+        if user:
+            log_activity(
+                user_id=user.id,
+                user_name=user.pseudo,
+                action="Nouveau projet",
+                details=f"Projet créé: {project.titre}"
+            )
+
+    return jsonify({"message": "Projet enregistré", "projectId": project.id}), 201
+
+
+@bp.route('/api/projects/<project_id>', methods=['GET'])
+@cached_response
+def get_project(project_id):
+    """Un projet (ProjectDetails, ProjectProfile), au format des listes"""
+    project = Project.query.get(project_id)
+    if not project:
+        return jsonify({"error": "Projet non trouvé"}), 404
+    return jsonify(serialize_fields(project, PROJECT_FIELDS))
+
+
+def format_size(num_bytes):
+    return f"{num_bytes / (1024 * 1024):.2f} MB"
+
+
+# -----------------------------
+# ARCHIVE STORAGE (PAR CONTENU)
+# -----------------------------
+def blob_path(sha256):
+    return os.path.join(current_app.config['UPLOAD_ARCHIVES'], sha256[:2], sha256)
+
+
+def save_stream(stream, dest_path):
+    """Écrit un flux sur disque bloc par bloc et renvoie son SHA-256"""
+    digest = hashlib.sha256()
+    with open(dest_path, 'wb') as out:
+        for block in iter(lambda: stream.read(1024 * 1024), b''):
+            digest.update(block)
+            out.write(block)
+    return digest.hexdigest()
+
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return save_stream(f, os.devnull)
+
+
+def store_archive(src_path, sha256=None):
+    """
+    Range une copie de src_path (lien dur si possible) dans le stockage par contenu
+    et ajoute une référence au blob. Ne commit pas et laisse src_path en place :
+    l'appelant le supprime après commit, ou appelle unstore_archive après rollback.
+    Renvoie (blob, chemin créé par cet appel ou None).
+    """
+    sha256 = sha256 or file_sha256(src_path)
+    blob = ArchiveBlob.query.get(sha256)
+    placed = None
+    if not (blob and os.path.exists(blob.path)):
+        path = blob_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            link_or_copy(src_path, path)
+            placed = path
+        if blob is None:
+            blob = ArchiveBlob(sha256=sha256, path=path, size=os.path.getsize(path), ref_count=0)
+            try:
+                # Savepoint : un dépôt simultané du même contenu a pu créer le blob entre-temps
+                with db.session.begin_nested():
+                    db.session.add(blob)
+            except IntegrityError:
+                blob = ArchiveBlob.query.get(sha256)
+    ArchiveBlob.query.filter_by(sha256=sha256)\
+        .update({"ref_count": ArchiveBlob.ref_count + 1})
+    return blob, placed
+
+
+def link_or_copy(src_path, dest_path):
+    """Lien dur vers src_path, copie si le stockage est sur un autre système de fichiers"""
+    tmp_path = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.link(src_path, tmp_path)
+    except OSError:
+        shutil.copyfile(src_path, tmp_path)
+    os.replace(tmp_path, dest_path)
+
+
+def unstore_archive(sha256, placed):
+    """Après rollback : retire le fichier rangé par store_archive si aucun blob ne l'a adopté"""
+    if placed and ArchiveBlob.query.get(sha256) is None and os.path.exists(placed):
+        os.remove(placed)
+
+
+def release_archive(sha256, count=1):
+    """
+    Retire `count` références au blob. Renvoie le chemin à supprimer après commit
+    si c'étaient les dernières, sinon None.
+    """
+    ArchiveBlob.query.filter_by(sha256=sha256)\
+        .update({"ref_count": ArchiveBlob.ref_count - count})
+    blob = ArchiveBlob.query.get(sha256)
+    if blob and blob.ref_count <= 0:
+        db.session.delete(blob)
+        ArchiveManifest.query.filter_by(sha256=sha256).delete()
+        return blob.path
+    return None
+
+
+def archive_name(project):
+    """Nom de fichier présenté au téléchargement"""
+    return project.fileName or os.path.basename(project.filePath)
+
+
+@bp.cli.command('dedupe-archives')
+@initialized
+def dedupe_archives_command():
+    """Migre les archives existantes vers le stockage par contenu et fusionne les doublons."""
+    legacy = Project.query.filter(Project.filePath.isnot(None), Project.archiveSha256.is_(None)).all()
+    migrated, missing = 0, 0
+    for project in legacy:
+        if not os.path.exists(project.filePath):
+            missing += 1
+            continue
+        name = os.path.basename(project.filePath)
+        # Anciens noms : "<uuid>_<nom d'origine>"
+        if re.match(r'^[0-9a-f-]{36}_', name):
+            name = name[37:]
+        legacy_path = project.filePath
+        blob, _ = store_archive(legacy_path)
+        project.archiveSha256 = blob.sha256
+        project.filePath = blob.path
+        project.fileName = name
+        project.taille = format_size(blob.size)
+        db.session.commit()
+        os.remove(legacy_path)
+        migrated += 1
+    if migrated:
+        # Chemins et tailles ont changé : listes et détails en cache sont périmés
+        response_cache.invalidate()
+    blobs = ArchiveBlob.query.count()
+    print(f"{migrated} archive(s) migrée(s), {blobs} contenu(s) unique(s), {missing} fichier(s) introuvable(s)")
+
+
+# -----------------------------
+# CONTENU DES ARCHIVES (MANIFESTES)
+# -----------------------------
+INLINE_IMAGE_TYPES = {'image/png', 'image/jpeg', 'image/gif', 'image/webp'}
+
+
+def build_manifest(sha256):
+    """Inspecte l'archive et enregistre son manifeste (une fois par contenu)"""
+    config = current_app.config
+    blob = ArchiveBlob.query.get(sha256)
+    if blob is None or not os.path.exists(blob.path):
+        return
+    if ArchiveManifest.query.get(sha256):
+        return
+    manifest = ArchiveManifest(sha256=sha256)
+    try:
+        result = inspect_archive(blob.path, config['ARCHIVE_MAX_ENTRIES'],
+                                 config['ARCHIVE_PREVIEW_MAX_BYTES'], config['ARCHIVE_PREVIEW_TOTAL_BYTES'])
+    except ArchiveError as e:
+        manifest.status, manifest.error = "echec", str(e)
+    else:
+        manifest.status = "pret"
+        for key, value in result.items():
+            setattr(manifest, key, value)
+    db.session.add(manifest)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Construit en même temps par un autre worker
+        db.session.rollback()
+
+
+def ready_manifest(project):
+    """(manifeste prêt, None) ou (None, réponse d'erreur / d'attente)"""
+    if not project.archiveSha256:
+        return None, (jsonify({"error": "Aucune archive pour ce projet"}), 404)
+    manifest = ArchiveManifest.query.get(project.archiveSha256)
+    if manifest is None:
+        manifest_worker.submit(project.archiveSha256)
+        response = jsonify({"status": "en_cours"})
+        response.status_code = 202
+        response.headers["Retry-After"] = "2"
+        return None, response
+    if manifest.status != "pret":
+        return None, (jsonify({"status": manifest.status, "error": manifest.error}), 422)
+    return manifest, None
+
+
+@bp.route('/api/projects/<project_id>/files', methods=['GET'])
+def project_files(project_id):
+    """Arborescence de l'archive, langages et README, sans télécharger l'archive"""
+    project = Project.query.get_or_404(project_id)
+    manifest, error = ready_manifest(project)
+    if error:
+        return error
+    previews = manifest.previews or {}
+    response = jsonify({
+        "status": manifest.status,
+        "format": manifest.format,
+        "entries": manifest.entries,
+        "languages": manifest.languages,
+        "readme": {
+            "path": manifest.readme_path,
+            "content": previews.get(manifest.readme_path)
+        } if manifest.readme_path else None,
+        "previewable": sorted(previews),
+        "truncated": manifest.truncated
+    })
+    # Le manifeste dépend uniquement du contenu : l'empreinte suffit comme ETag
+    response.set_etag(manifest.sha256)
+    return response.make_conditional(request)
+
+
+def entry_mimetype(path):
+    guessed = mimetypes.guess_type(path)[0]
+    if guessed in INLINE_IMAGE_TYPES:
+        return guessed
+    if is_text_candidate(path):
+        # HTML, SVG, JS… servis en texte brut : jamais interprétés par le navigateur
+        return 'text/plain'
+    return 'application/octet-stream'
+
+
+@bp.route('/api/projects/<project_id>/files/<path:entry_path>', methods=['GET'])
+def project_file_entry(project_id, entry_path):
+    """Un fichier de l'archive, lu directement dans l'archive (rien n'est extrait sur disque)"""
+    project = Project.query.get_or_404(project_id)
+    manifest, error = ready_manifest(project)
+    if error:
+        return error
+
+    previews = manifest.previews or {}
+    if entry_path in previews:
+        response = Response(previews[entry_path], mimetype='text/plain')
+    else:
+        entry = next((e for e in manifest.entries if e["path"] == entry_path and not e["dir"]), None)
+        if entry is None:
+            return jsonify({"error": "Fichier introuvable dans l'archive"}), 404
+        if entry["size"] > current_app.config['ARCHIVE_ENTRY_MAX_BYTES']:
+            return jsonify({"error": "Fichier trop volumineux pour l'aperçu, téléchargez l'archive"}), 413
+        if not (project.filePath and os.path.exists(project.filePath)):
+            return jsonify({"error": "Fichier introuvable"}), 404
+        # Lu en entier (taille bornée ci-dessus) : une entrée corrompue n'est détectée
+        # qu'à la lecture (CRC vérifié en fin de membre), avant l'envoi des en-têtes
+        try:
+            content = b''.join(open_entry(project.filePath, entry_path))
+        except KeyError:
+            return jsonify({"error": "Fichier introuvable dans l'archive"}), 404
+        except (ArchiveError,) + CORRUPT_ARCHIVE_ERRORS:
+            return jsonify({"error": "Fichier illisible dans l'archive"}), 422
+        response = Response(content, mimetype=entry_mimetype(entry_path))
+
+    filename = secure_filename(os.path.basename(entry_path)) or "fichier"
+    disposition = 'attachment' if response.mimetype == 'application/octet-stream' else 'inline'
+    response.headers['Content-Disposition'] = f'{disposition}; filename="{filename}"'
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    response.headers['Content-Security-Policy'] = "default-src 'none'; img-src 'self'; style-src 'unsafe-inline'"
+    response.headers['Cache-Control'] = 'private, max-age=3600'
+    response.set_etag(hashlib.sha256(f"{manifest.sha256}:{entry_path}".encode()).hexdigest())
+    return response.make_conditional(request)
+
+
+@bp.cli.command('inspect-archives')
+@initialized
+def inspect_archives_command():
+    """Construit les manifestes manquants (archives déposées avant l'inspection)."""
+    known = {sha for (sha,) in db.session.query(ArchiveManifest.sha256)}
+    missing = [sha for (sha,) in db.session.query(ArchiveBlob.sha256) if sha not in known]
+    for sha256 in missing:
+        build_manifest(sha256)
+    failed = ArchiveManifest.query.filter_by(status="echec").count()
+    print(f"{len(missing)} archive(s) inspectée(s), {failed} illisible(s) au total")
+
+
+# -----------------------------
+# IMAGES DES PROJETS
+# -----------------------------
+IMAGE_CACHE_SECONDS = 365 * 24 * 3600
+
+
+def image_path(name):
+    return os.path.join(current_app.config['UPLOAD_IMAGES'], name[:2], name)
+
+
+def store_images(files):
+    """
+    Valide et range les images envoyées (par empreinte). Renvoie la liste à
+    enregistrer dans Project.images ; lève ImageError au premier fichier refusé.
+    """
+    config = current_app.config
+    files = [f for f in files if f and f.filename]
+    if len(files) > config['IMAGE_MAX_COUNT']:
+        raise ImageError(f"{config['IMAGE_MAX_COUNT']} images au maximum")
+    stored = []
+    for file in files:
+        tmp_path = os.path.join(config['UPLOAD_TMP'], str(uuid.uuid4()))
+        sha256 = save_stream(file.stream, tmp_path)
+        try:
+            if os.path.getsize(tmp_path) > config['IMAGE_MAX_BYTES']:
+                raise ImageError(f"Image trop lourde : {file.filename}")
+            ext, width, height = validate_image(tmp_path, config['IMAGE_MAX_PIXELS'])
+        except ImageError:
+            os.remove(tmp_path)
+            raise
+        path = image_path(f"{sha256}.{ext}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        stored.append({"sha256": sha256, "ext": ext, "width": width, "height": height})
+    return stored
+
+
+def build_image_variants(original):
+    """Génère les variantes WebP manquantes d'une image ("<sha256>.<ext>")"""
+    if not HAS_PIL or not os.path.exists(image_path(original)):
+        return
+    sha256 = original.split('.')[0]
+    for variant, width in VARIANTS.items():
+        dest = image_path(variant_name(sha256, variant))
+        if not os.path.exists(dest):
+            make_variant(image_path(original), dest, width)
+
+
+# Colonnes par SELECT : sous la limite des anciens SQLite (2000)
+IMAGE_CHECK_CHUNK = 500
+
+
+def release_images(images):
+    """Supprime les fichiers des images qu'aucun projet n'utilise plus (après commit)"""
+    if not images:
+        return
+    # Un EXISTS par image, arrêté au premier projet qui l'utilise, tous dans la même requête
+    # (sans relire la colonne images de tous les projets)
+    in_use = set()
+    for start in range(0, len(images), IMAGE_CHECK_CHUNK):
+        chunk = [image['sha256'] for image in images[start:start + IMAGE_CHECK_CHUNK]]
+        checks = [exists().where(db.cast(Project.images, db.Text).contains(sha256)) for sha256 in chunk]
+        in_use.update(sha256 for sha256, used in zip(chunk, db.session.execute(select(*checks)).one()) if used)
+    for image in images:
+        sha256 = image['sha256']
+        if sha256 in in_use:
+            continue
+        names = [f"{sha256}.{image['ext']}"] + [variant_name(sha256, v) for v in VARIANTS]
+        for name in names:
+            if os.path.exists(image_path(name)):
+                os.remove(image_path(name))
+
+
+def original_image(sha256):
+    """Chemin de l'original d'une image, quelle que soit son extension"""
+    paths = (image_path(f"{sha256}.{ext}") for ext in MIMETYPES)
+    return next((path for path in paths if os.path.exists(path)), None)
+
+
+@bp.route('/api/images/<name>', methods=['GET'])
+def serve_image(name):
+    """
+    Image ou variante, à URL immuable (le nom contient l'empreinte du contenu) :
+    cache navigateur d'un an, ETag et If-None-Match pour les revalidations.
+    """
+    match = IMAGE_NAME.match(name)
+    if not match:
+        return jsonify({"error": "Image introuvable"}), 404
+    path = image_path(name)
+    variant = match.group('variant')
+    if variant and match.group('ext') != 'webp':
+        # Les variantes n'existent qu'en WebP : pas d'octets WebP servis sous un autre type
+        return jsonify({"error": "Image introuvable"}), 404
+    if variant and not os.path.exists(path):
+        if VARIANTS.get(variant) != int(match.group('width')) or not HAS_PIL:
+            return jsonify({"error": "Image introuvable"}), 404
+        # Variante pas encore générée en arrière-plan : on la produit maintenant
+        original = original_image(match.group('sha'))
+        if original is None:
+            return jsonify({"error": "Image introuvable"}), 404
+        make_variant(original, path, VARIANTS[variant])
+    if not os.path.exists(path):
+        return jsonify({"error": "Image introuvable"}), 404
+
+    response = send_file(os.path.abspath(path), mimetype=MIMETYPES[match.group('ext')], conditional=True,
+                         etag=name, max_age=IMAGE_CACHE_SECONDS)
+    response.headers['Cache-Control'] = f'public, max-age={IMAGE_CACHE_SECONDS}, immutable'
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+
+# -----------------------------
+# CHUNKED UPLOADS
+# -----------------------------
+def upload_state(upload):
+    return {
+        "uploadId": upload.id,
+        "filename": upload.filename,
+        "received": upload.received,
+        "nextChunk": upload.next_chunk,
+        "chunkSize": current_app.config['UPLOAD_CHUNK_SIZE'],
+        "status": upload.status
+    }
+
+
+def upload_part_path(upload_id):
+    return os.path.join(current_app.config['UPLOAD_TMP'], f"{upload_id}.part")
+
+
+@bp.route('/api/uploads', methods=['POST'])
+def create_upload():
+    """Ouvre une session d'upload par morceaux"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Corps JSON attendu"}), 400
+    filename = data.get('filename')
+    filename = secure_filename(filename) if isinstance(filename, str) else ''
+    if not filename:
+        return jsonify({"error": "Nom de fichier requis"}), 400
+
+    size = data.get('size')
+    max_size = current_app.config['UPLOAD_MAX_SIZE']
+    # bool est un int en Python : true ne doit pas passer pour 1 octet
+    if size is not None and (not isinstance(size, int) or isinstance(size, bool) or not 0 < size <= max_size):
+        return jsonify({"error": f"Taille invalide : entier entre 1 et {max_size} octets attendu"}), 400
+
+    sha256 = data.get('sha256') or ''
+    if not isinstance(sha256, str) or (sha256 and not re.fullmatch(r'[0-9a-fA-F]{64}', sha256)):
+        return jsonify({"error": "Checksum SHA-256 invalide"}), 400
+
+    upload = UploadSession(filename=filename, total_size=size, sha256=sha256.lower() or None)
+    db.session.add(upload)
+    db.session.commit()
+    open(upload_part_path(upload.id), 'wb').close()
+    return jsonify(upload_state(upload)), 201
+
+
+@bp.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    """État d'une session : permet au client de reprendre au bon morceau"""
+    upload = UploadSession.query.get_or_404(upload_id)
+    return jsonify(upload_state(upload)), 200
+
+
+@bp.route('/api/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+def put_upload_chunk(upload_id, index):
+    """Reçoit le morceau n° index (corps brut), écrit sur disque au fil de l'eau"""
+    upload = UploadSession.query.get_or_404(upload_id)
+    if upload.status != "en_cours":
+        return jsonify({"error": "Upload déjà finalisé"}), 409
+    if index < upload.next_chunk:
+        # Morceau déjà reçu (renvoi après coupure) : rien à faire
+        return jsonify(upload_state(upload)), 200
+    if index > upload.next_chunk:
+        return jsonify({"error": "Morceau hors séquence", **upload_state(upload)}), 409
+
+    declared = request.headers.get('X-Chunk-SHA256', '').lower()
+    chunk_size = current_app.config['UPLOAD_CHUNK_SIZE']
+    digest = hashlib.sha256()
+    written = 0
+    with open(upload_part_path(upload.id), 'r+b') as part:
+        # Repartir de la fin du dernier morceau validé (écrase un morceau interrompu)
+        part.seek(upload.received)
+        part.truncate()
+        while True:
+            block = request.stream.read(64 * 1024)
+            if not block:
+                break
+            written += len(block)
+            if written > chunk_size:
+                part.truncate(upload.received)
+                return jsonify({"error": "Morceau trop volumineux", "chunkSize": chunk_size}), 413
+            digest.update(block)
+            part.write(block)
+
+    if written == 0:
+        # Un morceau vide n'avance pas la session (une archive vide se finalise sans morceau)
+        return jsonify({"error": "Morceau vide", **upload_state(upload)}), 400
+    if declared and declared != digest.hexdigest():
+        return jsonify({"error": "Checksum du morceau invalide", **upload_state(upload)}), 422
+    if upload.total_size is not None and upload.received + written > upload.total_size:
+        return jsonify({"error": "Taille déclarée dépassée", **upload_state(upload)}), 422
+    if upload.received + written > current_app.config['UPLOAD_MAX_SIZE']:
+        return jsonify({"error": "Archive trop volumineuse", **upload_state(upload)}), 413
+
+    # Avance conditionnelle : un PUT concurrent du même morceau ne compte qu'une fois
+    updated = UploadSession.query\
+        .filter_by(id=upload.id, next_chunk=index)\
+        .update({"received": upload.received + written, "next_chunk": index + 1})
+    db.session.commit()
+    if not updated:
+        db.session.refresh(upload)
+        return jsonify({"error": "Morceau hors séquence", **upload_state(upload)}), 409
+
+    db.session.refresh(upload)
+    return jsonify({**upload_state(upload), "chunkSha256": digest.hexdigest()}), 200
+
+
+@bp.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """Vérifie taille et checksum de l'archive complète avant qu'un projet puisse l'utiliser"""
+    upload = UploadSession.query.get_or_404(upload_id)
+    if upload.status == "termine":
+        return jsonify(upload_state(upload)), 200
+
+    part_path = upload_part_path(upload.id)
+    if upload.total_size is not None and upload.received != upload.total_size:
+        return jsonify({"error": "Upload incomplet", **upload_state(upload)}), 409
+
+    digest = hashlib.sha256()
+    with open(part_path, 'rb') as part:
+        for block in iter(lambda: part.read(1024 * 1024), b''):
+            digest.update(block)
+    sha256 = digest.hexdigest()
+    if upload.sha256 and upload.sha256 != sha256:
+        return jsonify({"error": "Checksum de l'archive invalide", "sha256": sha256}), 422
+
+    # Le fichier vérifié reste en attente : il rejoint le stockage par contenu
+    # à la création du projet (voir store_archive)
+    upload.sha256 = sha256
+    upload.filePath = part_path
+    upload.status = "termine"
+    db.session.commit()
+    return jsonify({**upload_state(upload), "sha256": sha256}), 200
+
+
+@bp.cli.command('purge-uploads')
+@initialized
+def purge_uploads_command():
+    """Supprime les sessions d'upload abandonnées (plus vieilles que UPLOAD_SESSION_TTL_HOURS)."""
+    cutoff = datetime.utcnow() - timedelta(hours=current_app.config['UPLOAD_SESSION_TTL_HOURS'])
+    stale = UploadSession.query.filter(UploadSession.created_at < cutoff).all()
+    for upload in stale:
+        for path in (upload_part_path(upload.id), upload.filePath):
+            if path and os.path.exists(path):
+                os.remove(path)
+        db.session.delete(upload)
+    db.session.commit()
+    print(f"{len(stale)} session(s) supprimée(s)")
+
+
+# -----------------------------
+# USER PROJECTS
+# -----------------------------
+@bp.route('/api/projects/user/<user_id>', methods=['GET'])
+def get_user_projects(user_id):
+    return project_listing(Project.query.filter_by(auteurId=user_id), USER_PROJECT_FIELDS)
+
+
+# -----------------------------
+# SEARCH & FILTER
+# -----------------------------
+@bp.route('/api/projects/search')
+@cached_response
+def search_projects():
+    q = request.args.get('q', '').strip()
+    techs = [t for t in request.args.getlist('tech') if t.strip()]
+    tech_mode = 'any' if request.args.get('tech_mode') == 'any' else 'all'
+    try:
+        limit = parse_limit()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    match = fts_match_expression(q) if fulltext_enabled() else None
+    if match:
+        # Classement bm25 + extraits surlignés, servis par l'index FTS5
+        query = db.session.query(Project, FTS_TITLE, FTS_SNIPPET)\
+            .join(project_fts, project_fts.c.project_id == Project.id)\
+            .filter(text("project_fts MATCH :match"))\
+            .params(match=match)\
+            .order_by(FTS_RANK)
+    else:
+        query = db.session.query(Project, literal_column("NULL"), literal_column("NULL"))
+        if q:
+            pattern = f"%{q}%"
+            query = query.filter(or_(
+                Project.titre.ilike(pattern),
+                Project.description.ilike(pattern),
+                Project.auteurNom.ilike(pattern)
+            ))
+        query = query.order_by(Project.dateCreation.desc(), Project.id.desc())
+
+    if techs:
+        query = query.filter(technology_filter(techs, tech_mode))
+
+    results = query.limit(limit).all()
+    return jsonify([{
+        **serialize_fields(p, SEARCH_PROJECT_FIELDS),
+        # HTML échappé : seules les balises <mark> viennent du serveur
+        "titreSurligne": mark_matches(title_hl or p.titre),
+        "extrait": mark_matches(snippet)
+    } for p, title_hl, snippet in results])
+
+
+@bp.route('/api/technologies')
+@cached_response
+def technology_facets():
+    """Liste des technologies avec leur nombre de projets (facettes de recherche)"""
+    count = func.count(project_technology.c.project_id)
+    rows = db.session.query(Technology.nom, Technology.slug, count)\
+        .join(project_technology, project_technology.c.technology_id == Technology.id)\
+        .group_by(Technology.id)\
+        .order_by(count.desc(), Technology.slug)\
+        .all()
+    return jsonify([{"nom": nom, "slug": slug, "count": n} for nom, slug, n in rows])
@@ -0,0 +1,106 @@
+"""
+Limitation de débit par seau à jetons.
+
+Protège les routes coûteuses (hachage de mot de passe, envoi d'email) avant
+que la vue ne s'exécute : une requête refusée coûte une lecture/écriture
+dans le stockage éphémère et renvoie un 429 avec `Retry-After`.
+
+Une limite s'écrit "capacité/période" : "5/60" autorise une rafale de 5
+requêtes puis 5 par minute en régime établi. Chaque route combine
+plusieurs règles (par IP, par identifiant…) ; toutes doivent passer.
+Avec `refund_if`, le jeton est rendu quand la réponse le justifie (ex. une
+connexion réussie) : seuls les échecs épuisent le seau. Une règle peut
+nommer une limite de `RateLimiter.limits` (réglée par l'application) au
+lieu de l'écrire en dur.
+"""
+import math
+from functools import wraps
+
+from flask import request, jsonify, make_response
+
+
+def parse_rate(spec):
+    """"5/60" -> (5, 5/60 jetons par seconde)"""
+    capacity, period = spec.split("/")
+    capacity, period = float(capacity), float(period)
+    if capacity <= 0 or period <= 0:
+        raise ValueError(f"Limite invalide : {spec}")
+    return capacity, capacity / period
+
+
+class RateLimiter:
+    def __init__(self, store, limits=None, enabled=True):
+        """
+        store doit fournir consume(key, capacity, refill_rate) (voir ephemeral_store).
+        limits : nom -> "capacité/période", utilisables dans les règles.
+        """
+        self.store = store
+        self.limits = limits or {}
+        self.enabled = enabled
+        self.rejected = 0
+
+    def _buckets(self, name, rules):
+        for scope, spec, key_fn in rules:
+            key = key_fn()
+            if key:
+                yield (f"{name}:{scope}:{key}",) + parse_rate(self.limits.get(spec, spec))
+
+    def check(self, name, rules):
+        """
+        Applique les règles [(portée, "capacité/période" ou nom de limite, fonction_clé)].
+        Renvoie None si la requête passe, sinon le délai d'attente en secondes.
+        """
+        retry_after = 0.0
+        for key, capacity, refill_rate in self._buckets(name, rules):
+            allowed, wait = self.store.consume(key, capacity, refill_rate)
+            if not allowed:
+                retry_after = max(retry_after, wait)
+        return retry_after or None
+
+    def refund(self, name, rules):
+        for key, capacity, refill_rate in self._buckets(name, rules):
+            self.store.consume(key, capacity, refill_rate, cost=-1)
+
+
+def limit(limiter, name, rules, refund_if=None):
+    """
+    Décorateur de vue : 429 + Retry-After quand une règle est épuisée.
+    limiter est lu à chaque requête : ce peut être un proxy vers le
+    limiteur de l'application courante (extensions.rate_limiter).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not limiter.enabled:
+                return view(*args, **kwargs)
+            retry_after = limiter.check(name, rules)
+            if retry_after is not None:
+                limiter.rejected += 1
+                response = jsonify({"error": "Trop de requêtes, réessayez plus tard"})
+                response.status_code = 429
+                response.headers["Retry-After"] = str(math.ceil(retry_after))
+                return response
+            response = make_response(view(*args, **kwargs))
+            if refund_if and refund_if(response):
+                limiter.refund(name, rules)
+            return response
+        return wrapper
+    return decorator
+
+
+def client_ip():
+    return request.remote_addr
+
+
+def json_field(name, normalize=str.lower):
+    """Fonction clé lisant un champ du corps JSON (identifiant, email…)"""
+    def key():
+        data = request.get_json(silent=True) or {}
+        value = str(data.get(name) or "").strip()
+        return normalize(value) if value else None
+    return key
+
+
+def view_arg(name):
+    """Fonction clé lisant un paramètre de l'URL (ex. user_id)"""
+    return lambda: (request.view_args or {}).get(name)
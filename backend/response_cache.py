@@ -0,0 +1,92 @@
+"""
+Cache des réponses GET (ETag / 304), partagé par les routes de liste.
+"""
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request, make_response
+
+from compression import compress_response
+from extensions import response_cache
+
+
+class ResponseCache:
+    """
+    Cache LRU borné des réponses GET, indexé par (chemin, query string).
+    La version est partagée entre workers via la date de modification d'un
+    fichier témoin : toute écriture la fait avancer et périme le cache.
+    """
+
+    def __init__(self, version_file, max_entries=256):
+        self.version_file = version_file
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self):
+        try:
+            return os.stat(self.version_file).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1:]
+
+    def set(self, key, version, etag, body, mimetype, encoded):
+        """encoded : variantes compressées du corps (encodage -> octets), remplies à la demande"""
+        with self._lock:
+            self._entries[key] = (version, etag, body, mimetype, encoded)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            with open(self.version_file, 'a'):
+                pass
+            # mtime_ns strictement croissant même pour deux écritures rapprochées
+            now = max(time.time_ns(), self.version() + 1)
+            os.utime(self.version_file, ns=(now, now))
+
+
+def cached_response(view):
+    """Met en cache la réponse GET de la vue et gère If-None-Match (304)."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != 'GET':
+            return view(*args, **kwargs)
+
+        key = (request.path, request.query_string)
+        version = response_cache.version()
+        entry = response_cache.get(key, version)
+        if entry is None:
+            rv = make_response(view(*args, **kwargs))
+            if rv.status_code != 200:
+                return rv
+            body = rv.get_data()
+            etag = hashlib.sha1(body).hexdigest()
+            entry = (etag, body, rv.mimetype, {})
+            response_cache.set(key, version, *entry)
+
+        etag, body, mimetype, encoded = entry
+        response = make_response(body)
+        response.mimetype = mimetype
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response = response.make_conditional(request)
+        config = current_app.config
+        if config['COMPRESS_ENABLED'] and response.status_code == 200:
+            # corps compressé une fois par encodage, réutilisé tant que l'entrée est valide
+            compress_response(response, request.accept_encodings, config['COMPRESS_MIN_BYTES'], encoded)
+        return response
+    return wrapper
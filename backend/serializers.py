@@ -0,0 +1,134 @@
+"""
+Sérialisation JSON des réponses.
+
+Backend orjson s'il est installé (encodage en C, dates et UUID compris,
+sortie UTF-8 compacte), sinon le module json standard réglé pour le même
+rendu. Les vues passent les datetime tels quels : ils sortent en ISO 8601
+(`2025-11-03T14:05:00.123456`) sans appel à .isoformat() par ligne.
+`JSONProvider` branche ce backend sur jsonify et request.get_json.
+
+Les formes des projets (liste publique, projets d'un auteur, admin,
+recherche) sont décrites ici une seule fois, colonne par colonne.
+"""
+import json
+import uuid
+import decimal
+from datetime import date, time
+
+from flask.json.provider import JSONProvider as BaseJSONProvider
+
+from images import HAS_PIL, VARIANTS, variant_name
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson absent
+    orjson = None
+
+
+HAS_ORJSON = orjson is not None
+
+
+def default(value):
+    """Types que le backend n'encode pas seul (orjson gère déjà dates et UUID)"""
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type non sérialisable en JSON : {type(value).__name__}")
+
+
+if HAS_ORJSON:
+    def dumps(obj):
+        """Encode en JSON (bytes UTF-8)"""
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+    loads = orjson.loads
+else:
+    def dumps(obj):
+        """Encode en JSON (bytes UTF-8)"""
+        return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":")).encode()
+
+    loads = json.loads
+
+
+class JSONProvider(BaseJSONProvider):
+    """jsonify et request.get_json via dumps/loads ci-dessus"""
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+# -----------------------------
+# FORMES DES PROJETS
+# -----------------------------
+def iso(value):
+    return value.isoformat() if value else None
+
+
+def image_urls(images):
+    """URLs à empreinte des images d'un projet ; sans Pillow, l'original sert de variante"""
+    urls = []
+    for image in images or []:
+        original = f"{image['sha256']}.{image['ext']}"
+        sized = {
+            variant: f"/api/images/{variant_name(image['sha256'], variant) if HAS_PIL else original}"
+            for variant in VARIANTS
+        }
+        urls.append({**sized, "original": f"/api/images/{original}",
+                     "width": image.get("width"), "height": image.get("height")})
+    return urls
+
+
+# Champs exposés par les listes de projets : clé JSON -> (colonne, formateur)
+PROJECT_FIELDS = {
+    "id": ("id", None),
+    "titre": ("titre", None),
+    "description": ("description", None),
+    "technologies": ("technologies", None),
+    "categorie": ("categorie", None),
+    "auteurId": ("auteurId", None),
+    "auteurNom": ("auteurNom", None),
+    "dateCreation": ("dateCreation", None),
+    "taille": ("taille", None),
+    "filePath": ("filePath", None),
+    "images": ("images", image_urls),
+}
+
+USER_PROJECT_FIELDS = {
+    key: PROJECT_FIELDS[key]
+    for key in ("id", "titre", "description", "categorie", "dateCreation", "technologies", "taille", "images")
+}
+
+ADMIN_PROJECT_FIELDS = {
+    "id": ("id", None),
+    "titre": ("titre", None),
+    "auteur": ("auteurNom", None),
+    "dateCreation": ("dateCreation", None),
+    "categorie": ("categorie", None),
+}
+
+# Résultats de recherche, complétés par titreSurligne et extrait
+SEARCH_PROJECT_FIELDS = {
+    key: PROJECT_FIELDS[key]
+    for key in ("id", "titre", "technologies", "auteurNom", "categorie")
+}
+
+
+def serialize_fields(obj, spec, fields=None):
+    keys = fields if fields else spec.keys()
+    result = {}
+    for key in keys:
+        column, formatter = spec[key]
+        value = getattr(obj, column)
+        result[key] = formatter(value) if formatter else value
+    return result
@@ -0,0 +1,81 @@
+"""
+Journal d'activité en écriture différée : compteurs cohérents sous accès
+concurrents, vidage à la fermeture.
+
+    cd backend && python -m pytest -q test_activity_log.py
+"""
+import threading
+
+from activity_log import ActivityLogger
+
+
+class Sink:
+    """write_batch en mémoire"""
+    def __init__(self):
+        self.rows = []
+        self.lock = threading.Lock()
+
+    def __call__(self, rows):
+        with self.lock:
+            self.rows.extend(rows)
+
+
+def test_counters_stay_consistent_across_threads():
+    sink = Sink()
+    log = ActivityLogger(sink, max_queue=100000, batch_size=50, flush_interval=0.01)
+    threads = [threading.Thread(target=lambda: [log.log(action="Connexion") for _ in range(2000)])
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.close()
+
+    stats = log.snapshot()
+    assert stats["queued"] == 16000
+    assert stats["written"] == len(sink.rows) == 16000
+    assert stats["dropped"] == stats["pending"] == 0
+
+
+def test_close_writes_pending_events():
+    sink = Sink()
+    # Ni la taille de lot ni le délai ne sont atteints : seule la fermeture écrit
+    log = ActivityLogger(sink, batch_size=1000, flush_interval=30)
+    for i in range(10):
+        log.log(action="Connexion", details=str(i))
+    log.close()
+
+    assert [row["details"] for row in sink.rows] == [str(i) for i in range(10)]
+    assert log.snapshot()["pending"] == 0
+
+
+def test_failed_batch_is_retried():
+    sink = Sink()
+    failures = [RuntimeError("base verrouillée")]
+
+    def flaky(rows):
+        if failures:
+            raise failures.pop()
+        sink(rows)
+
+    log = ActivityLogger(flaky, batch_size=1000, flush_interval=0.5)
+    log.log(action="Connexion")
+    log.flush()
+    assert sink.rows == [] and log.snapshot()["pending"] == 1
+    log.close()
+
+    stats = log.snapshot()
+    assert len(sink.rows) == 1
+    assert (stats["failed_batches"], stats["written"], stats["pending"]) == (1, 1, 0)
+
+
+def test_full_queue_drops_events():
+    gate = threading.Event()
+    sink = Sink()
+    log = ActivityLogger(lambda rows: gate.wait(5) and sink(rows), max_queue=5, batch_size=1000, flush_interval=30)
+    results = [log.log(action="Connexion") for _ in range(10)]
+    gate.set()
+    log.close()
+
+    assert results.count(False) == log.snapshot()["dropped"] > 0
+    assert len(sink.rows) == results.count(True)
@@ -0,0 +1,135 @@
+"""
+Flux SSE des activités : reprise depuis Last-Event-ID (activités manquées
+rejouées dans l'ordre, égalités de date comprises), puis direct.
+
+    cd backend && python -m pytest -q test_activity_stream.py
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db, activity_log
+from models import Activity
+from pagination import encode_cursor
+
+
+START = datetime.utcnow().replace(microsecond=0) - timedelta(hours=1)
+# Deux activités à la même seconde : l'id départage
+ACTIVITIES = [("a1", START), ("a2", START + timedelta(minutes=1)), ("a3", START + timedelta(minutes=1)),
+              ("a4", START + timedelta(minutes=2))]
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(STREAM_HEARTBEAT=0.05, STREAM_POLL_INTERVAL=0.05, STREAM_RETRY_MS=2000)
+    with app.app_context():
+        db.session.add_all([
+            Activity(id=activity_id, user_id="u1", user_name="u1", action="Connexion", details=activity_id,
+                     timestamp=timestamp)
+            for activity_id, timestamp in ACTIVITIES
+        ])
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class Stream:
+    """Lecture incrémentale d'une réponse SSE du client de test"""
+    def __init__(self, response):
+        self.response = response
+        self.chunks = iter(response.response)
+
+    def events(self, n):
+        """Les n prochains événements `activity` (les ping sont ignorés)"""
+        events = []
+        while len(events) < n:
+            frame = next(self.chunks)
+            frame = frame.decode() if isinstance(frame, bytes) else frame
+            if frame.startswith("id: "):
+                fields = dict(line.split(": ", 1) for line in frame.strip().split("\n"))
+                events.append({**json.loads(fields["data"]), "event_id": fields["id"], "event": fields["event"]})
+        return events
+
+    def close(self):
+        self.response.close()
+
+
+def open_stream(client, last_event_id=None):
+    headers = {"Last-Event-ID": last_event_id} if last_event_id else {}
+    response = client.get("/api/admin/activities/stream", headers=headers, buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    return Stream(response)
+
+
+def cursor(activity_id):
+    return encode_cursor(dict(ACTIVITIES)[activity_id], activity_id)
+
+
+# -----------------------------
+# REPRISE
+# -----------------------------
+def test_resume_replays_missed_activities_in_order(client):
+    stream = open_stream(client, cursor("a2"))
+    try:
+        assert next(stream.chunks) == b"retry: 2000\n\n"
+        events = stream.events(2)
+    finally:
+        stream.close()
+    # a3 a la même date que a2 : rejouée grâce à l'id du curseur
+    assert [e["details"] for e in events] == ["a3", "a4"]
+    assert [e["event_id"] for e in events] == [cursor("a3"), cursor("a4")]
+    assert {e["event"] for e in events} == {"activity"}
+
+
+def test_resume_then_live_then_resume_again(app, client):
+    stream = open_stream(client, cursor("a3"))
+    try:
+        assert [e["details"] for e in stream.events(1)] == ["a4"]
+        # Nouvelle activité pendant que le flux est ouvert : diffusée en direct
+        with app.app_context():
+            activity_log.log(user_id="u1", user_name="u1", action="Connexion", details="a5")
+            activity_log.flush()
+        live = stream.events(1)[0]
+        assert live["details"] == "a5"
+    finally:
+        stream.close()
+
+    # Reconnexion depuis le dernier id reçu : seule l'activité écrite depuis est rejouée
+    with app.app_context():
+        newer = Activity(id="a6", user_id="u1", user_name="u1", action="Connexion", details="a6",
+                         timestamp=datetime.utcnow() + timedelta(seconds=1))
+        db.session.add(newer)
+        db.session.commit()
+    stream = open_stream(client, live["event_id"])
+    try:
+        assert [e["details"] for e in stream.events(1)] == ["a6"]
+    finally:
+        stream.close()
+
+
+def test_last_event_id_query_parameter(client):
+    response = client.get(f"/api/admin/activities/stream?last_event_id={cursor('a3')}", buffered=False)
+    stream = Stream(response)
+    try:
+        assert [e["details"] for e in stream.events(1)] == ["a4"]
+    finally:
+        stream.close()
+
+
+def test_invalid_last_event_id_is_rejected(client):
+    response = client.get("/api/admin/activities/stream", headers={"Last-Event-ID": "pas-un-curseur"})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Curseur invalide"
+
+
+def test_subscriber_limit_returns_503(make_app):
+    client = make_app(STREAM_MAX_SUBSCRIBERS=0, STREAM_RETRY_MS=3000).test_client()
+    response = client.get("/api/admin/activities/stream")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
@@ -0,0 +1,178 @@
+"""
+Opérations groupées de l'administration : suppression de projets (fichiers
+supprimés après le commit seulement), changement de rôle et import CSV.
+
+    cd backend && python -m pytest -q test_admin_bulk.py
+"""
+import io
+import os
+
+import pytest
+
+import admin
+from extensions import db, activity_log
+from models import User, Project, Activity, ArchiveBlob
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(RATE_LIMIT_ENABLED=False)
+    with app.app_context():
+        db.session.add_all([
+            User(id=f"u{i}", matricule=f"MAT-{i}", email=f"u{i}@simplon.co", pseudo=f"stagiaire{i}",
+                 password="x", role="stagiaire")
+            for i in range(3)
+        ])
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def create_project(client, titre, archive):
+    response = client.post("/api/projects", data={
+        "titre": titre, "auteurId": "u0", "auteurNom": "stagiaire0",
+        "file": (io.BytesIO(archive), "projet.zip"),
+    }, content_type="multipart/form-data")
+    assert response.status_code == 201
+    return response.get_json()["projectId"]
+
+
+def activities(app, action):
+    with app.app_context():
+        activity_log.flush()
+        return Activity.query.filter_by(action=action).all()
+
+
+# -----------------------------
+# SUPPRESSION GROUPÉE
+# -----------------------------
+def test_bulk_delete_reports_each_id_and_removes_unreferenced_files(app, client):
+    shared = [create_project(client, f"Partagé {i}", b"archive commune") for i in range(2)]
+    alone = create_project(client, "Seul", b"archive unique")
+    with app.app_context():
+        paths = {p.id: p.filePath for p in Project.query}
+
+    response = client.post("/api/admin/projects/bulk-delete", json={"ids": [shared[0], alone, "inconnu"]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["deleted"] == 2
+    assert body["results"] == [
+        {"id": shared[0], "status": "supprime"},
+        {"id": alone, "status": "supprime"},
+        {"id": "inconnu", "status": "introuvable"},
+    ]
+    # L'archive encore utilisée par shared[1] reste, l'autre part avec son dernier projet
+    assert os.path.exists(paths[shared[1]])
+    assert not os.path.exists(paths[alone])
+    with app.app_context():
+        assert [p.id for p in Project.query] == [shared[1]]
+        assert [(b.ref_count, b.path) for b in ArchiveBlob.query] == [(1, paths[shared[1]])]
+    assert len(activities(app, "Suppression projets (lot)")) == 1
+
+
+def test_failed_bulk_delete_keeps_rows_and_files(app, client, monkeypatch):
+    ids = [create_project(client, f"Projet {i}", f"archive {i}".encode()) for i in range(2)]
+    with app.app_context():
+        paths = [p.filePath for p in Project.query]
+
+    def fail(changes):
+        raise RuntimeError("échec d'écriture")
+
+    monkeypatch.setattr(admin, "bump_counters", fail)
+    with pytest.raises(RuntimeError):
+        client.post("/api/admin/projects/bulk-delete", json={"ids": ids})
+    assert all(os.path.exists(path) for path in paths)
+    with app.app_context():
+        assert Project.query.count() == 2
+        assert sorted(b.ref_count for b in ArchiveBlob.query) == [1, 1]
+
+
+@pytest.mark.parametrize("body", [{}, {"ids": []}, {"ids": "p1"}, {"ids": [1, 2]}])
+def test_bulk_delete_rejects_invalid_ids(client, body):
+    assert client.post("/api/admin/projects/bulk-delete", json=body).status_code == 400
+
+
+# -----------------------------
+# CHANGEMENT DE RÔLE GROUPÉ
+# -----------------------------
+def test_bulk_role_change(app, client):
+    with app.app_context():
+        db.session.get(User, "u1").role = "formateur"
+        db.session.commit()
+
+    response = client.post("/api/admin/users/bulk-role", json={"ids": ["u0", "u1", "absent"], "role": "formateur"})
+    assert response.status_code == 200
+    assert response.get_json() == {"updated": 1, "results": [
+        {"id": "u0", "status": "modifie", "ancienRole": "stagiaire"},
+        {"id": "u1", "status": "inchange"},
+        {"id": "absent", "status": "introuvable"},
+    ]}
+    with app.app_context():
+        assert db.session.get(User, "u0").role == "formateur"
+    assert len(activities(app, "Changement de rôle (lot)")) == 1
+
+
+def test_bulk_role_change_rejects_unknown_role(client):
+    response = client.post("/api/admin/users/bulk-role", json={"ids": ["u0"], "role": "super-admin"})
+    assert response.status_code == 400
+
+
+# -----------------------------
+# IMPORT CSV
+# -----------------------------
+CSV = (
+    "matricule,email,pseudo,password,role\n"
+    "mat-100,Nouveau@Simplon.co,nouveau,secret,\n"
+    "AD-101,chef@simplon.co,chef,secret,\n"
+    "MAT-102,u1@simplon.co,autre,secret,\n"        # email déjà en base
+    "MAT-103,double@simplon.co,nouveau,secret,\n"  # pseudo en double dans le fichier
+    "XYZ-104,x@simplon.co,x,secret,\n"             # matricule invalide
+)
+
+
+def test_csv_import_creates_valid_rows_in_one_transaction(app, client):
+    response = client.post("/api/admin/users/import", data=CSV.encode(), content_type="text/csv")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body["created"], body["errors"]) == (2, 3)
+    assert [(r["ligne"], r["status"]) for r in body["results"]] == [
+        (2, "cree"), (3, "cree"), (4, "erreur"), (5, "erreur"), (6, "erreur")]
+    assert body["results"][2]["error"] == "email déjà utilisé"
+
+    with app.app_context():
+        nouveau = User.query.filter_by(pseudo="nouveau").one()
+        assert (nouveau.matricule, nouveau.email, nouveau.role) == ("MAT-100", "nouveau@simplon.co", "stagiaire")
+        assert User.query.filter_by(pseudo="chef").one().role == "admin"
+        assert nouveau.password != "secret"
+    assert len(activities(app, "Import utilisateurs")) == 1
+
+
+def test_csv_import_is_all_or_nothing(app, client, monkeypatch):
+    def fail(changes):
+        raise RuntimeError("échec d'écriture")
+
+    monkeypatch.setattr(admin, "bump_counters", fail)
+    with pytest.raises(RuntimeError):
+        client.post("/api/admin/users/import", data=CSV.encode(), content_type="text/csv")
+    with app.app_context():
+        assert User.query.count() == 3
+    assert activities(app, "Import utilisateurs") == []
+
+
+def test_csv_import_over_the_limit_writes_nothing(make_app):
+    app = make_app(BULK_IMPORT_MAX_ROWS=2)
+    rows = "".join(f"MAT-{i},n{i}@simplon.co,n{i},secret,\n" for i in range(3))
+    response = app.test_client().post("/api/admin/users/import", content_type="text/csv",
+                                      data=("matricule,email,pseudo,password,role\n" + rows).encode())
+    assert response.status_code == 413
+    with app.app_context():
+        assert User.query.filter(User.pseudo.like("n%")).count() == 0
+
+
+def test_csv_import_requires_header(client):
+    response = client.post("/api/admin/users/import", data=b"a,b\n1,2\n", content_type="text/csv")
+    assert response.status_code == 400
@@ -6,7 +6,7 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 import smtplib
-from email.mime.text import MIMEText
+from mail_queue import MailQueue
 
 load_dotenv()
 
@@ -16,12 +16,12 @@ CORS(app)
 # -----------------------
 # FICHIERS JSON
 # -----------------------
-USERS_FILE = "data/users.json"
-CODES_FILE = "data/codes.json"
-PROJECTS_FILE = "data/projects.json"
-ACTIVITIES_FILE = "data/activities.json"
-
-os.makedirs("data", exist_ok=True)
+# Sous DATA_DIR (défaut backend/data), quel que soit le dossier courant ; créé à la première écriture
+DATA_DIR = os.getenv("DATA_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+USERS_FILE = os.path.join(DATA_DIR, "users.json")
+CODES_FILE = os.path.join(DATA_DIR, "codes.json")
+PROJECTS_FILE = os.path.join(DATA_DIR, "projects.json")
+ACTIVITIES_FILE = os.path.join(DATA_DIR, "activities.json")
 
 # -----------------------
 # FONCTIONS UTILITAIRES
@@ -36,6 +36,7 @@ def read_json(path):
             return []
 
 def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=4, ensure_ascii=False)
 
@@ -45,18 +46,34 @@ def write_json(path, data):
 SMTP_EMAIL = os.getenv("SMTP_EMAIL")
 SMTP_PASS = os.getenv("SMTP_PASS")
 
-def send_activation_email(email, code):
-    try:
-        msg = MIMEText(f"Votre code d'activation est : {code}")
-        msg["Subject"] = "Code d'activation Simplon Code Hub"
-        msg["From"] = SMTP_EMAIL
-        msg["To"] = email
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 465))
+
+
+def smtp_connection():
+    smtp = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=30)
+    smtp.login(SMTP_EMAIL, SMTP_PASS)
+    return smtp
+
 
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            smtp.login(SMTP_EMAIL, SMTP_PASS)
-            smtp.send_message(msg)
+_mail_queue = None
 
-        print("📩 Email envoyé !")
+
+def get_mail_queue():
+    # Créée au premier envoi : importer ce module n'écrit rien sur disque
+    global _mail_queue
+    if _mail_queue is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        _mail_queue = MailQueue(os.path.join(DATA_DIR, "mail_outbox.db"), smtp_connection,
+                                default_sender=SMTP_EMAIL)
+    return _mail_queue
+
+
+def send_activation_email(email, code):
+    # Mis en file : envoyé en arrière-plan, avec nouveaux essais en cas d'échec SMTP
+    try:
+        get_mail_queue().enqueue("Code d'activation Simplon Code Hub", [email], f"Votre code d'activation est : {code}")
+        print("📩 Email mis en file !")
         return True
     except Exception as e:
         print("❌ Erreur email :", e)
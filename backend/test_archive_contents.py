@@ -0,0 +1,121 @@
+"""
+Contenu des archives : manifeste en échec (422) pour une archive illisible,
+entrée corrompue détectée à la lecture (422 avant l'envoi des en-têtes).
+
+    cd backend && python -m pytest -q test_archive_contents.py
+"""
+import io
+import time
+import tarfile
+import zipfile
+
+import pytest
+
+from extensions import db
+from models import ArchiveManifest
+
+
+README = "# Projet\nDocumentation.\n"
+DATA = bytes(range(256)) * 64  # 16 Ko binaires : jamais prévisualisés
+
+
+def zip_archive():
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_STORED) as zf:
+        zf.writestr("README.md", README)
+        zf.writestr("assets/data.bin", DATA)
+    return archive.getvalue()
+
+
+def corrupted_member(archive):
+    """Même archive, un octet du membre data.bin inversé (répertoire central intact)"""
+    offset = archive.index(DATA) + len(DATA) // 2
+    return archive[:offset] + bytes([archive[offset] ^ 0xFF]) + archive[offset + 1:]
+
+
+def truncated_tar():
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w:gz") as tf:
+        info = tarfile.TarInfo("src/main.py")
+        info.size = len(DATA)
+        tf.addfile(info, io.BytesIO(DATA))
+    return archive.getvalue()[:200]
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def create_project(client, archive, name="projet.zip"):
+    response = client.post("/api/projects", data={
+        "titre": "Projet", "file": (io.BytesIO(archive), name),
+    }, content_type="multipart/form-data")
+    assert response.status_code == 201
+    project_id = response.get_json()["projectId"]
+    # Manifeste construit en arrière-plan : 202 tant qu'il n'est pas prêt
+    deadline = time.monotonic() + 10
+    while client.get(f"/api/projects/{project_id}/files").status_code == 202:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    return project_id
+
+
+# -----------------------------
+# ARCHIVE ILLISIBLE
+# -----------------------------
+@pytest.mark.parametrize("archive, name, error", [
+    (b"ceci n'est pas une archive" * 10, "projet.zip", "Format d'archive non pris en charge"),
+    (truncated_tar(), "projet.tar.gz", "Archive illisible"),
+])
+def test_unreadable_archive_gives_422(client, archive, name, error):
+    project_id = create_project(client, archive, name)
+    response = client.get(f"/api/projects/{project_id}/files")
+    assert response.status_code == 422
+    body = response.get_json()
+    assert body["status"] == "echec"
+    assert body["error"].startswith(error)
+    assert client.get(f"/api/projects/{project_id}/files/src/main.py").status_code == 422
+    # L'archive reste téléchargeable telle quelle
+    assert client.get(f"/api/download-file/{project_id}").data == archive
+
+
+def test_inspect_archives_reports_failures(app, client):
+    create_project(client, b"pas une archive")
+    create_project(client, zip_archive())
+    with app.app_context():
+        ArchiveManifest.query.delete()
+        db.session.commit()
+    result = app.test_cli_runner().invoke(args=["inspect-archives"])
+    assert result.exit_code == 0, result.output
+    assert "2 archive(s) inspectée(s), 1 illisible(s) au total" in result.output
+
+
+# -----------------------------
+# ENTRÉE CORROMPUE
+# -----------------------------
+def test_corrupted_entry_gives_422(client):
+    project_id = create_project(client, corrupted_member(zip_archive()))
+    # Le répertoire central est intact : le manifeste et les aperçus sont servis
+    files = client.get(f"/api/projects/{project_id}/files")
+    assert files.status_code == 200
+    assert files.get_json()["readme"]["content"] == README
+    assert client.get(f"/api/projects/{project_id}/files/README.md").data == README.encode()
+
+    response = client.get(f"/api/projects/{project_id}/files/assets/data.bin")
+    assert response.status_code == 422
+    assert response.get_json()["error"] == "Fichier illisible dans l'archive"
+
+
+def test_intact_entry_is_served(client):
+    project_id = create_project(client, zip_archive())
+    response = client.get(f"/api/projects/{project_id}/files/assets/data.bin")
+    assert response.status_code == 200
+    assert response.data == DATA
+    assert response.headers["Content-Disposition"].startswith("attachment")
+    assert client.get(f"/api/projects/{project_id}/files/absent.txt").status_code == 404
@@ -0,0 +1,99 @@
+"""
+Téléchargement des archives : reprise par Range (206), If-Range avec l'ETag du
+contenu, 304, et un seul téléchargement compté par fichier récupéré.
+
+    cd backend && python -m pytest -q test_archive_download.py
+"""
+import io
+import hashlib
+
+import pytest
+
+from extensions import db
+from models import User, Download
+
+
+ARCHIVE = bytes(range(256)) * 40  # 10 240 octets
+SHA = hashlib.sha256(ARCHIVE).hexdigest()
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        db.session.add(User(id="lecteur", matricule="MAT-1", email="lecteur@simplon.co",
+                            pseudo="lecteur", password="x"))
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def url(client):
+    response = client.post("/api/projects", data={
+        "titre": "Projet", "file": (io.BytesIO(ARCHIVE), "projet.zip"),
+    }, content_type="multipart/form-data")
+    assert response.status_code == 201
+    return f"/api/download-file/{response.get_json()['projectId']}?user_id=lecteur"
+
+
+def downloads(app):
+    with app.app_context():
+        return Download.query.count()
+
+
+# -----------------------------
+# RANGE / IF-RANGE
+# -----------------------------
+def test_full_download_has_strong_content_etag(app, client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == ARCHIVE
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.get_etag() == (SHA, False)
+    assert "projet.zip" in response.headers["Content-Disposition"]
+    assert downloads(app) == 1
+
+
+def test_range_resume_counts_one_download(app, client, url):
+    first = client.get(url, headers={"Range": "bytes=0-4095"})
+    assert first.status_code == 206
+    assert first.data == ARCHIVE[:4096]
+    assert first.headers["Content-Range"] == f"bytes 0-4095/{len(ARCHIVE)}"
+
+    rest = client.get(url, headers={"Range": "bytes=4096-", "If-Range": first.headers["ETag"]})
+    assert rest.status_code == 206
+    assert first.data + rest.data == ARCHIVE
+    # La reprise n'est pas un nouveau téléchargement
+    assert downloads(app) == 1
+
+
+def test_stale_if_range_sends_the_whole_file(app, client, url):
+    response = client.get(url, headers={"Range": "bytes=4096-", "If-Range": '"autre-contenu"'})
+    assert response.status_code == 200
+    assert response.data == ARCHIVE
+    assert downloads(app) == 1
+
+
+def test_unsatisfiable_range(app, client, url):
+    response = client.get(url, headers={"Range": f"bytes={len(ARCHIVE)}-"})
+    assert response.status_code == 416
+    assert downloads(app) == 0
+
+
+# -----------------------------
+# REVALIDATION
+# -----------------------------
+def test_matching_etag_returns_304_without_counting(app, client, url):
+    response = client.get(url, headers={"If-None-Match": f'"{SHA}"'})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert downloads(app) == 0
+
+
+def test_missing_project_is_404(client):
+    assert client.get("/api/download-file/inconnu").status_code == 404
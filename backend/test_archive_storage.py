@@ -0,0 +1,124 @@
+"""
+Stockage des archives par contenu : un fichier par contenu, compteur de
+références, suppression du fichier et du manifeste avec la dernière référence.
+
+    cd backend && python -m pytest -q test_archive_storage.py
+"""
+import io
+import os
+import time
+import zipfile
+import hashlib
+
+import pytest
+
+from extensions import db
+from models import Project, ArchiveBlob, ArchiveManifest
+
+
+def zip_bytes(content):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("README.md", content)
+    return archive.getvalue()
+
+
+SHARED = zip_bytes("# Archive partagée\n")
+SHA = hashlib.sha256(SHARED).hexdigest()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def create_project(client, titre, archive=SHARED):
+    response = client.post("/api/projects", data={
+        "titre": titre, "file": (io.BytesIO(archive), "projet.zip"),
+    }, content_type="multipart/form-data")
+    assert response.status_code == 201
+    project_id = response.get_json()["projectId"]
+    # Manifeste construit en arrière-plan
+    deadline = time.monotonic() + 10
+    while client.get(f"/api/projects/{project_id}/files").status_code != 200:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    return project_id
+
+
+def blob_state(app):
+    with app.app_context():
+        return [(b.sha256, b.ref_count) for b in ArchiveBlob.query], ArchiveManifest.query.count()
+
+
+# -----------------------------
+# RÉFÉRENCES
+# -----------------------------
+def test_identical_archives_share_one_blob(app, client):
+    first = create_project(client, "Premier")
+    second = create_project(client, "Second")
+    assert blob_state(app) == ([(SHA, 2)], 1)
+    with app.app_context():
+        paths = {p.filePath for p in Project.query}
+        assert len(paths) == 1
+        assert db.session.get(Project, first).archiveSha256 == db.session.get(Project, second).archiveSha256
+
+
+def test_file_and_manifest_leave_with_the_last_reference(app, client):
+    first = create_project(client, "Premier")
+    second = create_project(client, "Second")
+    with app.app_context():
+        path = db.session.get(ArchiveBlob, SHA).path
+
+    assert client.delete(f"/api/admin/project/{first}").status_code == 200
+    assert blob_state(app) == ([(SHA, 1)], 1)
+    assert os.path.exists(path)
+    # L'archive reste téléchargeable par le projet restant
+    assert client.get(f"/api/download-file/{second}").status_code == 200
+
+    assert client.delete(f"/api/admin/project/{second}").status_code == 200
+    assert blob_state(app) == ([], 0)
+    assert not os.path.exists(path)
+
+
+def test_deleting_one_content_keeps_the_others(app, client):
+    shared = create_project(client, "Partagé")
+    other = create_project(client, "Autre", zip_bytes("# Autre contenu\n"))
+    with app.app_context():
+        other_sha = db.session.get(Project, other).archiveSha256
+
+    assert client.delete(f"/api/admin/project/{other}").status_code == 200
+    assert blob_state(app) == ([(SHA, 1)], 1)
+    with app.app_context():
+        assert db.session.get(ArchiveBlob, other_sha) is None
+        assert os.path.exists(db.session.get(Project, shared).filePath)
+
+
+# -----------------------------
+# MIGRATION (dedupe-archives)
+# -----------------------------
+def test_dedupe_archives_merges_legacy_files(app, client):
+    create_project(client, "Déjà migré")
+    uploads = app.config["UPLOAD_FOLDER"]
+    legacy = []
+    with app.app_context():
+        for i in range(2):
+            path = os.path.join(uploads, f"0123456{i}-89ab-cdef-0123-456789abcdef_projet.zip")
+            with open(path, "wb") as f:
+                f.write(SHARED)
+            legacy.append(path)
+            db.session.add(Project(titre=f"Ancien {i}", filePath=path, taille="1 KB"))
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["dedupe-archives"])
+    assert result.exit_code == 0, result.output
+    assert "2 archive(s) migrée(s), 1 contenu(s) unique(s)" in result.output
+    assert blob_state(app)[0] == [(SHA, 3)]
+    assert not any(os.path.exists(path) for path in legacy)
+    with app.app_context():
+        assert {p.fileName for p in Project.query.filter(Project.titre.like("Ancien%"))} == {"projet.zip"}
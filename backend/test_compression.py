@@ -0,0 +1,72 @@
+"""
+Compression négociée : listes JSON compressées (ETag faible, 304 conservés),
+fichiers d'archive et téléchargements servis tels quels avec leur ETag fort.
+
+    cd backend && python -m pytest -q test_compression.py
+"""
+import io
+import gzip
+import time
+import zipfile
+
+import pytest
+
+
+README = "# Projet\n" + "Une ligne de documentation répétée.\n" * 200
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(COMPRESS_ENABLED=True, COMPRESS_MIN_BYTES=256)
+
+
+@pytest.fixture
+def project_id(app):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("README.md", README)
+    client = app.test_client()
+    for i in range(10):
+        client.post("/api/projects", data={"titre": f"Projet {i}", "description": "x" * 100})
+    response = client.post("/api/projects", data={
+        "titre": "Projet avec archive", "file": (io.BytesIO(archive.getvalue()), "projet.zip"),
+    }, content_type="multipart/form-data")
+    project_id = response.get_json()["projectId"]
+    # Manifeste construit en arrière-plan
+    deadline = time.monotonic() + 10
+    while client.get(f"/api/projects/{project_id}/files").status_code != 200:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    return project_id
+
+
+def test_json_listing_is_compressed_with_weak_etag(app, project_id):
+    client = app.test_client()
+    response = client.get("/api/projects", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert len(gzip.decompress(response.data)) > len(response.data)
+    etag, weak = response.get_etag()
+    assert weak
+
+    revalidated = client.get("/api/projects", headers={"Accept-Encoding": "gzip",
+                                                         "If-None-Match": response.headers["ETag"]})
+    assert revalidated.status_code == 304
+
+
+def test_archive_entry_keeps_strong_etag(app, project_id):
+    client = app.test_client()
+    response = client.get(f"/api/projects/{project_id}/files/README.md", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+    assert response.get_data(as_text=True) == README
+    etag, weak = response.get_etag()
+    assert etag and not weak
+
+
+def test_archive_download_is_not_compressed(app, project_id):
+    client = app.test_client()
+    response = client.get(f"/api/download-file/{project_id}", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+    assert not response.get_etag()[1]
@@ -0,0 +1,98 @@
+"""
+Compteurs matérialisés : tenus à jour par les écritures, et `flask repair-counters`
+qui les recalcule depuis les tables après une dérive.
+
+    cd backend && python -m pytest -q test_counters.py
+"""
+import io
+
+import pytest
+
+from extensions import db, activity_log
+from models import User, Counter, GLOBAL_SCOPE, read_counters
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(RATE_LIMIT_ENABLED=False)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def activate(client, n):
+    response = client.post("/api/activation", json={
+        "email": f"user{n}@simplon.co", "matricule": f"MAT-{n}", "pseudo": f"user{n}", "password": "secret"})
+    assert response.status_code == 201
+
+
+def all_counters(app):
+    with app.app_context():
+        activity_log.flush()
+        return {(c.scope, c.name): c.value for c in Counter.query}
+
+
+def populate(app, client):
+    """Deux utilisateurs, trois projets (un supprimé), deux téléchargements"""
+    for n in range(2):
+        activate(client, n)
+    with app.app_context():
+        ids = [u.id for u in User.query.order_by(User.pseudo)]
+    projects = []
+    for i in range(3):
+        response = client.post("/api/projects", data={
+            "titre": f"Projet {i}", "auteurId": ids[0], "auteurNom": "user0",
+            "file": (io.BytesIO(f"archive {i}".encode()), "projet.zip"),
+        }, content_type="multipart/form-data")
+        projects.append(response.get_json()["projectId"])
+    for project_id in projects[:2]:
+        assert client.get(f"/api/download-file/{project_id}?user_id={ids[1]}").status_code == 200
+    assert client.delete(f"/api/admin/project/{projects[1]}").status_code == 200
+    return ids
+
+
+def repair(app):
+    result = app.test_cli_runner().invoke(args=["repair-counters"])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+# -----------------------------
+# TENUE À JOUR
+# -----------------------------
+def test_writes_keep_counters_exact(app, client):
+    author, reader = populate(app, client)
+    counters = all_counters(app)
+    assert counters[(GLOBAL_SCOPE, "users")] == 2
+    assert counters[(GLOBAL_SCOPE, "projects")] == 2
+    assert counters[(GLOBAL_SCOPE, "downloads")] == 1
+    assert counters[(author, "projects")] == 2
+    assert counters[(reader, "downloads")] == 1
+
+    # Aucune dérive : le recalcul retrouve les mêmes valeurs (zéros mis à part)
+    repair(app)
+    assert all_counters(app) == {key: value for key, value in counters.items() if value}
+
+
+# -----------------------------
+# RÉPARATION
+# -----------------------------
+def test_repair_counters_fixes_drift(app, client):
+    author, reader = populate(app, client)
+    expected = all_counters(app)
+    with app.app_context():
+        Counter.query.filter_by(scope=GLOBAL_SCOPE, name="projects").update({"value": 42})
+        Counter.query.filter_by(scope=reader, name="downloads").delete()
+        db.session.add(Counter(scope="fantome", name="projects", value=7))
+        db.session.commit()
+    assert client.get(f"/api/user/profile?user_id={reader}").get_json()["downloadCount"] == 0
+
+    output = repair(app)
+    assert "'projects': 2" in output
+    assert all_counters(app) == {key: value for key, value in expected.items() if value}
+    profile = client.get(f"/api/user/profile?user_id={reader}").get_json()
+    assert (profile["projectCount"], profile["downloadCount"]) == (0, 1)
+    with app.app_context():
+        assert read_counters("fantome") == {}
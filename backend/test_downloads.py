@@ -0,0 +1,123 @@
+"""
+Nombre de requêtes SQL de /api/my-downloads et du profil : constant, quel que
+soit l'historique de téléchargements et d'activités de l'utilisateur, et sur
+chaque page du parcours par curseur.
+
+    cd backend && python -m pytest -q test_downloads.py
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from extensions import db
+from models import User, Project, Activity, Download, counter_changes, bump_counters
+
+
+PROJECTS = 10
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        author = User(matricule="MAT-1", email="auteur@simplon.co", pseudo="auteur", password="x")
+        reader = User(id="lecteur", matricule="MAT-2", email="lecteur@simplon.co", pseudo="lecteur", password="x")
+        db.session.add_all([author, reader])
+        db.session.flush()
+        db.session.add_all([
+            Project(id=f"projet-{i}", titre=f"Projet {i}", auteurId=author.id, auteurNom="auteur")
+            for i in range(PROJECTS)
+        ])
+        db.session.commit()
+    return app
+
+
+def add_history(app, downloads):
+    """Ajoute `downloads` téléchargements (répartis sur les projets) et autant d'activités"""
+    start = datetime.utcnow() - timedelta(days=30)
+    with app.app_context():
+        db.session.add_all([
+            Download(user_id="lecteur", project_id=f"projet-{i % PROJECTS}",
+                     downloaded_at=start + timedelta(minutes=i))
+            for i in range(downloads)
+        ])
+        db.session.add_all([
+            Activity(user_id="lecteur", user_name="lecteur", action="Téléchargement",
+                     details=f"Téléchargement {i}", timestamp=start + timedelta(minutes=i))
+            for i in range(downloads)
+        ])
+        bump_counters(counter_changes("downloads", downloads, "lecteur"))
+        db.session.commit()
+
+
+def count_queries(app, client, path):
+    """Requêtes SQL émises pendant une requête HTTP (après un premier appel de chauffe)"""
+    client.get(path)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    return len(statements), response.get_json()
+
+
+@pytest.mark.parametrize("path", [
+    "/api/my-downloads/lecteur",
+    "/api/my-downloads/lecteur?limit=5",
+    "/api/user/profile?user_id=lecteur",
+])
+def test_query_count_does_not_grow_with_history(app, path):
+    client = app.test_client()
+    add_history(app, 20)
+    small, _ = count_queries(app, client, path)
+    add_history(app, 180)
+    large, _ = count_queries(app, client, path)
+    assert large == small
+
+
+def test_my_downloads_keeps_latest_download_per_project(app):
+    client = app.test_client()
+    add_history(app, 200)
+    queries, page = count_queries(app, client, "/api/my-downloads/lecteur")
+    assert queries == 1
+    items = page["items"]
+    assert len(items) == PROJECTS
+    assert len({item["id"] for item in items}) == PROJECTS
+    dates = [item["downloadDate"] for item in items]
+    assert dates == sorted(dates, reverse=True)
+    assert items[0]["auteurNom"] == "auteur"
+
+
+def test_my_downloads_cursor_walk(app):
+    # Dates de téléchargement égales sur plusieurs projets : départagées par id de projet
+    client = app.test_client()
+    add_history(app, 30)
+    with app.app_context():
+        Download.query.filter(Download.project_id.in_(["projet-1", "projet-2", "projet-3"]))\
+            .update({"downloaded_at": datetime(2025, 6, 1)}, synchronize_session=False)
+        db.session.commit()
+
+    _, first = count_queries(app, client, "/api/my-downloads/lecteur")
+    expected = [item["id"] for item in first["items"]]
+    walked, cursor, page_queries = [], None, set()
+    while True:
+        path = "/api/my-downloads/lecteur?limit=3" + (f"&cursor={cursor}" if cursor else "")
+        queries, page = count_queries(app, client, path)
+        page_queries.add(queries)
+        walked += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert walked == expected
+    assert len(walked) == PROJECTS
+    # Une requête par page, première page comprise
+    assert page_queries == {1}
@@ -0,0 +1,116 @@
+"""
+Stockage éphémère : expiration paresseuse à la lecture, purge périodique,
+compteur de tentatives, seaux à jetons — pour les deux backends.
+
+    cd backend && python -m pytest -q test_ephemeral_store.py
+"""
+import pytest
+
+import ephemeral_store
+from ephemeral_store import make_store
+from extensions import temp_codes
+
+
+class Clock:
+    """Remplace le module time de ephemeral_store : l'heure n'avance que sur demande"""
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ephemeral_store, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, clock, tmp_path):
+    url = "memory://" if request.param == "memory" else f"sqlite:///{tmp_path / 'ephemeral.db'}"
+    return make_store(url, purge_interval=30)
+
+
+# -----------------------------
+# EXPIRATION
+# -----------------------------
+def test_entry_expires_after_its_ttl(store, clock):
+    store.set("a@simplon.co", {"code": "123456"}, ttl=10)
+    clock.now += 9.9
+    assert store.get("a@simplon.co") == {"code": "123456"}
+    clock.now += 0.1
+    assert store.get("a@simplon.co") is None
+    assert store.incr_attempts("a@simplon.co") is None
+
+
+def test_set_again_renews_ttl_and_resets_attempts(store, clock):
+    store.set("cle", "v1", ttl=10)
+    assert store.incr_attempts("cle") == 1
+    assert store.incr_attempts("cle") == 2
+    clock.now += 8
+    store.set("cle", "v2", ttl=10)
+    clock.now += 8
+    assert store.get("cle") == "v2"
+    assert store.incr_attempts("cle") == 1
+
+
+def test_purge_removes_only_expired_entries(store, clock):
+    store.set("court", 1, ttl=5)
+    store.set("long", 2, ttl=500)
+    clock.now += 10
+    assert store.purge_expired() == 1
+    assert store.get("long") == 2
+
+
+def test_writes_purge_periodically(store, clock):
+    store.set("court", 1, ttl=5)
+    clock.now += 31
+    # Écriture après purge_interval : purge au passage
+    store.set("autre", 2, ttl=500)
+    assert store.purge_expired() == 0
+
+
+# -----------------------------
+# SEAUX À JETONS
+# -----------------------------
+def test_bucket_refills_over_time(store, clock):
+    for _ in range(3):
+        assert store.consume("ip", capacity=3, refill_rate=1.0) == (True, 0.0)
+    allowed, retry_after = store.consume("ip", capacity=3, refill_rate=1.0)
+    assert not allowed and retry_after == pytest.approx(1.0)
+    clock.now += 1
+    assert store.consume("ip", capacity=3, refill_rate=1.0)[0]
+
+
+def test_refund_gives_tokens_back(store, clock):
+    for _ in range(2):
+        store.consume("ip", capacity=2, refill_rate=0.1)
+    assert not store.consume("ip", capacity=2, refill_rate=0.1)[0]
+    store.consume("ip", capacity=2, refill_rate=0.1, cost=-1)
+    assert store.consume("ip", capacity=2, refill_rate=0.1)[0]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        make_store("redis://localhost")
+
+
+# -----------------------------
+# CODES D'ACTIVATION
+# -----------------------------
+def test_activation_code_expires(make_app, clock):
+    app = make_app(CODE_TTL_SECONDS=600, RATE_LIMIT_ENABLED=False)
+    client = app.test_client()
+    response = client.post("/send-code", json={"email": "nouveau@simplon.co", "matricule": "MAT-12"})
+    assert response.status_code == 200
+    with app.app_context():
+        code = temp_codes.get("nouveau@simplon.co")["code"]
+
+    clock.now += 599
+    assert client.post("/verify-code", json={"email": "nouveau@simplon.co", "code": code}).status_code == 200
+    clock.now += 1
+    response = client.post("/verify-code", json={"email": "nouveau@simplon.co", "code": code})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Code invalide ou expiré"
@@ -0,0 +1,98 @@
+"""
+Points de santé : liveness sans base, readiness (base et dossiers d'upload),
+statistiques en cache HEALTH_STATS_TTL secondes.
+
+    cd backend && python -m pytest -q test_health.py
+"""
+import shutil
+
+import pytest
+from sqlalchemy import event, text
+
+import health
+from extensions import db
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(HEALTH_STATS_TTL=60)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def count_queries(app, client, path):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return response, statements
+
+
+# -----------------------------
+# LIVENESS / READINESS
+# -----------------------------
+def test_live_does_not_touch_the_database(app, client):
+    response, statements = count_queries(app, client, "/api/health/live")
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "ok"}
+    assert statements == []
+
+
+def test_ready_checks_database_and_folders(client):
+    response = client.get("/api/health/ready")
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "ok", "checks": {"database": "ok", "archives": "ok", "tmp": "ok"}}
+
+
+def test_ready_fails_without_upload_folder(app, client):
+    shutil.rmtree(app.config["UPLOAD_TMP"])
+    response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    body = response.get_json()
+    assert body["status"] == "indisponible"
+    assert body["checks"]["tmp"] == "non inscriptible"
+    assert body["checks"]["database"] == "ok"
+
+
+def test_ready_fails_when_database_errors(client, monkeypatch):
+    monkeypatch.setattr(health, "text", lambda sql: text("SELECT * FROM table_absente"))
+    response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.get_json()["checks"]["database"] == "erreur: OperationalError"
+    # La session reste utilisable après l'échec
+    monkeypatch.undo()
+    assert client.get("/api/health/ready").status_code == 200
+
+
+# -----------------------------
+# STATISTIQUES
+# -----------------------------
+def test_stats_are_cached_for_the_ttl(app, client):
+    first = client.get("/api/health/stats").get_json()
+    assert client.post("/api/projects", data={"titre": "Projet"}).status_code == 201
+
+    response, statements = count_queries(app, client, "/api/health/stats")
+    body = response.get_json()
+    assert statements == []
+    assert body["projects_count"] == first["projects_count"] == 0
+    assert body["computed_at"] == first["computed_at"]
+    assert {"activity_log", "activity_stream", "mail_queue", "db_pool"} <= set(body)
+
+
+def test_stats_refresh_after_the_ttl(make_app):
+    app = make_app(HEALTH_STATS_TTL=0)
+    client = app.test_client()
+    assert client.get("/api/health/stats").get_json()["projects_count"] == 0
+    client.post("/api/projects", data={"titre": "Projet"})
+    assert client.get("/api/health/stats").get_json()["projects_count"] == 1
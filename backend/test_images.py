@@ -0,0 +1,83 @@
+"""
+Images de projet : originaux et variantes WebP à URL immuable, fichiers
+supprimés avec le dernier projet qui les utilise.
+
+    cd backend && python -m pytest -q test_images.py
+"""
+import io
+import os
+
+import pytest
+
+from images import HAS_PIL
+
+
+pytestmark = pytest.mark.skipif(not HAS_PIL, reason="Pillow absent")
+
+
+@pytest.fixture
+def image(make_app):
+    from PIL import Image
+
+    app = make_app()
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 900), "crimson").save(buffer, "PNG")
+    response = app.test_client().post("/api/projects", data={
+        "titre": "Projet illustré", "images": (io.BytesIO(buffer.getvalue()), "capture.png"),
+    }, content_type="multipart/form-data")
+    assert response.status_code == 201
+    with app.app_context():
+        from models import Project
+        stored = Project.query.one().images[0]
+    return app.test_client(), stored["sha256"]
+
+
+def test_original_and_webp_variant_are_served(image):
+    client, sha256 = image
+    original = client.get(f"/api/images/{sha256}.png")
+    assert (original.status_code, original.mimetype) == (200, "image/png")
+    variant = client.get(f"/api/images/{sha256}-thumb320.webp")
+    assert (variant.status_code, variant.mimetype) == (200, "image/webp")
+    assert variant.data[8:12] == b"WEBP"
+    assert "immutable" in variant.headers["Cache-Control"]
+
+
+@pytest.mark.parametrize("ext", ["png", "jpg", "gif"])
+def test_variant_with_another_extension_is_not_found(image, ext):
+    client, sha256 = image
+    assert client.get(f"/api/images/{sha256}-thumb320.{ext}").status_code == 404
+
+
+def test_unknown_variant_width_is_not_found(image):
+    client, sha256 = image
+    assert client.get(f"/api/images/{sha256}-thumb321.webp").status_code == 404
+
+
+def test_image_files_leave_with_their_last_project(make_app):
+    from PIL import Image
+    import projects
+
+    def png(color):
+        buffer = io.BytesIO()
+        Image.new("RGB", (400, 300), color).save(buffer, "PNG")
+        return buffer.getvalue()
+
+    app = make_app()
+    client = app.test_client()
+    ids = []
+    for titre, color in (("Premier", "navy"), ("Second", "navy"), ("Autre", "olive")):
+        response = client.post("/api/projects", data={"titre": titre, "images": (io.BytesIO(png(color)), "img.png")},
+                               content_type="multipart/form-data")
+        ids.append(response.get_json()["projectId"])
+    with app.app_context():
+        from models import Project
+        shared, other = (Project.query.get(i).images[0]["sha256"] for i in ids[1:])
+        originals = {sha256: projects.image_path(f"{sha256}.png") for sha256 in (shared, other)}
+
+    # L'image partagée reste tant qu'un projet l'utilise
+    assert client.post("/api/admin/projects/bulk-delete", json={"ids": [ids[0], ids[2]]}).status_code == 200
+    assert os.path.exists(originals[shared])
+    assert not os.path.exists(originals[other])
+
+    assert client.delete(f"/api/admin/project/{ids[1]}").status_code == 200
+    assert not os.path.exists(originals[shared])
@@ -0,0 +1,206 @@
+"""
+File d'emails contre un serveur SMTP local (SMTPSink, dans le processus) :
+envoi, réutilisation de la connexion, nouvel essai différé, lettre morte,
+et /send-code de bout en bout.
+
+    cd backend && python -m pytest -q test_mail_queue.py
+"""
+import re
+import time
+import smtplib
+import threading
+import socketserver
+from email import message_from_bytes, policy
+
+import pytest
+
+from mail_queue import MailQueue
+
+
+# -----------------------------
+# SERVEUR SMTP DE TEST
+# -----------------------------
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            connection = server.connections
+        self.reply("220 localhost SMTP de test")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb in ("MAIL", "RSET"):
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                if server.reject:
+                    self.reply("550 Destinataire refusé")
+                    continue
+                recipients.append(command.split(":", 1)[1].strip(" <>"))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 Terminer par <CRLF>.<CRLF>")
+                lines = []
+                for data in iter(self.rfile.readline, b""):
+                    if data == b".\r\n":
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                message = message_from_bytes(b"".join(lines), policy=policy.default)
+                with server.lock:
+                    server.messages.append((connection, recipients, message))
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Au revoir")
+                return
+            else:
+                self.reply("250 OK")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Serveur SMTP minimal sur 127.0.0.1 : garde les messages reçus, peut refuser les destinataires"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []  # (numéro de connexion, destinataires, message)
+        self.reject = False
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def connect(self):
+        return smtplib.SMTP("127.0.0.1", self.port, timeout=5)
+
+
+@pytest.fixture
+def sink():
+    server = SMTPSink()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(smtp_factory, **options):
+        queue = MailQueue(str(tmp_path / "outbox.db"), smtp_factory, default_sender="hub@simplon.co",
+                          poll_interval=0.1, **options)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def outbox(queue):
+    with queue._connect() as conn:
+        return {row["id"]: row for row in conn.execute("SELECT * FROM mail_outbox")}
+
+
+# -----------------------------
+# FILE D'ENVOI
+# -----------------------------
+def test_messages_are_delivered_on_a_shared_connection(sink, make_queue):
+    # Le premier lot attend l'ouverture de la connexion : les messages suivants s'accumulent
+    gate = threading.Event()
+
+    def connect():
+        gate.wait(5)
+        return sink.connect()
+
+    queue = make_queue(connect)
+    for i in range(3):
+        queue.enqueue(f"Message {i}", [f"stagiaire{i}@simplon.co"], f"Contenu {i} é")
+    gate.set()
+
+    assert wait_for(lambda: queue.stats() == {"envoye": 3})
+    assert sink.connections < 3
+    received = {message["Subject"]: (recipients, message) for _, recipients, message in sink.messages}
+    recipients, message = received["Message 1"]
+    assert recipients == ["stagiaire1@simplon.co"]
+    assert message["From"] == "hub@simplon.co"
+    assert message.get_content().strip() == "Contenu 1 é"
+
+
+def test_failed_message_is_retried_with_backoff(sink, make_queue):
+    sink.reject = True
+    queue = make_queue(sink.connect, base_delay=60, max_attempts=3)
+    before = time.time()
+    message_id = queue.enqueue("Code", ["refuse@simplon.co"], "123456")
+
+    assert wait_for(lambda: outbox(queue)[message_id]["attempts"] == 1)
+    row = outbox(queue)[message_id]
+    assert row["status"] == "en_attente"
+    assert "550" in row["last_error"]
+    # Premier nouvel essai après base_delay, pas avant
+    assert before + 60 <= row["next_attempt_at"] <= time.time() + 60
+    assert sink.messages == []
+
+
+def test_message_becomes_dead_letter_then_can_be_retried(sink, make_queue):
+    sink.reject = True
+    queue = make_queue(sink.connect, max_attempts=1)
+    message_id = queue.enqueue("Code", ["refuse@simplon.co"], "123456")
+    assert wait_for(lambda: queue.stats() == {"echec": 1})
+    assert outbox(queue)[message_id]["attempts"] == 1
+
+    sink.reject = False
+    assert queue.retry_dead() == 1
+    assert wait_for(lambda: queue.stats() == {"envoye": 1})
+    assert [recipients for _, recipients, _ in sink.messages] == [["refuse@simplon.co"]]
+
+
+def test_unreachable_server_is_retried(make_queue):
+    def unreachable():
+        raise ConnectionRefusedError("serveur SMTP injoignable")
+
+    queue = make_queue(unreachable, base_delay=60)
+    message_id = queue.enqueue("Code", ["stagiaire@simplon.co"], "123456")
+    assert wait_for(lambda: outbox(queue)[message_id]["attempts"] == 1)
+    assert outbox(queue)[message_id]["status"] == "en_attente"
+
+
+# -----------------------------
+# /send-code DE BOUT EN BOUT
+# -----------------------------
+def test_send_code_returns_before_delivery_and_mails_the_code(sink, make_app):
+    app = make_app(MAIL_SERVER="127.0.0.1", MAIL_PORT=sink.port, MAIL_USE_TLS=False,
+                   MAIL_USERNAME="", MAIL_DEFAULT_SENDER="hub@simplon.co", RATE_LIMIT_ENABLED=False)
+    client = app.test_client()
+    response = client.post("/send-code", json={"email": "Stagiaire@Simplon.co", "matricule": "MAT-42"})
+    assert response.status_code == 200
+
+    assert wait_for(lambda: len(sink.messages) == 1)
+    _, recipients, message = sink.messages[0]
+    assert recipients == ["stagiaire@simplon.co"]
+    code = re.search(r"\d{6}", message.get_content()).group()
+
+    response = client.post("/verify-code", json={"email": "stagiaire@simplon.co", "code": code})
+    assert response.status_code == 200
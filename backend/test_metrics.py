@@ -0,0 +1,125 @@
+"""
+Métriques Prometheus : format d'exposition (HELP/TYPE, labels échappés,
+histogrammes cumulés), séries par modèle de route, total commun aux workers.
+
+    cd backend && python -m pytest -q test_metrics.py
+"""
+import re
+
+import pytest
+
+from metrics import Metrics
+
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse(text):
+    """{famille: (type, aide)}, [(échantillon, {labels}, valeur)] ; échoue sur toute ligne mal formée"""
+    families, samples = {}, []
+    assert text.endswith("\n")
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            name, help_text = line[7:].split(" ", 1)
+            families[name] = [None, help_text]
+        elif line.startswith("# TYPE "):
+            name, kind = line[7:].split(" ")
+            assert kind in ("counter", "histogram")
+            families[name][0] = kind
+        else:
+            match = SAMPLE.match(line)
+            assert match, line
+            name, label_text, value = match.groups()
+            labels = dict(LABEL.findall(label_text or ""))
+            assert ",".join(f'{k}="{v}"' for k, v in labels.items()) == (label_text or "")
+            samples.append((name, labels, float(value)))
+    return families, samples
+
+
+def value(samples, name, **labels):
+    return next(v for n, l, v in samples if n == name and l == labels)
+
+
+@pytest.fixture
+def client(make_app):
+    return make_app().test_client()
+
+
+# -----------------------------
+# EXPOSITION /metrics
+# -----------------------------
+def test_metrics_endpoint_exposition_format(client):
+    for _ in range(2):
+        assert client.get("/api/projects").status_code == 200
+    assert client.get("/api/projects/inconnu").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+    families, samples = parse(response.get_data(as_text=True))
+
+    assert families["http_requests_total"][0] == "counter"
+    assert families["http_request_duration_seconds"][0] == "histogram"
+    assert {"http_request_sql_queries", "http_request_sql_duration_seconds", "sql_slow_queries_total"} <= set(families)
+
+    # Une série par modèle de route, pas par URL
+    labels = {"method": "GET", "route": "/api/projects"}
+    assert value(samples, "http_requests_total", status="200", **labels) == 2
+    assert value(samples, "http_requests_total", method="GET", route="/api/projects/<project_id>",
+                 status="404") == 1
+    assert not any("inconnu" in l.get("route", "") for _, l, _ in samples)
+
+    # Histogramme : intervalles cumulés croissants, +Inf égal au compte
+    buckets = [(l["le"], v) for n, l, v in samples
+               if n == "http_request_duration_seconds_bucket" and l.get("route") == "/api/projects"]
+    assert buckets[-1][0] == "+Inf"
+    assert [v for _, v in buckets] == sorted(v for _, v in buckets)
+    assert buckets[-1][1] == value(samples, "http_request_duration_seconds_count", **labels) == 2
+    assert value(samples, "http_request_duration_seconds_sum", **labels) > 0
+
+
+def test_responses_carry_server_timing(client):
+    header = client.get("/api/projects").headers["Server-Timing"]
+    assert re.fullmatch(r'app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ SQL"', header)
+
+
+# -----------------------------
+# REGISTRE
+# -----------------------------
+def test_labels_and_help_are_escaped():
+    registry = Metrics()
+    registry.counter("essais_total", "Aide sur\ndeux lignes \\ fin")
+    registry.inc("essais_total", route='/a"b\\c\nd')
+    text = registry.render()
+    assert "# HELP essais_total Aide sur\\ndeux lignes \\\\ fin\n" in text
+    assert 'essais_total{route="/a\\"b\\\\c\\nd"} 1\n' in text
+    parse(text)
+
+
+def test_histogram_values_on_bucket_bounds():
+    registry = Metrics()
+    registry.histogram("taille", "Taille", (1, 5))
+    for observed in (0.5, 1, 3, 5, 8):
+        registry.observe("taille", observed)
+    _, samples = parse(registry.render())
+    assert [(l["le"], v) for n, l, v in samples if n == "taille_bucket"] == [("1", 2), ("5", 4), ("+Inf", 5)]
+    assert value(samples, "taille_count") == 5
+    assert value(samples, "taille_sum") == 17.5
+
+
+def test_workers_share_one_total(tmp_path):
+    path = str(tmp_path / "metrics.db")
+    workers = [Metrics(path, flush_interval=60) for _ in range(2)]
+    for registry in workers:
+        registry.counter("http_requests_total", "Requêtes")
+    workers[0].inc("http_requests_total", 3, route="/a")
+    workers[0].flush()
+    workers[1].inc("http_requests_total", route="/a")
+    workers[1].inc("http_requests_total", route="/b")
+
+    _, samples = parse(workers[1].render())
+    assert value(samples, "http_requests_total", route="/a") == 4
+    assert value(samples, "http_requests_total", route="/b") == 1
+    for registry in workers:
+        registry.close()
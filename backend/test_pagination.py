@@ -0,0 +1,104 @@
+"""
+Pagination par curseur des listes de projets : limites de page, égalités de
+date, projets sans date et curseurs invalides.
+
+    cd backend && python -m pytest -q test_pagination.py
+"""
+import json
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Project
+from pagination import encode_cursor
+
+
+START = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        rows = [
+            # Trois projets au même instant : départagés par id
+            *[Project(id=f"meme-date-{i}", titre=f"Égalité {i}", dateCreation=START) for i in range(3)],
+            *[Project(id=f"projet-{i:02d}", titre=f"Projet {i}", dateCreation=START + timedelta(days=i + 1))
+              for i in range(7)],
+            # Projets importés sans date
+            *[Project(id=f"sans-date-{i}", titre=f"Sans date {i}") for i in range(2)],
+        ]
+        db.session.add_all(rows)
+        db.session.flush()
+        Project.query.filter(Project.id.like("sans-date-%")).update({"dateCreation": None},
+                                                                    synchronize_session=False)
+        db.session.commit()
+    return app
+
+
+def walk(client, path, limit):
+    """Suit next_cursor jusqu'à la dernière page ; renvoie les pages d'ids"""
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, query_string=params)
+        assert response.status_code == 200
+        data = response.get_json()
+        pages.append([item["id"] for item in data["items"]])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+EXPECTED = ([f"projet-{i:02d}" for i in reversed(range(7))]
+            + [f"meme-date-{i}" for i in reversed(range(3))]
+            + [f"sans-date-{i}" for i in reversed(range(2))])
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 12, 50])
+def test_cursor_walk_returns_every_project_once_in_order(app, limit):
+    pages = walk(app.test_client(), "/api/projects", limit)
+    assert [i for page in pages for i in page] == EXPECTED
+    assert all(len(page) == limit for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= limit
+
+
+def test_page_boundary_inside_a_timestamp_tie(app):
+    # La page s'arrête au milieu des trois projets de même date : la suite reprend au suivant
+    pages = walk(app.test_client(), "/api/projects", 8)
+    assert pages[0][-1] == "meme-date-2"
+    assert pages[1][0] == "meme-date-1"
+
+
+def test_cursor_on_a_project_without_date(app):
+    client = app.test_client()
+    response = client.get("/api/projects", query_string={"limit": 1,
+                                                         "cursor": encode_cursor(None, "sans-date-1")})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [item["id"] for item in data["items"]] == ["sans-date-0"]
+    assert data["next_cursor"] is None
+
+
+def test_default_response_is_paginated(app):
+    data = app.test_client().get("/api/projects").get_json()
+    assert [item["id"] for item in data["items"]] == EXPECTED
+    assert data["next_cursor"] is None
+
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+@pytest.mark.parametrize("cursor", ["pas-un-curseur", raw_cursor([]), raw_cursor(["hier", "x"]),
+                                    raw_cursor([12, "x"])])
+def test_invalid_cursor_returns_400(app, cursor):
+    response = app.test_client().get("/api/projects", query_string={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Curseur invalide"
+
+
+def test_invalid_limit_returns_400(app):
+    assert app.test_client().get("/api/projects?limit=beaucoup").status_code == 400
@@ -0,0 +1,75 @@
+"""
+Limitation de débit : 429 avec Retry-After quand une règle est épuisée,
+jeton rendu sur connexion réussie, seaux indépendants par clé.
+
+    cd backend && python -m pytest -q test_rate_limit.py
+"""
+import pytest
+from werkzeug.security import generate_password_hash
+
+from config import RATE_LIMITS
+from extensions import db
+from models import User
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(RATE_LIMIT_ENABLED=True, HEALTH_STATS_TTL=0,
+                   RATE_LIMITS={**RATE_LIMITS, "login_identifier": "2/60", "login_ip": "4/60"})
+    with app.app_context():
+        db.session.add(User(matricule="MAT-1", email="alice@simplon.co", pseudo="alice",
+                            password=generate_password_hash("secret")))
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def login(client, identifier, password="mauvais", ip="10.0.0.1"):
+    return client.post("/api/login", json={"identifier": identifier, "password": password},
+                       environ_base={"REMOTE_ADDR": ip})
+
+
+# -----------------------------
+# 429 / RETRY-AFTER
+# -----------------------------
+def test_failed_logins_get_429_with_retry_after(client):
+    assert [login(client, "alice").status_code for _ in range(2)] == [401, 401]
+    response = login(client, "alice")
+    assert response.status_code == 429
+    assert response.get_json()["error"] == "Trop de requêtes, réessayez plus tard"
+    # 2 jetons par minute : un jeton revient en 30 secondes
+    assert response.headers["Retry-After"] == "30"
+    # La clé est normalisée : la casse ne contourne pas la limite
+    assert login(client, "ALICE").status_code == 429
+
+
+def test_successful_logins_refund_their_token(client):
+    for _ in range(3):
+        assert login(client, "alice", password="secret").status_code == 200
+    assert login(client, "alice").status_code == 401
+
+
+def test_buckets_are_independent_per_rule_and_key(client):
+    for _ in range(2):
+        login(client, "alice")
+    assert login(client, "alice").status_code == 429
+    # Autre identifiant, même IP : seule la règle par IP s'applique encore
+    assert login(client, "bob").status_code == 401
+    # Quatre requêtes comptées sur l'IP (dont le refus) : l'IP est épuisée à son tour
+    assert login(client, "carole").status_code == 429
+    assert login(client, "carole", ip="10.0.0.2").status_code == 401
+
+
+def test_rejections_are_reported_in_stats(client):
+    for _ in range(4):
+        login(client, "alice")
+    assert client.get("/api/health/stats").get_json()["rate_limited"] == 2
+
+
+def test_disabled_limiter_never_rejects(make_app):
+    client = make_app(RATE_LIMIT_ENABLED=False, RATE_LIMITS={**RATE_LIMITS, "login_identifier": "1/60"}).test_client()
+    assert {login(client, "alice").status_code for _ in range(5)} == {401}
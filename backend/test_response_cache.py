@@ -0,0 +1,71 @@
+"""
+Cache des réponses GET : ETag, 304 sur If-None-Match et invalidation à
+l'écriture, y compris entre deux workers qui partagent le fichier de version.
+
+    cd backend && python -m pytest -q test_response_cache.py
+"""
+import pytest
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+def create_project(client, titre):
+    response = client.post("/api/projects", data={"titre": titre})
+    assert response.status_code == 201
+    return response.get_json()["projectId"]
+
+
+def test_unchanged_listing_returns_304(app):
+    client = app.test_client()
+    create_project(client, "Premier")
+    first = client.get("/api/projects")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    second = client.get("/api/projects", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.data == b""
+    # ETag calculé sur le corps : une autre query string au même contenu revalide aussi
+    assert client.get("/api/projects?limit=1", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_write_invalidates_cached_listing(app):
+    client = app.test_client()
+    create_project(client, "Premier")
+    etag = client.get("/api/projects").headers["ETag"]
+
+    project_id = create_project(client, "Second")
+    response = client.get("/api/projects", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [p["titre"] for p in response.get_json()["items"]] == ["Second", "Premier"]
+
+    etag = response.headers["ETag"]
+    assert client.delete(f"/api/admin/project/{project_id}").status_code == 200
+    response = client.get("/api/projects", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [p["titre"] for p in response.get_json()["items"]] == ["Premier"]
+
+
+def test_write_in_one_worker_invalidates_the_other(make_app):
+    # Deux applications sur la même base et le même DATA_DIR : deux workers gunicorn
+    worker_a, worker_b = make_app().test_client(), make_app().test_client()
+    create_project(worker_a, "Premier")
+    etag = worker_b.get("/api/projects").headers["ETag"]
+    assert worker_b.get("/api/projects", headers={"If-None-Match": etag}).status_code == 304
+
+    create_project(worker_a, "Second")
+    response = worker_b.get("/api/projects", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.get_json()["items"]) == 2
+
+
+def test_errors_are_not_cached(app):
+    client = app.test_client()
+    assert client.get("/api/projects/inconnu").status_code == 404
+    project_id = create_project(client, "Créé ensuite")
+    # La création invalide le cache, mais un 404 ne doit de toute façon jamais y entrer
+    assert client.get(f"/api/projects/{project_id}").status_code == 200
+    assert client.get("/api/projects?cursor=invalide").status_code == 400
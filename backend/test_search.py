@@ -0,0 +1,76 @@
+"""
+Recherche plein texte (FTS5) : saisie échappée, accents ignorés, préfixes,
+classement et surlignage sûr.
+
+    cd backend && python -m pytest -q test_search.py
+"""
+import pytest
+
+from models import fts_match_expression, fulltext_enabled
+
+
+PROJECTS = [
+    {"titre": "Portail développeur", "description": "API REST pour les équipes", "auteurNom": "amélie"},
+    {"titre": "Boutique en ligne", "description": "Paiement et panier, outil du développeur front",
+     "auteurNom": "karim"},
+    {"titre": "Jeu <script>alert(1)</script>", "description": "Canvas et \"guillemets\"", "auteurNom": "zoé"},
+]
+
+
+@pytest.fixture
+def client(make_app):
+    app = make_app()
+    with app.app_context():
+        if not fulltext_enabled():
+            pytest.skip("SQLite sans FTS5")
+    client = app.test_client()
+    for project in PROJECTS:
+        assert client.post("/api/projects", data=project).status_code == 201
+    return client
+
+
+def search(client, q, **params):
+    response = client.get("/api/projects/search", query_string={"q": q, **params})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def titles(results):
+    return [r["titre"] for r in results]
+
+
+@pytest.mark.parametrize("q", ['"', 'NEAR(', 'a OR', '*', 'titre:jeu"', '-(', "AND NOT", "^"])
+def test_fts_syntax_in_input_is_escaped(client, q):
+    # Ni erreur de syntaxe FTS5 (500) ni opérateur interprété
+    search(client, q)
+
+
+def test_operators_are_searched_as_words(client):
+    assert titles(search(client, "boutique OR jeu")) == []
+    assert fts_match_expression('boutique OR "jeu') == '"boutique"* "OR"* "jeu"*'
+
+
+def test_diacritics_are_ignored_both_ways(client):
+    assert titles(search(client, "developpeur")) == titles(search(client, "Développeur"))
+    assert set(titles(search(client, "developpeur"))) == {"Portail développeur", "Boutique en ligne"}
+    assert titles(search(client, "amelie")) == ["Portail développeur"]
+
+
+def test_prefix_match_and_title_ranked_first(client):
+    # "dévelop" : préfixe ; le titre pèse plus que la description
+    assert titles(search(client, "dévelop"))[0] == "Portail développeur"
+    assert titles(search(client, "bout pan")) == ["Boutique en ligne"]
+
+
+def test_highlights_escape_user_content(client):
+    [result] = search(client, "jeu")
+    assert result["titreSurligne"] == "<mark>Jeu</mark> &lt;script&gt;alert(1)&lt;/script&gt;"
+    assert "<script>" not in (result["extrait"] or "")
+    [result] = search(client, "guillemets")
+    assert "&quot;<mark>guillemets</mark>&quot;" in result["extrait"]
+
+
+def test_index_follows_deletes(client):
+    project_id = search(client, "boutique")[0]["id"]
+    assert client.delete(f"/api/admin/project/{project_id}").status_code == 200
+    assert search(client, "boutique") == []
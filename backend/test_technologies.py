@@ -0,0 +1,69 @@
+"""
+Filtre par technologies : tous les tags (ET, par défaut) ou au moins un (OU),
+noms normalisés, et facettes de /api/technologies.
+
+    cd backend && python -m pytest -q test_technologies.py
+"""
+import pytest
+
+
+PROJECTS = {
+    "Portail": ["React", "Flask"],
+    "Boutique": ["react", "Node.js"],
+    "Outil interne": ["Flask", "  SQLite "],
+    "Sans tag": [],
+}
+
+
+@pytest.fixture
+def client(make_app):
+    client = make_app().test_client()
+    for titre, technologies in PROJECTS.items():
+        response = client.post("/api/projects", data={"titre": titre, "technologies": technologies})
+        assert response.status_code == 201
+    return client
+
+
+def titles(client, query):
+    response = client.get(f"/api/projects/search?{query}")
+    assert response.status_code == 200
+    return sorted(p["titre"] for p in response.get_json())
+
+
+# -----------------------------
+# ET / OU
+# -----------------------------
+def test_all_tags_by_default(client):
+    assert titles(client, "tech=react") == ["Boutique", "Portail"]
+    assert titles(client, "tech=React&tech=flask") == ["Portail"]
+    assert titles(client, "tech=React&tech=SQLite") == []
+
+
+def test_any_tag_mode(client):
+    assert titles(client, "tech=node.js&tech=sqlite&tech_mode=any") == ["Boutique", "Outil interne"]
+    assert titles(client, "tech=React&tech=Flask&tech_mode=any") == ["Boutique", "Outil interne", "Portail"]
+
+
+def test_unknown_mode_falls_back_to_all(client):
+    assert titles(client, "tech=React&tech=Flask&tech_mode=xor") == ["Portail"]
+
+
+def test_blank_and_duplicate_tags_are_ignored(client):
+    assert titles(client, "tech=&tech=%20") == ["Boutique", "Outil interne", "Portail", "Sans tag"]
+    # Doublon après normalisation : un seul tag à satisfaire
+    assert titles(client, "tech=Flask&tech=%20flask%20") == ["Outil interne", "Portail"]
+
+
+def test_tags_combine_with_text_search(client):
+    assert titles(client, "q=outil&tech=flask") == ["Outil interne"]
+
+
+# -----------------------------
+# FACETTES
+# -----------------------------
+def test_facets_count_projects_per_normalized_tag(client):
+    facets = client.get("/api/technologies").get_json()
+    assert [(f["slug"], f["count"]) for f in facets] == [
+        ("flask", 2), ("react", 2), ("node.js", 1), ("sqlite", 1)]
+    # Le premier nom rencontré est conservé pour l'affichage
+    assert {f["slug"]: f["nom"] for f in facets}["sqlite"] == "SQLite"
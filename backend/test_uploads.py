@@ -0,0 +1,163 @@
+"""
+Upload par morceaux : création, morceaux, reprise après coupure, finalisation,
+puis création du projet (et nouvel essai si elle échoue).
+
+    cd backend && python -m pytest -q test_uploads.py
+"""
+import os
+import hashlib
+
+import pytest
+
+import projects
+from extensions import db
+from models import Project, ArchiveBlob, UploadSession
+
+
+CHUNK = 1024
+ARCHIVE = bytes(range(256)) * 10  # 2560 octets : 3 morceaux
+
+
+def sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(UPLOAD_CHUNK_SIZE=CHUNK)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def create(client, data=ARCHIVE, **fields):
+    response = client.post("/api/uploads", json={"filename": "projet.zip", "size": len(data),
+                                                 "sha256": sha(data), **fields})
+    assert response.status_code == 201
+    return response.get_json()["uploadId"]
+
+
+def put(client, upload_id, index, data, **headers):
+    return client.put(f"/api/uploads/{upload_id}/chunks/{index}", data=data, headers=headers)
+
+
+def chunks(data=ARCHIVE):
+    return [data[i:i + CHUNK] for i in range(0, len(data), CHUNK)]
+
+
+def upload(client, data=ARCHIVE):
+    upload_id = create(client, data)
+    for index, chunk in enumerate(chunks(data)):
+        assert put(client, upload_id, index, chunk).status_code == 200
+    assert client.post(f"/api/uploads/{upload_id}/finalize").status_code == 200
+    return upload_id
+
+
+# -----------------------------
+# SESSION D'UPLOAD
+# -----------------------------
+def test_upload_resumes_after_interrupted_chunk(app, client):
+    upload_id = create(client)
+    parts = chunks()
+    assert put(client, upload_id, 0, parts[0], **{"X-Chunk-SHA256": sha(parts[0])}).status_code == 200
+
+    # Coupure pendant le morceau 1 : octets partiels sur disque, session inchangée
+    with app.app_context():
+        part_path = projects.upload_part_path(upload_id)
+    with open(part_path, "ab") as part:
+        part.write(parts[1][:100])
+    state = client.get(f"/api/uploads/{upload_id}").get_json()
+    assert (state["nextChunk"], state["received"]) == (1, CHUNK)
+
+    # Le client renvoie un morceau déjà reçu, puis reprend à nextChunk
+    assert put(client, upload_id, 0, parts[0]).get_json()["nextChunk"] == 1
+    for index in (1, 2):
+        assert put(client, upload_id, index, parts[index]).status_code == 200
+
+    response = client.post(f"/api/uploads/{upload_id}/finalize")
+    assert response.status_code == 200
+    assert response.get_json()["sha256"] == sha(ARCHIVE)
+    with open(part_path, "rb") as part:
+        assert part.read() == ARCHIVE
+
+
+def test_chunk_checksum_mismatch_is_rejected(client):
+    upload_id = create(client)
+    response = put(client, upload_id, 0, chunks()[0], **{"X-Chunk-SHA256": "0" * 64})
+    assert response.status_code == 422
+    assert response.get_json()["nextChunk"] == 0
+
+
+def test_archive_checksum_mismatch_is_rejected(client):
+    upload_id = create(client, sha256=sha(b"autre contenu"))
+    for index, chunk in enumerate(chunks()):
+        put(client, upload_id, index, chunk)
+    response = client.post(f"/api/uploads/{upload_id}/finalize")
+    assert response.status_code == 422
+    assert client.get(f"/api/uploads/{upload_id}").get_json()["status"] == "en_cours"
+
+
+def test_out_of_sequence_and_empty_chunks_are_rejected(client):
+    upload_id = create(client)
+    response = put(client, upload_id, 1, chunks()[1])
+    assert response.status_code == 409
+    assert response.get_json()["nextChunk"] == 0
+
+    response = put(client, upload_id, 0, b"")
+    assert response.status_code == 400
+    assert client.get(f"/api/uploads/{upload_id}").get_json()["nextChunk"] == 0
+
+
+def test_incomplete_upload_cannot_be_finalized(client):
+    upload_id = create(client)
+    put(client, upload_id, 0, chunks()[0])
+    assert client.post(f"/api/uploads/{upload_id}/finalize").status_code == 409
+
+
+# -----------------------------
+# CRÉATION DU PROJET
+# -----------------------------
+def test_project_from_upload_stores_the_blob(app, client):
+    upload_id = upload(client)
+    response = client.post("/api/projects", data={"titre": "Projet", "uploadId": upload_id})
+    assert response.status_code == 201
+
+    with app.app_context():
+        project = db.session.get(Project, response.get_json()["projectId"])
+        blob = db.session.get(ArchiveBlob, sha(ARCHIVE))
+        assert project.archiveSha256 == blob.sha256 and blob.ref_count == 1
+        with open(blob.path, "rb") as f:
+            assert f.read() == ARCHIVE
+        assert db.session.get(UploadSession, upload_id) is None
+        assert not os.path.exists(projects.upload_part_path(upload_id))
+
+
+def test_invalid_form_leaves_the_upload_untouched(app, client):
+    upload_id = upload(client)
+    assert client.post("/api/projects", data={"uploadId": upload_id}).status_code == 400
+    with app.app_context():
+        assert ArchiveBlob.query.count() == 0
+        assert os.path.exists(projects.upload_part_path(upload_id))
+
+
+def test_failed_commit_keeps_the_upload_reusable(app, client, monkeypatch):
+    upload_id = upload(client)
+
+    def fail(changes):
+        raise RuntimeError("échec d'écriture")
+
+    monkeypatch.setattr(projects, "bump_counters", fail)
+    with pytest.raises(RuntimeError):
+        client.post("/api/projects", data={"titre": "Projet", "uploadId": upload_id})
+    with app.app_context():
+        assert ArchiveBlob.query.count() == 0
+        assert not os.path.exists(projects.blob_path(sha(ARCHIVE)))
+        assert db.session.get(UploadSession, upload_id).status == "termine"
+
+    monkeypatch.undo()
+    response = client.post("/api/projects", data={"titre": "Projet", "uploadId": upload_id})
+    assert response.status_code == 201
+    with app.app_context():
+        assert db.session.get(ArchiveBlob, sha(ARCHIVE)).ref_count == 1
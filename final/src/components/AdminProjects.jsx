@@ -17,6 +17,10 @@ export default function AdminProjects() {
   const [error, setError] = useState('');
   const [confirmDelete, setConfirmDelete] = useState(null);
   const [toast, setToast] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [totalProjects, setTotalProjects] = useState(0);
+  const [categoryCounts, setCategoryCounts] = useState({});
   
   const iframeRef = useRef(null);
 
@@ -33,16 +37,32 @@ export default function AdminProjects() {
     }
   }, [toast]);
 
-  const loadProjects = async () => {
+  // Pagination par curseur : 50 projets par page, "Charger plus" pour la suite
+  const loadProjects = async (cursor = null) => {
     try {
-      setLoading(true);
-      const response = await fetch(`${API_BASE_URL}/api/projects`);
+      cursor ? setLoadingMore(true) : setLoading(true);
+      const params = new URLSearchParams({ limit: 50 });
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`${API_BASE_URL}/api/projects?${params}`);
       const data = await response.json();
-      setProjects(Array.isArray(data) ? data : []);
+      const items = Array.isArray(data.items) ? data.items : [];
+      setProjects(previous => cursor ? [...previous, ...items] : items);
+      setNextCursor(data.next_cursor || null);
+      if (!cursor) {
+        // Total : compteur du serveur, pas seulement les projets chargés
+        const statsRes = await fetch(`${API_BASE_URL}/api/health/stats`);
+        if (statsRes.ok) setTotalProjects((await statsRes.json()).projects_count || 0);
+        // Répartition par catégorie : calculée par le serveur sur tous les projets
+        const categoriesRes = await fetch(`${API_BASE_URL}/api/admin/projects/categories`);
+        if (categoriesRes.ok) {
+          const categories = await categoriesRes.json();
+          setCategoryCounts(Object.fromEntries(categories.map(c => [c.categorie, c.count])));
+        }
+      }
     } catch (error) {
       setError("Erreur de synchronisation");
     } finally {
-      setLoading(false);
+      cursor ? setLoadingMore(false) : setLoading(false);
     }
   };
 
@@ -163,6 +183,7 @@ export default function AdminProjects() {
       if (response.ok) {
         // Supprimer le projet de la liste locale
         setProjects(prev => prev.filter(p => p.id !== projectId));
+        setTotalProjects(n => Math.max(0, n - 1));
         
         // Réinitialiser la confirmation
         setConfirmDelete(null);
@@ -201,10 +222,10 @@ export default function AdminProjects() {
 
   // Statistiques améliorées
   const stats = [
-    { label: 'Total Projets', value: projects.length, color: 'text-white', icon: <Folder className="text-[#CE0033]" /> },
-    { label: 'Frontend', value: projects.filter(p => p.categorie === 'frontend').length, color: 'text-blue-400', icon: <FileText className="text-blue-400" /> },
-    { label: 'Backend', value: projects.filter(p => p.categorie === 'backend').length, color: 'text-emerald-400', icon: <FileText className="text-emerald-400" /> },
-    { label: 'Fullstack', value: projects.filter(p => p.categorie === 'fullstack').length, color: 'text-purple-400', icon: <FileText className="text-purple-400" /> }
+    { label: 'Total Projets', value: totalProjects, color: 'text-white', icon: <Folder className="text-[#CE0033]" /> },
+    { label: 'Frontend', value: categoryCounts.frontend || 0, color: 'text-blue-400', icon: <FileText className="text-blue-400" /> },
+    { label: 'Backend', value: categoryCounts.backend || 0, color: 'text-emerald-400', icon: <FileText className="text-emerald-400" /> },
+    { label: 'Fullstack', value: categoryCounts.fullstack || 0, color: 'text-purple-400', icon: <FileText className="text-purple-400" /> }
   ];
 
   return (
@@ -255,7 +276,7 @@ export default function AdminProjects() {
           
           <div className="flex gap-3">
             <button 
-              onClick={loadProjects}
+              onClick={() => loadProjects()}
               className="p-2.5 bg-gray-900 border border-gray-800 rounded-xl hover:bg-gray-800 transition-all"
               title="Actualiser"
               disabled={loading}
@@ -419,6 +440,19 @@ export default function AdminProjects() {
               </tbody>
             </table>
           </div>
+
+          {!loading && nextCursor && (
+            <div className="flex justify-center mt-6">
+              <button
+                onClick={() => loadProjects(nextCursor)}
+                disabled={loadingMore}
+                className="px-6 py-2.5 bg-gray-800 hover:bg-gray-700 rounded-lg text-sm font-medium transition-colors disabled:opacity-50 flex items-center gap-2"
+              >
+                {loadingMore && <Loader2 size={16} className="animate-spin" />}
+                Charger plus
+              </button>
+            </div>
+          )}
         </div>
       </main>
 
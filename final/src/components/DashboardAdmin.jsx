@@ -44,18 +44,18 @@ export default function DashboardAdmin() {
       const usersRes = await fetch('http://localhost:5000/api/admin/users');
       const users = usersRes.ok ? await usersRes.json() : [];
       
-      // Charger les projets
-      const projectsRes = await fetch('http://localhost:5000/api/projects');
-      const projects = projectsRes.ok ? await projectsRes.json() : [];
+      // Nombre de projets : compteur du serveur, sans télécharger la liste
+      const statsRes = await fetch('http://localhost:5000/api/health/stats');
+      const serverStats = statsRes.ok ? await statsRes.json() : {};
       
       // Charger les activités récentes (limité aux 10 dernières)
       const activitiesRes = await fetch('http://localhost:5000/api/admin/activities');
-      const activities = activitiesRes.ok ? await activitiesRes.json() : [];
+      const activities = activitiesRes.ok ? ((await activitiesRes.json()).items || []) : [];
       
       setStats({
         utilisateurs: users.length || 0,
-        projets: Array.isArray(projects) ? projects.length : 0,
-        activites: activities.length || 0
+        projets: serverStats.projects_count || 0,
+        activites: serverStats.activities_count || 0
       });
       
       // Filtrer et formater les 10 dernières activités pertinentes
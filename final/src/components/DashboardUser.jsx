@@ -24,11 +24,19 @@ export default function DashboardUser() {
   const loadUserProjects = async (userId) => {
     setLoading(true);
     try {
-      const res = await fetch(`http://localhost:5000/api/projects/user/${userId}`);
-      if (res.ok) {
-        const projects = await res.json();
-        setUserProjects(projects);
-      }
+      // Liste paginée par curseur : on suit next_cursor jusqu'à la dernière page
+      const projects = [];
+      let cursor = null;
+      do {
+        const params = new URLSearchParams({ limit: 200 });
+        if (cursor) params.set('cursor', cursor);
+        const res = await fetch(`http://localhost:5000/api/projects/user/${userId}?${params}`);
+        if (!res.ok) break;
+        const page = await res.json();
+        projects.push(...(Array.isArray(page.items) ? page.items : []));
+        cursor = page.next_cursor || null;
+      } while (cursor);
+      setUserProjects(projects);
     } catch (error) {
       console.error("Erreur chargement projets:", error);
     } finally {
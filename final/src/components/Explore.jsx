@@ -16,6 +16,8 @@ export default function Explore() {
   const [filtre, setFiltre] = useState("");
   const [filtreTechno, setFiltreTechno] = useState("");
   const [downloadingId, setDownloadingId] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // --- CHARGEMENT INITIAL ---
   useEffect(() => {
@@ -25,18 +27,23 @@ export default function Explore() {
   }, []);
 
   // --- APPELS API (Logique inchangée) ---
-  const fetchProjets = async () => {
-    setLoading(true);
+  // Pagination par curseur : 50 projets par page, "Charger plus" pour la suite
+  const fetchProjets = async (cursor = null) => {
+    cursor ? setLoadingMore(true) : setLoading(true);
     setError("");
     try {
-      const response = await fetch('http://localhost:5000/api/projects');
+      const params = new URLSearchParams({ limit: 50 });
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`http://localhost:5000/api/projects?${params}`);
       if (!response.ok) throw new Error('Erreur lors du chargement des projets');
       const data = await response.json();
-      setProjets(Array.isArray(data) ? data : []);
+      const items = Array.isArray(data.items) ? data.items : [];
+      setProjets(previous => cursor ? [...previous, ...items] : items);
+      setNextCursor(data.next_cursor || null);
     } catch (error) {
       setError("Impossible de charger les projets");
     } finally {
-      setLoading(false);
+      cursor ? setLoadingMore(false) : setLoading(false);
     }
   };
 
@@ -148,7 +155,7 @@ export default function Explore() {
               </div>
 
               <button
-                onClick={fetchProjets}
+                onClick={() => fetchProjets()}
                 disabled={loading}
                 className="ml-auto px-4 py-2 bg-gray-800 hover:bg-gray-700 rounded-lg text-sm font-medium transition-colors disabled:opacity-50 flex items-center gap-2"
               >
@@ -177,6 +184,19 @@ export default function Explore() {
                   key={projet.id} 
                   className="bg-gray-900/50 border border-gray-800 hover:border-[#CE0033]/30 rounded-xl overflow-hidden transition-colors flex flex-col"
                 >
+                  {/* Vignette (320 px, WebP) : jamais l'image d'origine dans la grille */}
+                  {projet.images?.length > 0 && (
+                    <img
+                      src={`http://localhost:5000${projet.images[0].thumb}`}
+                      alt={projet.titre}
+                      loading="lazy"
+                      decoding="async"
+                      width={320}
+                      height={180}
+                      className="w-full h-40 object-cover bg-gray-800"
+                    />
+                  )}
+
                   {/* Card Head */}
                   <div className="p-5 pb-3">
                     <div className="flex justify-between items-start mb-3">
@@ -245,6 +265,19 @@ export default function Explore() {
               ))}
             </div>
           )}
+
+          {!loading && nextCursor && (
+            <div className="flex justify-center mt-8">
+              <button
+                onClick={() => fetchProjets(nextCursor)}
+                disabled={loadingMore}
+                className="px-6 py-2.5 bg-gray-800 hover:bg-gray-700 rounded-lg text-sm font-medium transition-colors disabled:opacity-50 flex items-center gap-2"
+              >
+                {loadingMore && <Loader2 size={16} className="animate-spin" />}
+                Charger plus
+              </button>
+            </div>
+          )}
         </div>
       </main>
     </div>
@@ -23,9 +23,19 @@ const MyDownloads = () => {
     if (!currentUser?.id) { setLoading(false); return; }
     setLoading(true);
     try {
-      const response = await fetch(`${baseUrl}/api/my-downloads/${currentUser.id}`);
-      const data = await response.json();
-      setDownloads(Array.isArray(data) ? data : []);
+      // Liste paginée par curseur : on suit next_cursor jusqu'au bout (total et volume portent sur tout)
+      const items = [];
+      let cursor = null;
+      do {
+        const params = new URLSearchParams({ limit: 200 });
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`${baseUrl}/api/my-downloads/${currentUser.id}?${params}`);
+        if (!response.ok) break;
+        const data = await response.json();
+        items.push(...(Array.isArray(data.items) ? data.items : []));
+        cursor = data.next_cursor || null;
+      } while (cursor);
+      setDownloads(items);
     } catch (err) { console.error(err); } finally { setLoading(false); }
   };
 
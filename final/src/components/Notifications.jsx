@@ -28,19 +28,8 @@ const Notifications = () => {
       
       const data = await response.json();
       
-      // Convertir les activités en format notification
-      const formattedNotifications = data.map(activity => ({
-        id: activity.id,
-        type: getActivityType(activity.action),
-        message: getActivityMessage(activity),
-        userName: activity.user_name,
-        email: activity.user_id, // Vous pourriez récupérer l'email depuis la DB
-        projectName: extractProjectName(activity.details),
-        timestamp: activity.timestamp || new Date().toISOString(),
-        rawData: activity // Garder les données brutes pour debug
-      }));
-      
-      setNotifications(formattedNotifications);
+      // Convertir les activités en format notification (première page : les plus récentes)
+      setNotifications((data.items || []).map(formatNotification));
     } catch (err) {
       console.error('Erreur chargement notifications:', err);
       setError('Impossible de charger les activités');
@@ -49,6 +38,18 @@ const Notifications = () => {
     }
   };
 
+  // Convertir une activité de l'API en notification
+  const formatNotification = (activity) => ({
+    id: activity.id,
+    type: getActivityType(activity.action),
+    message: getActivityMessage(activity),
+    userName: activity.user_name,
+    email: activity.user_id, // Vous pourriez récupérer l'email depuis la DB
+    projectName: extractProjectName(activity.details),
+    timestamp: activity.timestamp || new Date().toISOString(),
+    rawData: activity // Garder les données brutes pour debug
+  });
+
   // Déterminer le type d'activité
   const getActivityType = (action) => {
     const actionLower = action.toLowerCase();
@@ -107,14 +108,19 @@ const Notifications = () => {
   useEffect(() => {
     loadNotifications();
     
-    let intervalId;
-    if (autoRefresh) {
-      intervalId = setInterval(loadNotifications, 10000); // Rafraîchir toutes les 10s
-    }
+    if (!autoRefresh) return;
+
+    // Flux SSE : le serveur pousse les nouvelles activités (reconnexion automatique
+    // du navigateur, les activités manquées sont rejouées grâce à Last-Event-ID)
+    const source = new EventSource(`${API_BASE_URL}/api/admin/activities/stream`);
+    source.addEventListener('activity', (event) => {
+      const notification = formatNotification(JSON.parse(event.data));
+      setNotifications(prev => prev.some(n => n.id === notification.id)
+        ? prev
+        : [notification, ...prev].slice(0, 50));
+    });
     
-    return () => {
-      if (intervalId) clearInterval(intervalId);
-    };
+    return () => source.close();
   }, [autoRefresh]);
 
   // Supprimer une notification (et l'activité correspondante)
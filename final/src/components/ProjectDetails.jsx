@@ -16,6 +16,8 @@ export default function ProjectDetails() {
   const [loading, setLoading] = useState(true);
   const [downloading, setDownloading] = useState(false);
   const [error, setError] = useState('');
+  const [archive, setArchive] = useState(null);
+  const [openedFile, setOpenedFile] = useState(null);
 
   const API_BASE_URL = 'http://localhost:5000';
 
@@ -26,32 +28,46 @@ export default function ProjectDetails() {
     
     // Charger les détails du projet
     fetchProjectDetails();
+    fetchArchiveContents();
   }, [id]);
 
+  // Contenu de l'archive (inspecté en arrière-plan après le dépôt : 202 tant qu'il n'est pas prêt)
+  const fetchArchiveContents = async (attempt = 0) => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/projects/${id}/files`);
+      if (response.status === 202 && attempt < 5) {
+        setTimeout(() => fetchArchiveContents(attempt + 1), 2000);
+        return;
+      }
+      setArchive(response.ok ? await response.json() : null);
+    } catch (err) {
+      setArchive(null);
+    }
+  };
+
+  const openArchiveFile = async (path) => {
+    const encodedPath = path.split("/").map(encodeURIComponent).join("/");
+    const response = await fetch(`${API_BASE_URL}/api/projects/${id}/files/${encodedPath}`);
+    setOpenedFile({
+      path,
+      content: response.ok ? await response.text() : "Aperçu indisponible pour ce fichier."
+    });
+  };
+
   const fetchProjectDetails = async () => {
     try {
       setLoading(true);
       setError('');
       
-      // Votre backend renvoie un tableau directement, pas un objet avec propriété "projects"
-      const response = await fetch(`${API_BASE_URL}/api/projects`);
+      const response = await fetch(`${API_BASE_URL}/api/projects/${id}`);
+      if (response.status === 404) {
+        setError("Projet introuvable");
+        return;
+      }
       if (!response.ok) {
         throw new Error(`Erreur ${response.status}: ${response.statusText}`);
       }
-      
-      const data = await response.json();
-      console.log("Données projets:", data); // Debug
-      
-      // Chercher le projet par ID
-      const found = Array.isArray(data) 
-        ? data.find(p => p.id === id)
-        : null;
-      
-      if (found) {
-        setProject(found);
-      } else {
-        setError("Projet introuvable");
-      }
+      setProject(await response.json());
     } catch (error) {
       console.error("Erreur:", error);
       setError("Impossible de charger les détails du projet");
@@ -289,6 +305,22 @@ export default function ProjectDetails() {
                 </div>
               </section>
 
+              {/* Captures d'écran (format carte, l'original s'ouvre au clic) */}
+              {project.images?.length > 0 && (
+                <section className="grid grid-cols-1 sm:grid-cols-2 gap-4">
+                  {project.images.map((image, index) => (
+                    <a key={index} href={`${API_BASE_URL}${image.original}`} target="_blank" rel="noreferrer">
+                      <img
+                        src={`${API_BASE_URL}${image.card}`}
+                        alt={`${project.titre} — capture ${index + 1}`}
+                        loading="lazy"
+                        className="w-full rounded-2xl border border-gray-800 bg-gray-900 object-cover"
+                      />
+                    </a>
+                  ))}
+                </section>
+              )}
+
               {/* Description */}
               <section className="bg-gray-900/50 border border-gray-800 rounded-2xl p-6">
                 <h2 className="text-xl font-bold mb-4 text-[#CE0033] flex items-center gap-3">
@@ -325,6 +357,51 @@ export default function ProjectDetails() {
                 </div>
               </section>
 
+              {/* Contenu de l'archive */}
+              {archive && (
+                <section className="bg-gray-900/50 border border-gray-800 rounded-2xl p-6">
+                  <h2 className="text-xl font-bold mb-4 text-[#CE0033] flex items-center gap-3">
+                    <HardDrive size={20} />
+                    Contenu de l'archive
+                  </h2>
+                  {archive.languages?.length > 0 && (
+                    <div className="flex flex-wrap gap-2 mb-4">
+                      {archive.languages.map(lang => (
+                        <span key={lang.nom} className="px-3 py-1 bg-gray-800 border border-gray-700 text-gray-300 rounded-lg text-sm">
+                          {lang.nom} {lang.part}%
+                        </span>
+                      ))}
+                    </div>
+                  )}
+                  {archive.readme?.content && (
+                    <pre className="mb-4 p-4 bg-black/40 rounded-xl text-sm text-gray-300 whitespace-pre-wrap max-h-80 overflow-auto">
+                      {archive.readme.content}
+                    </pre>
+                  )}
+                  <ul className="max-h-80 overflow-auto text-sm font-mono divide-y divide-gray-800">
+                    {archive.entries.filter(entry => !entry.dir).map(entry => (
+                      <li key={entry.path}>
+                        <button
+                          onClick={() => openArchiveFile(entry.path)}
+                          className="w-full flex justify-between gap-4 py-2 text-left text-gray-300 hover:text-white"
+                        >
+                          <span className="truncate">{entry.path}</span>
+                          <span className="text-gray-500 shrink-0">{(entry.size / 1024).toFixed(1)} Ko</span>
+                        </button>
+                      </li>
+                    ))}
+                  </ul>
+                  {openedFile && (
+                    <div className="mt-4">
+                      <h3 className="text-sm font-medium text-gray-400 mb-2">{openedFile.path}</h3>
+                      <pre className="p-4 bg-black/40 rounded-xl text-sm text-gray-300 whitespace-pre-wrap max-h-96 overflow-auto">
+                        {openedFile.content}
+                      </pre>
+                    </div>
+                  )}
+                </section>
+              )}
+
               {/* Informations supplémentaires */}
               <section className="bg-gray-900/50 border border-gray-800 rounded-2xl p-6">
                 <h2 className="text-xl font-bold mb-4 text-[#CE0033] flex items-center gap-3">
@@ -31,9 +31,18 @@ export default function UserProjectsPage() {
     try {
       setLoading(true);
       setError(null);
-      const response = await fetch(`${API_BASE_URL}/api/projects/user/${userId}`);
-      if (!response.ok) throw new Error(`Erreur ${response.status}: Impossible de charger vos projets`);
-      const data = await response.json();
+      // Liste paginée par curseur : on suit next_cursor jusqu'à la dernière page
+      const data = [];
+      let cursor = null;
+      do {
+        const params = new URLSearchParams({ limit: 200 });
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`${API_BASE_URL}/api/projects/user/${userId}?${params}`);
+        if (!response.ok) throw new Error(`Erreur ${response.status}: Impossible de charger vos projets`);
+        const page = await response.json();
+        data.push(...(Array.isArray(page.items) ? page.items : []));
+        cursor = page.next_cursor || null;
+      } while (cursor);
       
       const formattedProjects = data.map(project => ({
         id: project.id,